@@ -1,3 +1,8 @@
+import bisect
+import collections
+import itertools
+import matplotlib.collections as mcollections
+import matplotlib.colors as mcolors
 import matplotlib.patches as patches
 import matplotlib.path as path
 import matplotlib.pyplot as plt
@@ -5,18 +10,33 @@ import numpy as np
 import pandas
 
 
+import colors
+import discreteregions
 import scatter
 
 
 def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, levels=None, boundary=False, boundaryColor='black', boundaryWidth=2,
          boundaryStyle='solid', fill=0, fillAlpha=1.0, dotSize=10, colorSet='set2', colorMapping=None, title='', xLabel='', yLabel='',
-         spinesToRemove=['right', 'top'], legend=True):
+         spinesToRemove=['right', 'top'], legend=True, tileSize=None, poolSize=1, heatmap=None, cacheDirectory=None, cacheSize=2**30,
+         simplifyTolerance=None, simplifyMethod='douglas-peucker'):
     """Produces a discretised heatmap with optional border lines drawn between areas of different values.
 
     The X and Y coordinate values should be supplied such that the smallest coordinates are at index [0, 0] and the largest at [-1, -1] (as would be
     returned by calling np.arange followed by np.meshgrid).
 
-    Solid filling (fill==2) can be temperamental when the resolution of the (X,Y) grid gets very low (e.g. 10x10).
+    Solid filling (fill==2) can be temperamental when the resolution of the (X,Y) grid gets very low (e.g. 10x10). Image filling (fill==3) draws a single
+    image with one pixel per (x,y) pair, and is therefore much faster to draw than dot filling (fill==1) for large grids.
+
+    Grids that are too large to fit in memory can be supplied as memory-mapped arrays (e.g. from np.load with mmap_mode='r') and the boundaries computed
+    in tiles by setting tileSize. Only one tile of the grid is then read into memory at a time, and the boundaries are stitched together across the
+    edges of the tiles. Dot and image filling (fill==1 and fill==3) still require the whole grid. The boundaries can also be computed in parallel by setting
+    poolSize, in which case the grid is split into one horizontal band per worker (or into tiles if tileSize is set). The paths are put into a canonical
+    order, so the boundaries are identical however they are computed.
+
+    The boundaries and regions are computed by the discreteregions module, which can also be used to compute them without plotting them (see
+    discreteregions.compute_regions). Setting cacheDirectory caches the boundaries and regions on disk, so that plotting the same grid again with
+    different styling does not recompute them. Setting simplifyTolerance merges the runs of collinear vertices in the boundaries and regions before they
+    are drawn, and with a tolerance greater than 0 also simplifies them (see discreteregions.simplify_paths).
 
     :param xCoords:                 The x coordinates where the Z values have been evaluated.
     :type xCoords:                  2 dimensional numpy array
@@ -38,7 +58,8 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
     :type boundaryWidth:            int
     :param boundaryStyle:           The style of the boundary line.
     :type boundaryStyle:            any valid value for the matplotlib.patches.PathPatch linestyle parameter
-    :param fill:                    Whether there should be any filling performed. 0 for no filling, 1 for a dot at each (x,y) pair and 2 for full fill.
+    :param fill:                    Whether there should be any filling performed. 0 for no filling, 1 for a dot at each (x,y) pair, 2 for full fill and
+                                    3 for an image with a pixel at each (x,y) pair.
     :type fill:                     int
     :param fillAlpha:               The alpha value for the background fill.
     :type fillAlpha:                float between 0 and 1
@@ -60,6 +81,20 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
     :type spinesToRemove:           list containing any of ['left', 'right', 'top', 'bottom']
     :param legend:                  Whether a legend should be added.
     :type legend:                   boolean
+    :param tileSize:                The number of squares along each side of the tiles that the (X, Y) grid is split into when computing the boundaries.
+    :type tileSize:                 int (or None if the whole grid should be processed at once)
+    :param poolSize:                The number of workers to create in the multiprocessing.Pool process pool used to compute the boundaries.
+    :type poolSize:                 int
+    :param heatmap:                 The heatmap to take the boundaries from instead of computing them (see DiscreteHeatmap.plot).
+    :type heatmap:                  DiscreteHeatmap
+    :param cacheDirectory:          The directory in which to cache the boundaries and regions (see discreteregions.compute_regions).
+    :type cacheDirectory:           str (or None if the boundaries and regions should not be cached)
+    :param cacheSize:               The maximum total size in bytes of the files in the cache directory.
+    :type cacheSize:                int
+    :param simplifyTolerance:       The tolerance (in data units) used to simplify the boundaries and regions.
+    :type simplifyTolerance:        float (or None if the boundaries and regions should not be simplified)
+    :param simplifyMethod:          The method used to simplify the boundaries and regions.
+    :type simplifyMethod:           'douglas-peucker' or 'visvalingam'
     :returns :                      The figure and axes on which the color mesh was plotted if saving is not to be performed.
     :type :                         objects of type matplotlib.figure.Figure, matplotlib.axes.Axes
 
@@ -97,16 +132,22 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
     plt.xlabel(xLabel, fontsize=16, color='0.25')
     plt.ylabel(yLabel, fontsize=16, color='0.25')
 
-    # Discretise the Z values based on the desired levels.
-    if levels:
-        minZValue = zValues.min()
-        maxZValue = zValues.max()
-        extendedLevels = [minZValue - 1] + levels + [maxZValue + 1]  # Extend the levels with the extra start and stop points.
-        enumeratedLevels = [(i,j) for i,j in enumerate(zip(extendedLevels[:-1], extendedLevels[1:]))]
-        zValues = sum([(j[0] < zValues) * (zValues <= j[1]) * (i + 1) for i,j in enumeratedLevels])
+    # Discretise the Z values based on the desired levels. When the grid is processed in tiles, the Z values are instead discretised one tile at a time
+    # (and the Z values of the regions are discretised once they have been found), so that a discretised copy of the whole grid is never created.
+    if levels and not tileSize:
+        zValues = discreteregions.discretise_z_values(zValues, levels)
+        levels = None
+
+    # Determine the distinct Z values.
+    if tileSize:
+        uniqueZValues = set()
+        for rowStart, rowEnd, colStart, colEnd in discreteregions.generate_tiles(zValues.shape[0], zValues.shape[1], tileSize, tileSize):
+            uniqueZValues.update(np.unique(discreteregions.discretise_z_values(np.asarray(zValues[rowStart:rowEnd, colStart:colEnd]), levels)).tolist())
+        uniqueZValues = sorted(uniqueZValues)
+    else:
+        uniqueZValues = sorted(np.unique(zValues))
 
     # Map the Z values to colors. If there are more distinct Z values than colors, then multiple Z values will be mapped to the same color.
-    uniqueZValues = sorted(np.unique(zValues))
     if not colorMapping:
         colorsToUse = colors.colorMaps[colorSet]
         numberOfColors = len(colorsToUse)
@@ -115,8 +156,6 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
             colorMapping[j] = colorsToUse[i % numberOfColors]
 
     # Determine some useful statistics about the input matrices.
-    numberOfRows = zValues.shape[0]
-    numberOfCols = zValues.shape[1]
     xMin = xCoords.min()
     xMax = xCoords.max()
     halfDeltaX = abs(np.ediff1d([xCoords[0,0], xCoords[0,1]]))[0] / 2  # Half the distance between adjacent X coordinate values.
@@ -125,238 +164,77 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
     halfDeltaY = abs(np.ediff1d([yCoords[0,0], yCoords[1,0]]))[0] / 2  # Half the distance between adjacent Y coordinate values.
 
     # Compute the boundaries only if they are needed.
+    regions = None  # The regions, if they have been computed along with the boundaries.
     if boundary or fill == 2:
-        # Determine which adjacent row values and column values are not equal (i.e. whether xCoords[i,j] == xCoords[i,j+1] and yCoords[i,j] == yCoords[i+1,j]).
-        # The test will be for whether each entry is equal to the value to its right (for row ==) or below it (for column ==).
-        # If rowsNotEqual[i,j] is True, then zValues[i,j] != zValues[i,j+1]. If columnsNotEqual[i,j] is True, then zValues[i,j] != zValues[i+1,j].
-        # The rightmost column of rowsNotEqual and the bottom row of columnsNotEqual will contain only False values due to the extension of the zValues
-        # by duplicating the rightmost column or bottom row respectively. This ensures that both rowsNotEqual and columnsNotEqual have the same shape (otherwise
-        # rowsNotEqual would have one more row and one less column than columnsNotEqual).
-        zValuesExtendedColumn = np.concatenate([zValues, zValues[:, -1:]], 1)  # Duplicate the last column of the Z values.
-        zValuesExtendedRow = np.concatenate([zValues, zValues[-1:, :]], 0)  # Duplicate the bottom row of the Z values.
-        rowsNotEqual = np.array([i != j for i,j in zip(zValuesExtendedColumn[:, :-1], zValuesExtendedColumn[:, 1:])])
-        columnsNotEqual = np.array([i != j for i,j in zip(zValuesExtendedRow[:-1, :], zValuesExtendedRow[1:, :])])
-
-        # The boundaries, and therefore patches representing regions of color, are determined by dividing the zValues into squares. For each square, rowsNotEqual
-        # and columnsNotEqual are used to determine which corners of the square have unequal Z values, and therefore where the boundary should be placed within
-        # the square. The values of the corners of the square are zValues[i,i] (top left corner), zValues[i,i+1] (bottom left corner),
-        # zValues[i+1,i+1] (bottom right corner) and zValues[i+1,i] (top right corner). Due the ordering of the xCoords and yCoords, the top left corner of the
-        # square represents the (x,y) point with the smallest X and Y coordinate values. When plotted the square will therefore look as follows:
-        # zValues[i,i+1] b zValues[i+1,i+1]
-        #     a                c
-        # zValues[i,i]   d zValues[i+1,i]
-        # with a, b, c and d representing he point midway along the sides.
-        # The relationship between the corners is determined using rowsNotEqual and columnsNotEqual and is arrange in a row vector such that the first
-        # element indicates whether zValues[i,i] == zValues[i,i+1], the second whether zValues[i,i+1] == zValues[i+1,i+1], the third whether
-        # zValues[i+1,i+1] == zValues[i+1,i] and the fourth whether zValues[i+1,i] == zValues[i,i].
-        # This boolean row vector for the square is then converted to a row vector that contains the midpoint of the sides where the two corners at the end
-        # of the side do not have equal zValues. For example, if zValues[i,i] != zValues[i,i+1] then mid point a is in the row vector. This row vector
-        # indicates the points where the boundaries that go through the squares enter and exit. Each point is both an entry and exit.
-        # The squares in there vectorised form are computed as:
-        # [np.array([columnsNotEqual[i, j], rowsNotEqual[i+1, j], columnsNotEqual[i, j+1], rowsNotEqual[i, j]]) for i in range(numberOfRows - 1) for j in range(numberOfCols - 1)]
-        # but to avoid looping through the matrices twice, the vector of the midpoints of sides with different corner Z values are computed as the
-        # squares are determined.
-        # The coordinates of the boundary entries and exits are represented as a set of tuples of tuples. Each external tup represents a square, and each
-        # internal tuple is an entry/exit point.
-        boundaryCoords = set([tuple(map(tuple, np.array([(xCoords[i,j], yCoords[i,j] + halfDeltaY), (xCoords[i+1, j] + halfDeltaX, yCoords[i+1, j]), (xCoords[i, j+1], yCoords[i, j+1] + halfDeltaY), (xCoords[i, j] + halfDeltaX, yCoords[i, j])])[np.array([columnsNotEqual[i, j], rowsNotEqual[i+1, j], columnsNotEqual[i, j+1], rowsNotEqual[i, j]])])) for i in range(numberOfRows - 1) for j in range(numberOfCols - 1)])
-        boundaryCoords -= set([()])  # Remove empty tuple. A square with all four corners equal is an empty tuple (no boundary goes through it)
-
-        # Compute the paths that represent the boundaries and the outsides of the enclosed areas of a specific set of Z values.
-        paths = {}         # Dictionary indexed by the starting points, s, of boundary paths with the value associated with each starting point being a list of
-                           # the vertices through which that boundary passes. Tells you the entire path given its starting point.
-        startsToEnds = {}  # Dictionary indexed by the starting points, s, of boundary paths with the value associated with each starting point being the end
-                           # point, e, of the path that starts at s. Tells you the endpoint of a path given its starting point.
-        endsToStarts = {}  # Dictionary indexed by the ending points, e, of boundary paths with the value associated with each ending point being the start
-                           # point, s, of the path that ends at e. Tells you the starting point of a path given its ending point.
-        for i in boundaryCoords:
-            # Loop through the squares and add any boundary segments that go through them.
-            numberOfBoundaryPoints = len(i)
-            i += (i[0],)  # Add the first boundary point of the square to the end of the vector. This ensures that there will correctly be a boundary edge from
-                          # the last boundary entry/exit point (going counter-clockwise) to the first.
-            extendStarts = set([])  # Boundary segments to add that extend the start of an already existing boundary.
-            extendEnds = set([])  # Boundary segments to add that extend the end of an already existing boundary.
-            fillGaps = set([])  # Boundary segments to add that extend both the start of one already existing boundary and the end of another, and therefore
-                                # that fill in a small gap and complete an existing boundary.
-            newAlones = set([])  # Boundary segments to add that do not extend the start or end of an already existing boundary.
-            for j, k in zip(i[:-1], i[1:]):
-                toAdd = set([(j,k)])  # The tuple of vertices that represent the current boundary entry/exit point.
-                extendEnd = j in endsToStarts  # True if the start point of the square's boundary segment being checked is the end of an already existing boundary path.
-                extendStart = k in startsToEnds  # True if the end point of the square's boundary segment being checked is the start of an already existing boundary path.
-                if not (extendStart or extendEnd):
-                    # The new boundary segment does not extend any existing boundary segments.
-                    newAlones |= toAdd
-                elif (extendStart and extendEnd):
-                    # The new boundary segment fills in a gap between two existing boundary segments.
-                    fillGaps |= toAdd
-                else:
-                    if extendStart:
-                        # The new boundary segment only extends the start of an existing boundary segments.
-                        extendStarts |= toAdd
-                    if extendEnd:
-                        # The new boundary segment only extends the end of an existing boundary segments.
-                        extendEnds |= toAdd
-
-            middleNeeded = numberOfBoundaryPoints > 2  # Whether you need to use the mid point of the square as one of the vertices. This is only required for
-                                                       # squares where there are 3 or 4 boundary exit and entry points.
-            if middleNeeded:
-                middleOfSquareX = sum([j[0] for j in i[:-1]]) / numberOfBoundaryPoints  # X coordinate for the middle of the square.
-                middleOfSquareY = sum([j[1] for j in i[:-1]]) / numberOfBoundaryPoints  # Y coordinate for the middle of the square.
-                middleOfSquare = (middleOfSquareX, middleOfSquareY)
-                for j,k in fillGaps:
-                    # Get the point where the existing boundary that starts at k (the end of the current square's segment) ends.
-                    endOfBoundaryStartingAtK = startsToEnds[k]
-                    del startsToEnds[k]
-                    # Get the point where the existing boundary that ends at j (the start of the current square's segment) starts.
-                    startOfBoundaryEndingAtJ = endsToStarts[j]
-                    del endsToStarts[j]
-                    # Update the path to show that the gap has been filled.
-                    startPath = paths[startOfBoundaryEndingAtJ]
-                    startPath.append(middleOfSquare)
-                    if endOfBoundaryStartingAtK != j:
-                        # Only delete the path starting at k if it does not end at j. If the path starting at k does end at j, then you have a loop and
-                        # paths[k] will delete the whole loop.
-                        startPath.extend(paths[k])
-                        del paths[k]
-                        # The existing boundary that ends at j now ends at the end of the existing boundary that started at k.
-                        startsToEnds[startOfBoundaryEndingAtJ] = endOfBoundaryStartingAtK
-                        endsToStarts[endOfBoundaryStartingAtK] = startOfBoundaryEndingAtJ
-                    else:
-                        # Close the loop by adding k to the end of the path from k to j, thereby making it go from k to k. As there are two paths recorded for
-                        # each closed loop, do not update the dictionary of endpoints, as this will interfere with the correct recording of the second closed loop
-                        # path (i.e. do not do endsToStarts[k] = k).
-                        startPath.append(k)
-                        startsToEnds[k] = k
-                for j,k in extendStarts:
-                    # Get the point where the existing boundary that starts at k (the end of the current square's segment) ends.
-                    endOfBoundaryStartingAtK = startsToEnds[k]
-                    del startsToEnds[k]
-                    # The existing boundary that started at k now starts at j.
-                    startsToEnds[j] = endOfBoundaryStartingAtK
-                    endsToStarts[endOfBoundaryStartingAtK] = j
-                    # Update the paths to reflect that j is the new start point.
-                    paths[j] = [j, middleOfSquare] + paths[k]
-                    del paths[k]
-                for j,k in extendEnds:
-                    # Get the point where the existing boundary that ends at j (the start of the current square's segment) starts.
-                    startOfBoundaryEndingAtJ = endsToStarts[j]
-                    del endsToStarts[j]
-                    # The existing boundary that ends at j now ends at k.
-                    endsToStarts[k] = startOfBoundaryEndingAtJ
-                    startsToEnds[startOfBoundaryEndingAtJ] = k
-                    # Update the paths to reflect that k is the new end point.
-                    paths[startOfBoundaryEndingAtJ].extend([middleOfSquare, k])
-                for j,k in newAlones:
-                    # Add the new unconnected boundary segment.
-                    paths[j] = [j,middleOfSquare,k]
-                    startsToEnds[j] = k
-                    endsToStarts[k] = j
-            else:
-                for j,k in fillGaps:
-                    # Get the point where the existing boundary that starts at k (the end of the current square's segment) ends.
-                    endOfBoundaryStartingAtK = startsToEnds[k]
-                    del startsToEnds[k]
-                    # Get the point where the existing boundary that ends at j (the start of the current square's segment) starts.
-                    startOfBoundaryEndingAtJ = endsToStarts[j]
-                    del endsToStarts[j]
-                    # Update the path to show that the gap has been filled.
-                    startPath = paths[startOfBoundaryEndingAtJ]
-                    if endOfBoundaryStartingAtK != j:
-                        # Only delete the path starting at k if it does not end at j. If the path starting at k does end at j, then you have a loop and
-                        # paths[k] will delete the whole loop.
-                        startPath.extend(paths[k])
-                        del paths[k]
-                        # The existing boundary that ends at j now ends at the end of the existing boundary that started at k.
-                        startsToEnds[startOfBoundaryEndingAtJ] = endOfBoundaryStartingAtK
-                        endsToStarts[endOfBoundaryStartingAtK] = startOfBoundaryEndingAtJ
-                    else:
-                        # Close the loop by adding k to the end of the path from k to j, thereby making it go from k to k. As there are two paths recorded for
-                        # each closed loop, do not update the dictionary of endpoints, as this will interfere with the correct recording of the second closed loop
-                        # path (i.e. do not do endsToStarts[k] = k).
-                        startPath.append(k)
-                        startsToEnds[k] = k
-                for j,k in extendStarts:
-                    # Get the point where the existing boundary that starts at k (the end of the current square's segment) ends.
-                    endOfBoundaryStartingAtK = startsToEnds[k]
-                    del startsToEnds[k]
-                    # The existing boundary that started at k now starts at j.
-                    startsToEnds[j] = endOfBoundaryStartingAtK
-                    endsToStarts[endOfBoundaryStartingAtK] = j
-                    # Update the paths to reflect that j is the new start point.
-                    paths[j] = [j] + paths[k]
-                    del paths[k]
-                for j,k in extendEnds:
-                    # Get the point where the existing boundary that ends at j (the start of the current square's segment) starts.
-                    startOfBoundaryEndingAtJ = endsToStarts[j]
-                    del endsToStarts[j]
-                    # The existing boundary that ends at j now ends at k.
-                    endsToStarts[k] = startOfBoundaryEndingAtJ
-                    startsToEnds[startOfBoundaryEndingAtJ] = k
-                    # Update the paths to reflect that k is the new end point.
-                    paths[startOfBoundaryEndingAtJ].append(k)
-                for j,k in newAlones:
-                    # Add the new unconnected boundary segment.
-                    paths[j] = [j,k]
-                    startsToEnds[j] = k
-                    endsToStarts[k] = j
+        if heatmap:
+            # Use the boundaries that the heatmap has already computed.
+            pathVertices = heatmap.get_paths()
+        elif cacheDirectory:
+            # Compute the boundaries and regions together, as they are cached together.
+            flatRegions = discreteregions.compute_regions(xCoords, yCoords, zValues, levels, tileSize, poolSize, cacheDirectory, cacheSize)
+            pathVertices, regions = discreteregions.split_flat_regions(flatRegions)
+        else:
+            pathVertices = discreteregions.calc_boundaries(xCoords, yCoords, zValues, levels, tileSize, poolSize)
 
     if boundary:
-        # Add the boundaries if requested.
-        for i in paths:
-            verts = paths[i]
-            codes = [path.Path.MOVETO] + ([path.Path.LINETO] * (len(verts) - 1))
-            boundary = path.Path(verts, codes)
-            patch = patches.PathPatch(boundary, facecolor='none', linewidth=boundaryWidth, edgecolor=boundaryColor, alpha=1, linestyle=boundaryStyle)
-            axes.add_patch(patch)
+        # Add the boundaries if requested. All boundaries are drawn as a single compound path. A collection is used rather than a patch as the data limits
+        # of a collection are calculated without iterating over the segments of the path in Python.
+        boundaryPaths = pathVertices
+        if simplifyTolerance is not None:
+            boundaryPaths = discreteregions.simplify_paths(pathVertices, simplifyTolerance, simplifyMethod, (xMin, xMax, yMin, yMax))
+        boundaryPath = create_compound_path(boundaryPaths)
+        boundaryCollection = mcollections.PathCollection([boundaryPath], facecolors='none', edgecolors=boundaryColor, linewidths=boundaryWidth, alpha=1,
+                                                         linestyles=boundaryStyle, joinstyle='miter', capstyle='butt')
+        axes.add_collection(boundaryCollection)
 
     if fill == 1:
         # Place the color dots on the graph.
         xValuesForDots = pandas.DataFrame([j for i in xCoords for j in i])
         yValuesForDots = pandas.DataFrame([j for i in yCoords for j in i])
-        zValuesForDots = pandas.Series([j for i in zValues for j in i])
+        zValuesForDots = pandas.Series([j for i in discretise_tiles(zValues, levels, tileSize) for j in i])
         scatter.plot(xValuesForDots, yValuesForDots, classLabels=zValuesForDots, currentFigure=currentFigure, size=dotSize, edgeColor='none',
                      title=title, xLabel=xLabel, yLabel=yLabel, colorMapping=colorMapping, linewidths=0, alpha=fillAlpha, legend=legend)
     elif fill == 2:
         # Fill the regions with solid colors.
-        pathsStartsToRegionZValues = {}  # A record of the starting points of each path to output, along with the Z value of its interior.
-
-        # First determine the color of all already closed paths (i.e. paths that do not touch an edge of the (X, Y) grid). Each already closed path is
-        # represented by a counter-clockwise and clockwise path (representing the interior and everything exterior of the closed region respectively).
-        # In order to stay consistent with all other paths, any clockwise path is to be removed.
-        closedPathStarts = set([i for i in startsToEnds if startsToEnds[i] == i])
-        for i in closedPathStarts:
-            pathIsCCW, areaZValue = test_clockwise(paths[i], xCoords, halfDeltaX, yCoords, halfDeltaY, zValues)
-            if pathIsCCW:
-                # The path is counter-clockwise, so record it as being kept along with its Z value.
-                pathsStartsToRegionZValues[i] = areaZValue
-
-        # Second, find all open paths (those where the start != end) and close them.
-        openPathStarts = set([i for i in startsToEnds if startsToEnds[i] != i])
-        closedPaths, pathStartToZValue = close_paths(paths, openPathStarts, startsToEnds, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues)
-        for i in closedPaths:
-            paths[i] = closedPaths[i]  # Update the record of the paths with the closed path.
-        for i in pathStartToZValue:
-            # For all the newly closed paths, map their starting point to their interior Z value.
-            pathsStartsToRegionZValues[i] = pathStartToZValue[i]
-
-        # Determine the hierarchy of patches in order to determine where to make holes in the patches to prevent overlaps. This is necessary in order to
-        # correctly plot smaller patches that are completely contained within a larger patch. With an alpha vale of 1, if a larger patch A is plotted after
-        # a smaller patch B that is completely contained within A, then patch B will not be visible. If the alpha value is not 1, then the overlapping
-        # patches will both be visible, but will combine their colors and be darker (due to the adding of overlapping alpha values) than the other patches.
-        removeInternalPaths = calc_area_hierarchy([i for i in pathsStartsToRegionZValues], paths)
-
-        # Fill in the area using the patches.
-        for i in pathsStartsToRegionZValues:
-            verts = paths[i]
-            codes = [path.Path.MOVETO] + ([path.Path.LINETO] * (len(verts) - 1))
-            for j in removeInternalPaths[i]:
-                # For each path P that is completely contained within the current path, reverse P's vertices (so that it's clockwise) and add the
-                # vertices to the current path's vertices. This will cause the smaller internal path to appear as a hole in the larger external patch.
-                pathOfJ = paths[j]
-                verts += pathOfJ[::-1]
-                codes += [path.Path.MOVETO] + ([path.Path.LINETO] * (len(pathOfJ) - 1))
-            boundary = path.Path(verts, codes)
-            patch = patches.PathPatch(boundary, facecolor=colorMapping[pathsStartsToRegionZValues[i]], linewidth=0, edgecolor='none', alpha=fillAlpha, zorder=-1)
-            axes.add_patch(patch)
+        if heatmap:
+            regions = heatmap.get_regions()
+        elif regions is None:
+            regions = discreteregions.calc_regions(pathVertices, xCoords, yCoords, zValues, levels)
+        if simplifyTolerance is not None:
+            regions = discreteregions.simplify_regions(regions, simplifyTolerance, simplifyMethod, (xMin, xMax, yMin, yMax))
+
+        # Group the paths of the regions by their colors. The paths of the holes in each region are clockwise while the regions are counter-clockwise,
+        # so the winding number of the points inside a hole is zero unless they are inside another region of the same color contained within the hole.
+        colorsToRegionPaths = collections.defaultdict(list)
+        for outerPath, holePaths, regionZValue in regions:
+            regionPaths = colorsToRegionPaths[mcolors.to_rgba(colorMapping[regionZValue])]
+            regionPaths.append(outerPath)
+            regionPaths.extend(holePaths)
+
+        # Fill in the regions using a single collection containing one compound path per color.
+        fillColors = list(colorsToRegionPaths)
+        fillPaths = [create_compound_path(colorsToRegionPaths[i]) for i in fillColors]
+        regionCollection = mcollections.PathCollection(fillPaths, facecolors=fillColors, edgecolors='none', linewidths=0, alpha=fillAlpha, zorder=-1)
+        axes.add_collection(regionCollection)
+    elif fill == 3:
+        # Draw the Z values as a single image. Each pixel covers the area around its (x,y) pair that is closer to it than to any other pair, so the
+        # edges between pixels of different colors pass through the same points on the sides of the grid squares as the boundaries do. The image is
+        # clipped to the edges of the figure to match the area covered by full filling.
+        fillImage = calc_fill_image(zValues, uniqueZValues, colorMapping, fillAlpha, levels, tileSize)
+        image = axes.imshow(fillImage, origin='lower', extent=(xMin - halfDeltaX, xMax + halfDeltaX, yMin - halfDeltaY, yMax + halfDeltaY),
+                            interpolation='nearest', aspect='auto', zorder=-1)
+        image.set_clip_path(patches.Rectangle((xMin, yMin), xMax - xMin, yMax - yMin, transform=axes.transData))
+
+        # Add a legend.
+        if legend:
+            handles = [patches.Patch(facecolor=colorMapping[i], edgecolor='none', alpha=fillAlpha, label=i) for i in uniqueZValues]
+            legend = axes.legend(handles=handles, bbox_to_anchor=(1.05, 0.5), loc=6, borderaxespad=0, frameon=True)
+            legendFrame = legend.get_frame()
+            legendFrame.set_facecolor('white')
+            legendFrame.set_edgecolor('black')
+            legendFrame.set_linewidth(0.2)
+            for i in legend.get_texts():
+                i.set_color('0.25')
 
     if outputLocation:
         plt.savefig(outputLocation, bbox_inches='tight', transparent=True)
@@ -364,324 +242,543 @@ def main(xCoords, yCoords, zValues, outputLocation=None, currentFigure=None, lev
         return currentFigure, axes
 
 
-def calc_area_hierarchy(pathStarts, paths):
-    """Determine the hierarchy of a set of paths.
+class DiscreteHeatmap:
+    """A discretised heatmap whose boundaries and regions are updated incrementally as its Z values change.
 
-    Determines the set of paths that are completely contained within each path. If there is a hierarchy such as A contains B which contains C, then this
-    is marked only as A containing B and B containing C (A is not marked as containing C).
+    The (X, Y) grid is split into tiles (see discreteregions.generate_tiles), and the boundary paths within each tile are kept. When the Z values are updated,
+    only the tiles containing a square with a corner whose Z value has changed are recomputed. The stitched together boundary paths are also kept, along
+    with the tiles that each one passes through, so only the paths that pass through the recomputed tiles are stitched together again. The regions are
+    kept as a tree, with each region the child of the smallest region containing it. The regions whose paths have changed are removed from the tree, and
+    the new regions (along with the children of the removed regions) are inserted by descending the tree from its roots. The regions touching the edges
+    of the grid are closed along the edges again (see discreteregions.close_paths) only when a boundary path ending on the edges has changed.
 
-    :param pathStarts:  The vertices that correspond to the start of each path in paths.
-    :type pathStarts:   list of (x, y) coordinate tuples
-    :param paths:       The vertices that make up each of the paths.
-    :type paths:        dict of lists of (x, y) coordinate tuples
-    :returns :          A mapping from each path starting point to the (x, y) coordinates of the starting points of paths internal to it.
-    :type :             dict
+    The cost of an update is therefore proportional to the area of the tiles that the changes touch, plus the length of the paths passing through those
+    tiles and the number of siblings of the changed regions in the tree (and the number of paths ending on the edges of the grid if one of them has
+    changed). Building the list of regions to plot takes time proportional to the number of regions, but the outer path and holes of each region are
+    only recreated when the region or its children have changed.
 
     """
 
-    # Create the Path objects for all the enclosed areas.
-    boundaries = dict([(i, path.Path(paths[i], [path.Path.MOVETO] + ([path.Path.LINETO] * (len(paths[i]) - 1)))) for i in pathStarts])
-
-    # Determine the paths that are inside each path.
-    nested = {}
-    for i in pathStarts:
-        boundary = boundaries[i]
-        areasContained = [j for j in pathStarts if boundary.contains_path(boundaries[j])]
-        nested[i] = areasContained
-
-    # For each path that contains other paths inside it, determine which of the internal paths need to be marked as internal to it. For example, If there
-    # is a hierarchy such as A contains B which contains C, then determine that although A contains both B and C, only B needs to be marked as internal
-    # (C will be marked as internal to B).
-    remove = {}
-    for i in nested:
-        # Find the fewest areas that cover all areas internal to i. For example, i may have two disjoint areas, A and B, inside it. In turn, A has 1 area
-        # inside it and B has 3 areas inside it. Therefore, i has 5 areas inside it. We are looking to find the smallest number of areas inside i that can
-        # cove all internal areas. In this case it would be A and B, as together they cover all internal areas.
-
-        # First sort i's internal areas by the number of areas they have internal to them (in descending order).
-        internalsSortedBySizeDecreasing = sorted(nested[i], key=lambda x : len(nested[x]), reverse=True)
-        toRemove = set([])  # The minimal set of i's internal areas that can be used to cover all of i's internal areas.
-        included = set([])  # The areas internal to i that have been covered by the areas in toRemove.
-        for j in internalsSortedBySizeDecreasing:
-            if not j in included:
-                # If j has not been included in the set already, then it is a top level area inside i. Therefore, add it to toRemove.
-                toRemove.add(j)
-            # Indicate that j and all the areas inside it have been dealt with.
-            included |= set(nested[j])
-
-        remove[i] = toRemove
-
-    return remove
-
-
-def close_paths(paths, openStartingPoints, startsToEnds, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues):
-    """Close open paths.
-
-    All these boundaries will have both start an ending points on an edge of the figure.
-
-    :param paths:               The vertices that make up each of the paths.
-    :type paths:                dict of lists of (x, y) coordinate tuples
-    :param openStartingPoints:  The starting points of open paths.
-    :type openStartingPoints:   set of (x, y) coordinate tuples
-    :param startsToEnds:        A mapping from starting points of paths to the ending points of the paths
-    :type startsToEnds:         dict
-    :param xCoords:             The x coordinates where the Z values have been evaluated.
-    :type xCoords:              2 dimensional numpy array
-    :param halfDeltaX:          Half the distance between adjacent X coordinate values.
-    :type halfDeltaX:           float
-    :param yCoords:             The y coordinates where the Z values have been evaluated.
-    :type yCoords:              2 dimensional numpy array
-    :param halfDeltaY:          Half the distance between adjacent Y coordinate values.
-    :type halfDeltaY:           float
-    :param zValues:             The z value for each (x,y) pair.
-    :type zValues:              2 dimensional numpy array
-    :returns :                  Mapping from the starting positions to the now closed paths, the interior Z value for each closed path.
-    :type :                     dict mapping (x, y) coordinate tuple to list of tuples, dict mapping (x, y) coordinate tuple to float
+    def __init__(self, xCoords, yCoords, zValues, levels=None, tileSize=32, poolSize=1):
+        """Create a heatmap and compute its boundaries.
+
+        :param xCoords:     The x coordinates where the Z values have been evaluated.
+        :type xCoords:      2 dimensional numpy array
+        :param yCoords:     The y coordinates where the Z values have been evaluated.
+        :type yCoords:      2 dimensional numpy array
+        :param zValues:     The z value for each (x,y) pair.
+        :type zValues:      2 dimensional numpy array
+        :param levels:      The levels at which to discretise the Z values.
+        :type levels:       extendable list like object (or None if the Z values are already discretised)
+        :param tileSize:    The number of squares along each side of the tiles that the (X, Y) grid is split into.
+        :type tileSize:     int
+        :param poolSize:    The number of workers to create in the multiprocessing.Pool process pool used to recompute the tiles.
+        :type poolSize:     int
+
+        """
+
+        self.xCoords = xCoords
+        self.yCoords = yCoords
+        self.levels = levels
+        self.tileSize = tileSize
+        self.poolSize = poolSize
+        self.xMin = xCoords[0, 0]
+        self.halfDeltaX = abs(xCoords[0, 1] - xCoords[0, 0]) / 2  # Half the distance between adjacent X coordinate values.
+        self.yMin = yCoords[0, 0]
+        self.halfDeltaY = abs(yCoords[1, 0] - yCoords[0, 0]) / 2  # Half the distance between adjacent Y coordinate values.
+        self.zValues = np.array(discreteregions.discretise_z_values(zValues, levels))  # The discretised Z values (copied so that they can be updated in place).
+        self.tilePaths = {}  # Mapping from the first row and column of each tile to the paths within the tile (as returned by discreteregions.calc_tile_paths).
+        self.dirtyTiles = set()  # The tiles recomputed since the paths were last stitched together.
+        self.regionsStale = True  # Whether any tiles have been recomputed since the regions were last updated.
+
+        # The stitched together paths.
+        self.paths = []  # The vertices of each path in canonical form, in sorted order.
+        self.pathIds = itertools.count()  # The source of the identifiers of the paths.
+        self.pathVertices = {}  # Mapping from the identifier of each path to its vertices.
+        self.pathSegments = {}  # Mapping from the identifier of each path to the (tile, index of the open path in the tile) pairs that make it up.
+        self.tilesToPathIds = collections.defaultdict(set)  # Mapping from each tile to the identifiers of the paths that pass through it.
+        self.addedPaths = {}  # The paths added since the regions were last updated (keyed by the id of their vertices).
+        self.removedPaths = {}  # The paths removed since the regions were last updated (keyed by the id of their vertices).
+
+        # The regions, identified by the starting points of their paths.
+        self.openPaths = {}  # Mapping from the starting point of each path that ends on the edges of the grid to its vertices.
+        self.perimeterRegions = set()  # The regions enclosed by paths closed along the edges of the grid.
+        self.regionPaths = {}  # Mapping from each region to the vertices of the path enclosing it.
+        self.regionVertices = {}  # Mapping from each region to the vertices of the path enclosing it as an array.
+        self.regionZValues = {}  # Mapping from each region to its Z value.
+        self.regionBoxes = {}  # Mapping from each region to its bounding box (smallest x, smallest y, largest x, largest y).
+        self.regionAreas = {}  # Mapping from each region to its area.
+        self.regionPoints = {}  # Mapping from each region to a point in its interior (see discreteregions.calc_interior_point).
+        self.regionParents = {}  # Mapping from each region to the smallest region containing it (or None if it is not contained in another region).
+        self.regionChildren = {None: set()}  # Mapping from each region (and None) to the regions that it directly contains.
+        self.childArrays = {}  # Mapping from regions (and None) to their children, and the bounding boxes and areas of their children as arrays.
+        self.regionStarts = []  # The regions in sorted order.
+        self.regionOutputs = {}  # Mapping from each region to its outer path, holes and Z value (as returned by discreteregions.calc_regions).
+        self.staleOutputs = set()  # The regions whose outputs need to be recreated.
+
+        self.update_tiles(list(discreteregions.generate_tiles(self.zValues.shape[0], self.zValues.shape[1], tileSize, tileSize)))
+
+
+    def add_region(self, regionStart, regionPath, regionZValue):
+        """Record a region without placing it in the tree of regions.
+
+        :param regionStart:     The starting point of the path enclosing the region.
+        :type regionStart:      (x, y) coordinate tuple
+        :param regionPath:      The vertices of the path enclosing the region.
+        :type regionPath:       list of (x, y) coordinate tuples
+        :param regionZValue:    The Z value of the region.
+        :type regionZValue:     int or float
+
+        """
+
+        vertices = np.array(regionPath, dtype=float)
+        self.regionPaths[regionStart] = regionPath
+        self.regionVertices[regionStart] = vertices
+        self.regionZValues[regionStart] = regionZValue
+        self.regionBoxes[regionStart] = np.concatenate([vertices.min(axis=0), vertices.max(axis=0)])
+        self.regionAreas[regionStart] = abs(discreteregions.calc_signed_area(vertices))
+        self.regionPoints[regionStart] = discreteregions.calc_interior_point(regionPath, self.xMin, self.halfDeltaX, self.yMin, self.halfDeltaY)
+        self.regionChildren[regionStart] = set()
+        bisect.insort(self.regionStarts, regionStart)
+
+
+    def find_contained_regions(self, regionStart, parent):
+        """Find the regions directly contained in a region's parent that are inside the region.
+
+        :param regionStart:     The region.
+        :type regionStart:      (x, y) coordinate tuple
+        :param parent:          The parent of the region.
+        :type parent:           (x, y) coordinate tuple (or None if the region has no parent)
+        :returns :              The children of the parent that are inside the region.
+        :type :                 list of (x, y) coordinate tuples
+
+        """
+
+        children, boxes, areas = self.get_child_arrays(parent)
+        box = self.regionBoxes[regionStart]
+        possible = np.flatnonzero((boxes[:, 0] >= box[0]) & (boxes[:, 1] >= box[1]) & (boxes[:, 2] <= box[2]) & (boxes[:, 3] <= box[3]) &
+                                  (areas < self.regionAreas[regionStart]))
+        return [children[i] for i in possible.tolist()
+                if children[i] != regionStart and discreteregions.test_inside(self.regionPoints[children[i]], self.regionVertices[regionStart])]
+
+
+    def find_parent_region(self, regionStart, ancestor=None):
+        """Find the smallest region in the tree of regions that contains a region.
+
+        :param regionStart:     The region.
+        :type regionStart:      (x, y) coordinate tuple
+        :param ancestor:        A region in the tree known to contain the region.
+        :type ancestor:         (x, y) coordinate tuple (or None to search the whole tree)
+        :returns :              The smallest region containing the region.
+        :type :                 (x, y) coordinate tuple (or None if no region in the tree contains it)
+
+        """
+
+        parent = ancestor
+        box = self.regionBoxes[regionStart]
+        while True:
+            # The regions directly contained in the same region do not overlap, so at most one of them contains the region.
+            children, boxes, areas = self.get_child_arrays(parent)
+            possible = np.flatnonzero((boxes[:, 0] <= box[0]) & (boxes[:, 1] <= box[1]) & (boxes[:, 2] >= box[2]) & (boxes[:, 3] >= box[3]) &
+                                      (areas > self.regionAreas[regionStart]))
+            for i in possible[np.argsort(areas[possible], kind='stable')].tolist():
+                if discreteregions.test_inside(self.regionPoints[regionStart], self.regionVertices[children[i]]):
+                    parent = children[i]
+                    break
+            else:
+                return parent
 
-    """
 
-    # Determine boundaries of the (X,Y) grid.
-    xMin = xCoords.min()
-    xMax = xCoords.max()
-    deltaX = abs(np.ediff1d([xCoords[0,0], xCoords[0,1]]))[0]  # The distance between adjacent X coordinate values.
-    yMin = yCoords.min()
-    yMax = yCoords.max()
-    deltaY = abs(np.ediff1d([yCoords[0,0], yCoords[1,0]]))[0]  # The distance between adjacent Y coordinate values.
-
-    # Setup the return values.
-    newPaths = {}  # Altered paths that have been closed.
-    pathStartToZValue = {}  # Mappings from the starting points of paths to the Z value of the interior of the path.
-
-    # First close paths that start and end on the same figure edge. These are paths that just form loops on one edge of te figure.
-    closedStartPoints = set([])
-    for i in openStartingPoints:
-        currentPath = [j for j in paths[i]]
-        startXCoord = i[0]
-        startYCoord = i[1]
-        endOfPath = currentPath[-1]
-        endXCoord = endOfPath[0]
-        endYCoord = endOfPath[1]
-        if (startXCoord == endXCoord) or (startYCoord == endYCoord):
-            # The path starts and ends on the same edge.
-            currentPath.append(i)
-            pathIsCCW, areaZValue = test_clockwise(currentPath, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues)
-            if pathIsCCW:
-                # If the path is counter-clockwise, then record the path and its associated Z value.
-                pathStartToZValue[i] = areaZValue
-                newPaths[i] = currentPath
-                closedStartPoints.add(i)
-    openStartingPoints -= closedStartPoints
-
-    # Next close paths that start and end on different edges of the figure.
-    while openStartingPoints:
-        currentStartingPoint = openStartingPoints.pop()
-        currentPath = [i for i in paths[currentStartingPoint]]
-
-        # Travel around the edges of the figure in a CCW motion to close the path. The current movement of the figure is determined in both the X and Y
-        # directions. There are four possible general locations for the current position being examined: A) left edge, B) bottom, C) right, or D) top.
-        # The changes in the current position that should take place for each case are:
-        # A) the X value of the current position should not change and the Y should decrease.
-        # B) the X value of the current position should increase and the Y should not change.
-        # C) the X value of the current position should not change and the Y should increase.
-        # D) the X value of the current position should decrease and the Y should not change.
-        # Determine the current position and the changes in the X and Y values that are needed.
-        currentPosition = currentPath[-1]
-        currentXMovement = 0 if (np.allclose([currentPosition[0]], [xMax]) or np.allclose([currentPosition[0]], [xMin])) else (deltaX if np.allclose([currentPosition[1]], [yMin]) else -deltaX)
-        currentYMovement = 0 if (np.allclose([currentPosition[1]], [yMax]) or np.allclose([currentPosition[1]], [yMin])) else (deltaY if np.allclose([currentPosition[0]], [xMax]) else -deltaY)
-        while not np.allclose([currentPosition], [currentStartingPoint]):
-            # Loop until the starting position of the path is reached.
-
-            # Update the current position being examined.
-            currentPosition = (currentPosition[0] + currentXMovement, currentPosition[1] + currentYMovement)
-
-            # If the current position is the start of another path, then append the paths together as they must be part of the same area boundary.
-            # As this may take the current position onto another edge of the figure, update the X and Y movements.
-            otherPathStart = [i for i in openStartingPoints if np.allclose([currentPosition], [i])]
-            if otherPathStart:
-                currentPosition = otherPathStart[0]
-                openStartingPoints -= set([currentPosition])
-                currentPath.extend(paths[currentPosition])
-                currentPosition = paths[currentPosition][-1]
-                currentXMovement = 0 if (np.allclose([currentPosition[0]], [xMax]) or np.allclose([currentPosition[0]], [xMin])) else (deltaX if np.allclose([currentPosition[1]], [yMin]) else -deltaX)
-                currentYMovement = 0 if (np.allclose([currentPosition[1]], [yMax]) or np.allclose([currentPosition[1]], [yMin])) else (deltaY if np.allclose([currentPosition[0]], [xMax]) else -deltaY)
-
-            # Determine if the currentXMovement and currentYMovement need updating.
-            if np.allclose([currentPosition[0]], [xMax + halfDeltaX]):
-                # Gone past the rightmost edge of the figure while travelling along the bottom edge of the figure.
-                currentPath.append((xMax, yMin))  # Add the bottom right corner to the path
-                currentPosition = (xMax, yMin + halfDeltaY)  # Go up a half step from the bottom right corner.
-                currentPath.append(currentPosition)  # Add the new point.
-                # Now travelling upwards along the rightmost edge.
-                currentXMovement = 0
-                currentYMovement = deltaY
-            elif np.allclose([currentPosition[0]], [xMin - halfDeltaX]):
-                # Gone past the leftmost edge of the figure while travelling along the top edge of the figure.
-                currentPath.append((xMin, yMax))  # Add the top left corner to the path
-                currentPosition = (xMin, yMax - halfDeltaY)  # Go down a half step from the top left corner.
-                currentPath.append(currentPosition)  # Add the new point.
-                # Now travelling downwards along the leftmost edge.
-                currentXMovement = 0
-                currentYMovement = -deltaY
-            elif np.allclose([currentPosition[1]], [yMax + halfDeltaY]):
-                # Gone past the top edge of the figure while travelling along the rightmost edge of the figure.
-                currentPath.append((xMax, yMax))  # Add the top right corner to the path
-                currentPosition = (xMax - halfDeltaX, yMax)  # Go left a half step from the top right corner.
-                currentPath.append(currentPosition)  # Add the new point.
-                # Now travelling leftwards along the top edge.
-                currentXMovement = -deltaX
-                currentYMovement = 0
-            elif np.allclose([currentPosition[1]], [yMin - halfDeltaY]):
-                # Gone past the bottom edge of the figure while travelling along the leftmost edge of the figure.
-                currentPath.append((xMin, yMin))  # Add the bottom left corner to the path
-                currentPosition = (xMin + halfDeltaX, yMin)  # Go right a half step from the bottom left corner.
-                currentPath.append(currentPosition)  # Add the new point.
-                # Now travelling rightwards along the bottom edge.
-                currentXMovement = deltaX
-                currentYMovement = 0
-
-        # Close the path now that the starting point has been reached.
-        currentPath.append(currentStartingPoint)
-
-        # Determine the Z value of the area enclosed by the path (this is the Z value of the point on the (X,Y) grid one half step CW from the starting point.
-        if np.allclose([currentStartingPoint[0]], [xMin]):
-            # Starting point is on the leftmost edge of the figure.
-            pointToCheck = (currentStartingPoint[0], currentStartingPoint[1] + halfDeltaY)
-        elif np.allclose([currentStartingPoint[0]], [xMax]):
-            # Starting point is on the rightmost edge of the figure.
-            pointToCheck = (currentStartingPoint[0], currentStartingPoint[1] - halfDeltaY)
-        elif np.allclose([currentStartingPoint[1]], [yMin]):
-            # Starting point is on the bottommost edge of the figure.
-            pointToCheck = (currentStartingPoint[0] - halfDeltaX, currentStartingPoint[1])
-        else:  # if np.allclose([currentStartingPoint[1]], [yMax])
-            # Starting point is on the topmost edge of the figure.
-            pointToCheck = (currentStartingPoint[0] + halfDeltaX, currentStartingPoint[1])
-        indexY = np.where(xCoords.round(6) == np.around(pointToCheck[0], 6))[1][0]
-        indexX = np.where(yCoords.round(6) == np.around(pointToCheck[1], 6))[0][0]
-        areaZValue = zValues[indexX, indexY]
-
-        # Record the path and Z value information for the starting point.
-        pathStartToZValue[currentStartingPoint] = areaZValue
-        newPaths[currentStartingPoint] = currentPath
-
-    return newPaths, pathStartToZValue
-
-
-def test_clockwise(pathVertices, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues):
-    """Test whether a path is counter-clockwise.
-
-    Can be used with open paths, but is not guaranteed to return the correct result.
-
-    :param pathVertices:    The vertices that make up the path.
-    :type pathVertices:     list of (x, y) coordinate tuples
-    :param xCoords:         The x coordinates where the Z values have been evaluated.
-    :type xCoords:          2 dimensional numpy array
-    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
-    :type halfDeltaX:       float
-    :param yCoords:         The y coordinates where the Z values have been evaluated.
-    :type yCoords:          2 dimensional numpy array
-    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
-    :type halfDeltaY:       float
+    def get_child_arrays(self, parent):
+        """Get the regions directly contained in a region, along with their bounding boxes and areas as arrays.
+
+        :param parent:  The region.
+        :type parent:   (x, y) coordinate tuple (or None for the regions not contained in another region)
+        :returns :      The children of the region, their bounding boxes and their areas.
+        :type :         list of (x, y) coordinate tuples, 2 dimensional numpy array with one row per child, 1 dimensional numpy array
+
+        """
+
+        if parent not in self.childArrays:
+            children = sorted(self.regionChildren[parent])
+            self.childArrays[parent] = (children, np.array([self.regionBoxes[i] for i in children], dtype=float).reshape(-1, 4),
+                                        np.array([self.regionAreas[i] for i in children], dtype=float))
+        return self.childArrays[parent]
+
+
+    def get_paths(self):
+        """Get the boundary paths of the heatmap.
+
+        :returns :  The vertices of each path in canonical form (see discreteregions.canonicalise_paths).
+        :type :     list of lists of (x, y) coordinate tuples
+
+        """
+
+        if self.dirtyTiles:
+            self.stitch_dirty_tiles()
+        return self.paths
+
+
+    def get_regions(self):
+        """Get the regions of the heatmap.
+
+        :returns :  The vertices of the outer path, the vertices of the paths of the holes and the Z value of each region (see
+                    discreteregions.calc_regions).
+        :type :     list of (list of (x, y) coordinate tuples, list of lists of (x, y) coordinate tuples, Z value) tuples
+
+        """
+
+        self.get_paths()
+        if self.regionsStale:
+            self.update_regions()
+        for i in self.staleOutputs:
+            self.regionOutputs[i] = (self.regionPaths[i], [self.regionPaths[j][::-1] for j in sorted(self.regionChildren[i])], self.regionZValues[i])
+        self.staleOutputs = set()
+        return [self.regionOutputs[i] for i in self.regionStarts]
+
+
+    def insert_region(self, regionStart, ancestor=None):
+        """Place a region in the tree of regions.
+
+        The regions directly contained in the parent of the region that are inside the region are moved to be directly contained in the region.
+
+        :param regionStart:     The region.
+        :type regionStart:      (x, y) coordinate tuple
+        :param ancestor:        A region in the tree known to contain the region.
+        :type ancestor:         (x, y) coordinate tuple (or None to search the whole tree)
+
+        """
+
+        parent = self.find_parent_region(regionStart, ancestor)
+        for i in self.find_contained_regions(regionStart, parent):
+            self.set_parent(i, regionStart)
+        self.set_parent(regionStart, parent)
+
+
+    def plot(self, **kwargs):
+        """Plot the heatmap using the boundaries and regions already computed.
+
+        :param kwargs:  Keyword arguments for main (other than levels, tileSize, poolSize and heatmap).
+        :type kwargs:   dict
+        :returns :      The value returned by main.
+        :type :         objects of type matplotlib.figure.Figure, matplotlib.axes.Axes (or None if the figure was saved)
+
+        """
+
+        return main(self.xCoords, self.yCoords, self.zValues, heatmap=self, **kwargs)
+
+
+    def remove_region(self, regionStart):
+        """Remove a region from the tree of regions.
+
+        :param regionStart:     The region.
+        :type regionStart:      (x, y) coordinate tuple
+        :returns :              The regions that the region directly contained (which are left without a parent).
+        :type :                 set of (x, y) coordinate tuples
+
+        """
+
+        self.set_parent(regionStart, None, False)
+        for i in [self.regionPaths, self.regionVertices, self.regionZValues, self.regionBoxes, self.regionAreas, self.regionPoints, self.regionParents]:
+            del i[regionStart]
+        self.regionOutputs.pop(regionStart, None)
+        self.staleOutputs.discard(regionStart)
+        del self.regionStarts[bisect.bisect_left(self.regionStarts, regionStart)]
+        self.childArrays.pop(regionStart, None)
+        orphans = self.regionChildren.pop(regionStart)
+        for i in orphans:
+            self.regionParents[i] = None
+        return orphans
+
+
+    def set_parent(self, regionStart, parent, attach=True):
+        """Move a region to be directly contained in another region.
+
+        :param regionStart:     The region.
+        :type regionStart:      (x, y) coordinate tuple
+        :param parent:          The region to move it to.
+        :type parent:           (x, y) coordinate tuple (or None if the region is not contained in another region)
+        :param attach:          Whether to attach the region to its new parent (or only detach it from its current parent).
+        :type attach:           boolean
+
+        """
+
+        # Detach the region from its current parent.
+        if regionStart in self.regionParents:
+            oldParent = self.regionParents[regionStart]
+            if oldParent in self.regionChildren and regionStart in self.regionChildren[oldParent]:
+                self.regionChildren[oldParent].discard(regionStart)
+                if oldParent in self.childArrays:
+                    children, boxes, areas = self.childArrays[oldParent]
+                    index = children.index(regionStart)
+                    self.childArrays[oldParent] = (children[:index] + children[index + 1:], np.delete(boxes, index, axis=0), np.delete(areas, index))
+                if oldParent is not None:
+                    self.staleOutputs.add(oldParent)
+        if not attach:
+            return
+
+        # Attach the region to its new parent.
+        self.regionParents[regionStart] = parent
+        self.regionChildren[parent].add(regionStart)
+        if parent in self.childArrays:
+            children, boxes, areas = self.childArrays[parent]
+            self.childArrays[parent] = (children + [regionStart], np.vstack([boxes, self.regionBoxes[regionStart]]),
+                                        np.append(areas, self.regionAreas[regionStart]))
+        self.staleOutputs.add(regionStart)
+        if parent is not None:
+            self.staleOutputs.add(parent)
+
+
+    def stitch_dirty_tiles(self):
+        """Stitch together the paths passing through the tiles recomputed since the paths were last stitched together.
+
+        Each stitched path is the chain of open paths from the tiles where each ends at the start of the next. The paths passing through the recomputed
+        tiles are removed, and the open paths from the other tiles that made them up are stitched together again with the open paths from the recomputed
+        tiles.
+
+        """
+
+        # Remove the paths passing through the dirty tiles, keeping the parts of them in the other tiles.
+        segments = []  # The (tile, index of the open path in the tile) pairs to stitch together.
+        for pathId in set().union(*[self.tilesToPathIds.pop(i, set()) for i in self.dirtyTiles]):
+            vertices = self.pathVertices.pop(pathId)
+            del self.paths[bisect.bisect_left(self.paths, vertices)]
+            if self.addedPaths.pop(id(vertices), None) is None:
+                self.removedPaths[id(vertices)] = vertices
+            for tile, index in self.pathSegments.pop(pathId):
+                if tile not in self.dirtyTiles:
+                    self.tilesToPathIds[tile].discard(pathId)
+                    segments.append((tile, index))
+
+        # Add the paths closed within the dirty tiles, and the open paths from them.
+        newPaths = []  # The vertices of the new paths along with the segments that make them up.
+        for tile in self.dirtyTiles:
+            tileClosedPaths, tileOpenPaths = self.tilePaths[tile]
+            newPaths.extend([(list(i), [(tile, None)]) for i in tileClosedPaths])
+            segments.extend([(tile, i) for i in range(len(tileOpenPaths))])
+
+        # Follow the chains of segments. Chains that start on the edges of the grid are followed first, and the segments left form closed chains.
+        segmentsByStart = dict([(self.tilePaths[i][1][j][0], (i, j)) for i, j in segments])
+        endKeys = set([self.tilePaths[i][1][j][2] for i, j in segments])
+        chainStarts = [i for i in segments if self.tilePaths[i[0]][1][i[1]][0] ^ 1 not in endKeys] + segments
+        visited = set()
+        for i in chainStarts:
+            if i in visited:
+                continue
+            chain = []
+            vertices = list(self.tilePaths[i[0]][1][i[1]][1])
+            while i is not None and i not in visited:
+                visited.add(i)
+                chain.append(i)
+                if len(chain) > 1:
+                    vertices.extend(self.tilePaths[i[0]][1][i[1]][1][1:])
+                i = segmentsByStart.get(self.tilePaths[i[0]][1][i[1]][2] ^ 1)
+            newPaths.append((vertices, chain))
+
+        # Record the new paths in canonical form.
+        discreteregions.rotate_closed_paths([i for i, _ in newPaths], self.xMin, self.halfDeltaX, self.yMin, self.halfDeltaY)
+        for vertices, chain in newPaths:
+            pathId = next(self.pathIds)
+            self.pathVertices[pathId] = vertices
+            self.pathSegments[pathId] = chain
+            for tile in set([j for j, _ in chain]):
+                self.tilesToPathIds[tile].add(pathId)
+            bisect.insort(self.paths, vertices)
+            self.addedPaths[id(vertices)] = vertices
+        self.dirtyTiles = set()
+
+
+    def update(self, zValues, bounds=None):
+        """Update the Z values, recomputing the boundaries of only the tiles where the discretised Z values have changed.
+
+        :param zValues:     The new Z values of the (X, Y) grid, or of the part of it given by bounds.
+        :type zValues:      2 dimensional numpy array
+        :param bounds:      The first row, last row + 1, first column and last column + 1 of the part of the grid that zValues covers.
+        :type bounds:       (int, int, int, int) tuple (or None if zValues covers the whole grid)
+
+        """
+
+        # Determine the points whose discretised Z values have changed.
+        numberOfRows, numberOfCols = self.zValues.shape
+        rowStart, rowEnd, colStart, colEnd = bounds or (0, numberOfRows, 0, numberOfCols)
+        newZValues = discreteregions.discretise_z_values(np.asarray(zValues), self.levels)
+        changedRows, changedCols = np.nonzero(newZValues != self.zValues[rowStart:rowEnd, colStart:colEnd])
+        if changedRows.size == 0:
+            return
+        self.zValues[rowStart:rowEnd, colStart:colEnd] = newZValues
+        changedRows += rowStart
+        changedCols += colStart
+
+        # Determine the tiles containing the (up to four) squares that each changed point is a corner of.
+        dirtyTiles = set()
+        for i in (-1, 0):
+            for j in (-1, 0):
+                tileRows = np.clip(changedRows + i, 0, max(numberOfRows - 2, 0)) // self.tileSize
+                tileCols = np.clip(changedCols + j, 0, max(numberOfCols - 2, 0)) // self.tileSize
+                dirtyTiles.update(zip(tileRows.tolist(), tileCols.tolist()))
+        tiles = [(i * self.tileSize, min(((i + 1) * self.tileSize) + 1, numberOfRows), j * self.tileSize, min(((j + 1) * self.tileSize) + 1, numberOfCols))
+                 for i, j in sorted(dirtyTiles)]
+        self.update_tiles(tiles)
+
+
+    def update_regions(self):
+        """Update the regions to match the paths added and removed since the regions were last updated."""
+
+        # Determine the regions enclosed by the closed paths that have been removed and added. Only the counter-clockwise paths enclose regions.
+        removedRegions = set()
+        addedRegions = {}  # Mapping from the new regions to their paths and Z values.
+        for vertices in self.removedPaths.values():
+            if vertices[0] != vertices[-1]:
+                del self.openPaths[vertices[0]]
+            elif vertices[0] in self.regionPaths:
+                removedRegions.add(vertices[0])
+        for vertices in self.addedPaths.values():
+            if vertices[0] != vertices[-1]:
+                self.openPaths[vertices[0]] = vertices
+            else:
+                pathIsCCW, areaZValue = discreteregions.test_clockwise(vertices, self.xMin, self.halfDeltaX, self.yMin, self.halfDeltaY, self.zValues)
+                if pathIsCCW:
+                    addedRegions[vertices[0]] = (vertices, areaZValue)
+
+        # Close the paths that end on the edges of the grid again if any of them have changed. If there are none, then the region touching the edges is
+        # enclosed by the edges themselves, and its Z value may have changed without any path changing.
+        changedPaths = list(self.removedPaths.values()) + list(self.addedPaths.values())
+        perimeterChanged = not self.regionStarts or not self.openPaths or any([i[0] != i[-1] for i in changedPaths])
+        if perimeterChanged:
+            closedPaths, pathStartToZValue = discreteregions.close_paths(self.openPaths, set(self.openPaths), dict([(i, j[-1]) for i, j in self.openPaths.items()]),
+                                                                         self.xCoords, self.halfDeltaX, self.yCoords, self.halfDeltaY, self.zValues)
+            for i in self.perimeterRegions:
+                if i not in closedPaths or closedPaths[i] != self.regionPaths[i] or pathStartToZValue[i] != self.regionZValues[i]:
+                    removedRegions.add(i)
+            for i in closedPaths:
+                if i in removedRegions or i not in self.perimeterRegions:
+                    addedRegions[i] = (closedPaths[i], pathStartToZValue[i])
+            self.perimeterRegions = set(closedPaths)
+        self.addedPaths = {}
+        self.removedPaths = {}
+        self.regionsStale = False
+
+        if not self.regionParents:
+            # Build the tree of regions all at once (see discreteregions.calc_area_hierarchy).
+            for i, (j, k) in addedRegions.items():
+                self.add_region(i, j, k)
+            hierarchy = discreteregions.calc_area_hierarchy(self.regionStarts, self.regionPaths, self.xMin, self.halfDeltaX, self.yMin, self.halfDeltaY)
+            for i in self.regionStarts:
+                self.regionParents.setdefault(i, None)
+                self.regionChildren[i] = hierarchy[i]
+                self.staleOutputs.add(i)
+                for j in hierarchy[i]:
+                    self.regionParents[j] = i
+            self.regionChildren[None] = set([i for i in self.regionStarts if self.regionParents[i] is None])
+            self.childArrays = {}
+            return
+
+        # Remove the old regions, and insert the new regions and the regions left without a parent from the largest to the smallest (so that the parent
+        # of each region is in the tree when the region is inserted).
+        # The regions left without a parent are still inside the closest ancestor of their old parent that has not been removed, so the search for
+        # their new parent starts there.
+        ancestors = {}
+        for i in removedRegions:
+            ancestor = self.regionParents[i]
+            while ancestor in removedRegions:
+                ancestor = self.regionParents[ancestor]
+            for j in self.regionChildren[i] - removedRegions:
+                ancestors[j] = ancestor
+        for i in removedRegions:
+            self.remove_region(i)
+        for i, (j, k) in addedRegions.items():
+            self.add_region(i, j, k)
+        for i in sorted(set(ancestors) | set(addedRegions), key=lambda i: (-self.regionAreas[i], i)):
+            self.insert_region(i, ancestors.get(i))
+
+
+    def update_tiles(self, tiles):
+        """Recompute the boundary paths within tiles.
+
+        :param tiles:   The first row, last row + 1, first column and last column + 1 of each tile to recompute.
+        :type tiles:    list of (int, int, int, int) tuples
+
+        """
+
+        tilePaths = discreteregions.calc_tile_paths(self.zValues, None, self.xCoords, self.halfDeltaX, self.yCoords, self.halfDeltaY, tiles, self.poolSize)
+        for i, j in zip(tiles, tilePaths):
+            self.tilePaths[(i[0], i[2])] = j
+            self.dirtyTiles.add((i[0], i[2]))
+        self.regionsStale = True
+
+
+def calc_fill_image(zValues, uniqueZValues, colorMapping, alpha, levels=None, tileSize=None):
+    """Convert the Z values to an image with the color of each Z value.
+
+    If levels is given along with tileSize, then the Z values are discretised one tile at a time as the image is filled in.
+
     :param zValues:         The z value for each (x,y) pair.
     :type zValues:          2 dimensional numpy array
-    :returns :              Whether the path s counter-clockwise, and the Z value of the interior of the path.
-    :type :                 boolean, float
+    :param uniqueZValues:   The distinct (discretised) Z values in ascending order.
+    :type uniqueZValues:    list
+    :param colorMapping:    A mapping from distinct Z values to their RGB color value.
+    :type colorMapping:     dict
+    :param alpha:           The alpha value for the colors.
+    :type alpha:            float between 0 and 1
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :param tileSize:        The number of squares along each side of the tiles that the Z values are discretised in.
+    :type tileSize:         int (or None if the whole grid should be discretised at once)
+    :returns :              The RGBA color of each (x,y) pair.
+    :type :                 3 dimensional numpy array
+
+    """
+
+    palette = mcolors.to_rgba_array([colorMapping[i] for i in uniqueZValues])
+    palette[:, 3] *= alpha
+    uniqueZValues = np.asarray(uniqueZValues)
+    if not (levels and tileSize):
+        return palette[np.searchsorted(uniqueZValues, discreteregions.discretise_z_values(np.asarray(zValues), levels))]
+    fillImage = np.empty(zValues.shape + (4,))
+    for rowStart, rowEnd, colStart, colEnd in discreteregions.generate_tiles(zValues.shape[0], zValues.shape[1], tileSize, tileSize):
+        tileZValues = discreteregions.discretise_z_values(np.asarray(zValues[rowStart:rowEnd, colStart:colEnd]), levels)
+        fillImage[rowStart:rowEnd, colStart:colEnd] = palette[np.searchsorted(uniqueZValues, tileZValues)]
+    return fillImage
+
+
+def create_compound_path(pathsToJoin):
+    """Join paths together into a single compound path.
+
+    Each path begins a new subpath of the compound path, so the paths are not connected to one another when drawn.
+
+    :param pathsToJoin:     The vertices that make up each of the paths.
+    :type pathsToJoin:      list of lists of (x, y) coordinate tuples
+    :returns :              The compound path.
+    :type :                 matplotlib.path.Path
+
+    """
+
+    pathLengths = np.array([len(i) for i in pathsToJoin], dtype=np.int64)
+    pathStarts = np.cumsum(pathLengths) - pathLengths
+    vertices = np.array([j for i in pathsToJoin for j in i], dtype=float).reshape(-1, 2)
+    codes = np.full(len(vertices), path.Path.LINETO, dtype=path.Path.code_type)
+    codes[pathStarts[pathLengths > 0]] = path.Path.MOVETO
+    return path.Path(vertices, codes)
+
+
+def discretise_tiles(zValues, levels, tileSize=None):
+    """Discretise the Z values of a grid one tile at a time.
+
+    :param zValues:     The z value for each (x,y) pair.
+    :type zValues:      2 dimensional numpy array
+    :param levels:      The levels at which to discretise the Z values.
+    :type levels:       extendable list like object (or None if the Z values are already discretised)
+    :param tileSize:    The number of squares along each side of the tiles that the Z values are discretised in.
+    :type tileSize:     int (or None if the whole grid should be discretised at once)
+    :returns :          The discretised Z values.
+    :type :             2 dimensional numpy array
 
     """
 
-    # Create the path object from the vertices.
-    codes = [path.Path.MOVETO] + ([path.Path.LINETO] * (len(pathVertices) - 1))
-    boundary = path.Path(pathVertices, codes)
-
-    # Determine the endpoints of the first line segment of the path.
-    firstSegmentStartX = pathVertices[0][0]
-    firstSegmentStartY = pathVertices[0][1]
-    firstSegmentEndX = pathVertices[1][0]
-    firstSegmentEndY = pathVertices[1][1]
-
-    # Determine the direction that the first line segment goes, and where is starts on the (X, Y) gridlines.
-    # If the (X, Y) grid contains all x values in [0, 1] and all Y values in [0, 1], then halfDeltaX and halfDeltaY would be 0.5. Therefore,
-    # the grid would be like:
-    # (0,0)    (1,0)
-    #
-    # (0,1)    (1,1)
-    # and the first line segment could start at A) (0, 0.5), B) (0.5, 1), C) (1, 0.5), or D) (0.5, 0).
-    # A and C are on the X gridlines, while B and D are on the Y gridlines.
-    verticalLine = firstSegmentStartX == firstSegmentEndX   # The fist line segment is vertical.
-    horzontalLine = firstSegmentStartY == firstSegmentEndY  # The fist line segment is horizontal.
-    up = firstSegmentStartY < firstSegmentEndY              # The fist line segment goes up (not necessarily vertical).
-    down = firstSegmentStartY > firstSegmentEndY            # The fist line segment goes down (not necessarily vertical).
-    left = firstSegmentStartX > firstSegmentEndX            # The fist line segment goes left (not necessarily horizontal).
-    right = firstSegmentStartX < firstSegmentEndX           # The fist line segment goes right (not necessarily horizontal).
-    onXGrid = np.where(xCoords == firstSegmentStartX)[0].size > 0  # True if the first line segment starts on a line on the X grid.
-    onYGrid = np.where(yCoords == firstSegmentStartY)[0].size > 0  # True if the first line segment starts on a line on the Y grid.
-
-    # A path will only be counter-clockwise if a specific point is in the interior of the path. This specific point depends on the direction that
-    # the first line segment of the path goes, and is based on the splitting of the meshgrid into individual squares that have been evaluated separately.
-    pointToCheck = None  # The point that should be checked to determine the Z value of the interior of the path.
-    CCW = True  # Whether the path is counter-clockwise.
-    if verticalLine and up:
-        # If the first line segment goes vertically up, then it divides the square into a left and right. The two points that make up the left corners
-        # of the square must be inside the path if it is to be counter-clockwise.
-        pointToCheck = (firstSegmentStartX - halfDeltaX, firstSegmentStartY)  # The bottom left corner of the square.
-    elif verticalLine and down:
-        # If the first line segment goes vertically down, then it divides the square into a left and right. The two points that make up the right corners
-        # of the square must be inside the path if it is to be counter-clockwise.
-        pointToCheck = (firstSegmentStartX + halfDeltaX, firstSegmentStartY)  # The top right corner of the square.
-    elif horzontalLine and left:
-        # If the first line segment goes horizontal and left, then it divides the square into a top and bottom. The two points that make up the bottom corners
-        # of the square must be inside the path if it is to be counter-clockwise.
-        pointToCheck = (firstSegmentStartX, firstSegmentStartY - halfDeltaY)  # The bottom right corner of the square.
-    elif horzontalLine and right:
-        # If the first line segment goes horizontal and right, then it divides the square into a top and bottom. The two points that make up the top corners
-        # of the square must be inside the path if it is to be counter-clockwise.
-        pointToCheck = (firstSegmentStartX, firstSegmentStartY + halfDeltaY)  # The top left corner of the square.
-    elif onYGrid and up:
-        # If the first line segment starts on the Y grid lines and goes upwards, then it begins in middle of the bottom edge of the square, and goes either
-        # up to the middle of the left edge or up to the middle of the right edge. The square therefore looks as follows:
-        # X  X
-        # \  /
-        # P\/X
-        # In order for the path to be counter-clockwise, point P must be on the interior of the path.
-        pointToCheck = (firstSegmentStartX - halfDeltaX, firstSegmentStartY)  # Point P on the square.
-    elif onYGrid and down:
-        # If the first line segment starts on the Y grid lines and goes down, then it begins in middle of the top edge of the square, and goes either
-        # down to the middle of the left edge or down to the middle of the right edge. The square therefore looks as follows:
-        # X/\P
-        # /  \
-        # X  X
-        # In order for the path to be counter-clockwise, point P must be on the interior of the path.
-        pointToCheck = (firstSegmentStartX + halfDeltaX, firstSegmentStartY)  # Point P on the square.
-    elif right:  # and onXGrid
-        # If the first line segment starts on the X grid lines and goes right, then it begins in middle of the left edge of the square, and goes either
-        # down to the middle of the bottom edge or up to the middle of the top edge. The square therefore looks as follows:
-        # P/  X
-        # /
-        # \
-        # X\  X
-        # In order for the path to be counter-clockwise, point P must be on the interior of the path.
-        pointToCheck = (firstSegmentStartX, firstSegmentStartY + halfDeltaY)  # Point P on the square.
-    else:  # left and onXGrid
-        # If the first line segment starts on the X grid lines and goes left, then it begins in middle of the right edge of the square, and goes either
-        # down to the middle of the bottom edge or up to the middle of the top edge. The square therefore looks as follows:
-        # X  \X
-        #     \
-        #     /
-        # X  /P
-        # In order for the path to be counter-clockwise, point P must be on the interior of the path.
-        pointToCheck = (firstSegmentStartX, firstSegmentStartY - halfDeltaY)  # Point P on the square.
-
-    # Inflate the path slightly when checking whether pointToCheck is inside the path as pointToCheck might be on the edge of the path (only if pointToCheck
-    # is on the maximum value of the X or Y gridlines and the path therefore goes along the edge of the figure), as any point directly on the boundary of a
-    # path does not count as inside the path. The inflation amount is small enough to not allow any points on the meshgrid that should not be inside the path
-    # to be counted as inside it.
-    CCW = boundary.contains_point(pointToCheck, radius=min(halfDeltaX, halfDeltaY) / 2)
-
-    if not CCW:
-        # The path is not counter-clockwise.
-        return False, 'none'
-
-    # Get the Z value of the interior of a counter-clockwise path. This is the Z value of the point on the (X, Y) at pointToCheck.
-    # Rounding is used in order to accurately compare floating point numbers.
-    indexY = np.where(xCoords.round(6) == np.around(pointToCheck[0], 6))[1][0]
-    indexX = np.where(yCoords.round(6) == np.around(pointToCheck[1], 6))[0][0]
-    return True, zValues[indexX, indexY]
\ No newline at end of file
+    if not (levels and tileSize):
+        return discreteregions.discretise_z_values(zValues, levels)
+    discretisedZValues = np.empty(zValues.shape, dtype=np.int64)
+    for rowStart, rowEnd, colStart, colEnd in discreteregions.generate_tiles(zValues.shape[0], zValues.shape[1], tileSize, tileSize):
+        discretisedZValues[rowStart:rowEnd, colStart:colEnd] = discreteregions.discretise_z_values(np.asarray(zValues[rowStart:rowEnd, colStart:colEnd]),
+                                                                                                  levels)
+    return discretisedZValues
@@ -0,0 +1,262 @@
+import argparse
+import gc
+import json
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import platform
+import sys
+import time
+import tracemalloc
+
+
+import discreteheatmap
+
+
+def main(outputLocation, baselineLocation=None, sizes=(50, 250, 1000, 4000), regionCounts=(8, 64), patterns=('blobs', 'nearestneighbour', 'rings', 'stripes'),
+         modes=('boundary', 'dots', 'solid'), repeats=3, tolerance=0.2, seed=0):
+    """Benchmark discreteheatmap.main on synthetic Z grids.
+
+    Each combination of pattern, grid size, region count and mode is timed. The time taken by discreteheatmap.main (to compute the boundaries and regions
+    and create the artists) and the time taken to draw the figure are recorded separately, each as the minimum over the repeats. The peak memory
+    allocated while running discreteheatmap.main is measured in a separate run, as tracing the allocations slows the run down.
+
+    The patterns are:
+        blobs - a few large blobs, with the rest of the grid split between the blobs nearest to it.
+        nearestneighbour - the map of a 1 nearest neighbour classifier trained on randomly placed points with random classes.
+        rings - nested rings centred in the grid, none of which touch the edges of the grid.
+        stripes - diagonal stripes, all of which touch the edges of the grid.
+    The modes are boundary (boundary=True), dots (fill=1) and solid (fill=2). Dot filling draws one dot per (x,y) pair, so is very slow for large grids.
+
+    If a baseline is given, then any time in the results that is more than (1 + tolerance) times the time of the same case in the baseline is reported
+    as a regression.
+
+    :param outputLocation:      The location where the JSON results will be saved.
+    :type outputLocation:       str
+    :param baselineLocation:    The location of the JSON results to compare against.
+    :type baselineLocation:     str (or None if no comparison should be made)
+    :param sizes:               The number of points along each side of the grids.
+    :type sizes:                list of ints
+    :param regionCounts:        The number of blobs, points, rings or stripes used to generate each pattern.
+    :type regionCounts:         list of ints
+    :param patterns:            The patterns of Z values to benchmark.
+    :type patterns:             list containing any of ['blobs', 'nearestneighbour', 'rings', 'stripes']
+    :param modes:               The modes to benchmark.
+    :type modes:                list containing any of ['boundary', 'dots', 'solid']
+    :param repeats:             The number of times to time each case.
+    :type repeats:              int
+    :param tolerance:           The fraction by which a time can exceed its baseline before it is reported as a regression.
+    :type tolerance:            float
+    :param seed:                The seed for the random number generator used to generate the patterns.
+    :type seed:                 int
+    :returns :                  The cases that are slower than the baseline, along with the ratio of their time to the baseline time.
+    :type :                     list of (dict, str, float) tuples
+
+    """
+
+    modeParameters = {'boundary': {'boundary': True}, 'dots': {'fill': 1}, 'solid': {'fill': 2}}
+
+    results = []
+    for i in patterns:
+        for j in sizes:
+            for k in regionCounts:
+                xCoords, yCoords, zValues = generate_grid(i, j, k, seed)
+                for l in modes:
+                    case = {'pattern': i, 'size': j, 'regions': k, 'mode': l, 'distinctZValues': len(np.unique(zValues))}
+                    case.update(time_case(xCoords, yCoords, zValues, modeParameters[l], repeats))
+                    results.append(case)
+                    print('{0} {1}x{1} regions={2} {3}: {4:.3f}s (draw {5:.3f}s), peak memory {6:.1f}MB'.format(
+                          i, j, k, l, case['time'], case['drawTime'], case['peakMemory'] / 2 ** 20))
+
+    environment = {'python': platform.python_version(), 'numpy': np.__version__, 'matplotlib': matplotlib.__version__, 'platform': platform.platform()}
+    with open(outputLocation, 'w') as writeResults:
+        json.dump({'environment': environment, 'results': results}, writeResults, indent=2)
+
+    if baselineLocation:
+        with open(baselineLocation, 'r') as readBaseline:
+            baseline = json.load(readBaseline)
+        regressions = compare_results(results, baseline['results'], tolerance)
+        for case, timing, ratio in regressions:
+            print('REGRESSION: {0} {1}x{1} regions={2} {3} {4} is {5:.2f} times the baseline'.format(
+                  case['pattern'], case['size'], case['regions'], case['mode'], timing, ratio))
+        return regressions
+    return []
+
+
+def compare_results(results, baseline, tolerance=0.2):
+    """Compare benchmark results against a baseline.
+
+    :param results:     The benchmark results.
+    :type results:      list of dicts
+    :param baseline:    The benchmark results to compare against. Cases that are not in the baseline are ignored.
+    :type baseline:     list of dicts
+    :param tolerance:   The fraction by which a time can exceed its baseline before it is reported as a regression.
+    :type tolerance:    float
+    :returns :          The cases that are slower than the baseline, the time that is slower ('time' or 'drawTime') and the ratio of the time to the
+                        baseline time.
+    :type :             list of (dict, str, float) tuples
+
+    """
+
+    caseKeys = ['pattern', 'size', 'regions', 'mode']
+    baselineCases = dict([(tuple([i[j] for j in caseKeys]), i) for i in baseline])
+    regressions = []
+    for i in results:
+        baselineCase = baselineCases.get(tuple([i[j] for j in caseKeys]))
+        if baselineCase is None:
+            continue
+        for j in ['time', 'drawTime']:
+            if baselineCase[j] > 0 and i[j] > (1 + tolerance) * baselineCase[j]:
+                regressions.append((i, j, i[j] / baselineCase[j]))
+    return regressions
+
+
+def generate_grid(pattern, size, numberOfRegions, seed=0):
+    """Generate a synthetic grid of discrete Z values.
+
+    :param pattern:             The pattern of the Z values.
+    :type pattern:              'blobs', 'nearestneighbour', 'rings' or 'stripes'
+    :param size:                The number of points along each side of the grid.
+    :type size:                 int
+    :param numberOfRegions:     The number of blobs, points, rings or stripes used to generate the pattern.
+    :type numberOfRegions:      int
+    :param seed:                The seed for the random number generator.
+    :type seed:                 int
+    :returns :                  The x coordinates, y coordinates and Z values of the grid.
+    :type :                     three 2 dimensional numpy arrays
+
+    """
+
+    randomState = np.random.RandomState(seed)
+    xCoords, yCoords = np.meshgrid(np.arange(size, dtype=float), np.arange(size, dtype=float))
+
+    if pattern == 'blobs':
+        # Give each point the class of the nearest blob centre, with the distances scaled by the radius of the blob.
+        centres = randomState.uniform(0, size, (numberOfRegions, 2))
+        radii = randomState.uniform(0.5, 1.5, numberOfRegions)
+        classes = np.arange(numberOfRegions) % 4
+        zValues = calc_nearest_classes(xCoords, yCoords, centres, classes, radii)
+    elif pattern == 'nearestneighbour':
+        # Give each point the class of the nearest of a set of randomly placed points with random classes.
+        centres = randomState.uniform(0, size, (numberOfRegions, 2))
+        classes = randomState.randint(0, 4, numberOfRegions)
+        zValues = calc_nearest_classes(xCoords, yCoords, centres, classes)
+    elif pattern == 'rings':
+        # Split the grid into nested rings around its centre, leaving a border so that the rings do not touch the edges of the grid.
+        distances = np.hypot(xCoords - (size - 1) / 2, yCoords - (size - 1) / 2)
+        ringWidth = max(0.45 * size / numberOfRegions, 1)
+        zValues = np.minimum(distances // ringWidth, numberOfRegions).astype(np.int64) % 3
+    elif pattern == 'stripes':
+        # Split the grid into diagonal stripes.
+        stripeWidth = max(1.5 * size / numberOfRegions, 1)
+        zValues = ((xCoords + (0.5 * yCoords)) // stripeWidth).astype(np.int64) % 3
+    else:
+        raise ValueError('Unknown pattern: {0}'.format(pattern))
+
+    return xCoords, yCoords, zValues
+
+
+def calc_nearest_classes(xCoords, yCoords, centres, classes, scales=None):
+    """Determine the class of the nearest centre to each point in a grid.
+
+    The distances are computed a band of rows at a time, so that the distances from every point to every centre are never held in memory at once.
+
+    :param xCoords:     The x coordinates of the grid.
+    :type xCoords:      2 dimensional numpy array
+    :param yCoords:     The y coordinates of the grid.
+    :type yCoords:      2 dimensional numpy array
+    :param centres:     The coordinates of the centres.
+    :type centres:      2 dimensional numpy array with one row per centre
+    :param classes:     The class of each centre.
+    :type classes:      1 dimensional numpy array
+    :param scales:      The amount by which the distances to each centre are divided.
+    :type scales:       1 dimensional numpy array (or None if the distances should not be scaled)
+    :returns :          The class of each point.
+    :type :             2 dimensional numpy array
+
+    """
+
+    scales = np.ones(len(centres)) if scales is None else scales
+    nearestClasses = np.empty(xCoords.shape, dtype=np.int64)
+    bandHeight = max((2 ** 22) // (xCoords.shape[1] * len(centres)), 1)  # The number of rows for which the distances are computed at once.
+    for i in range(0, xCoords.shape[0], bandHeight):
+        xBand = xCoords[i:i + bandHeight, :, np.newaxis]
+        yBand = yCoords[i:i + bandHeight, :, np.newaxis]
+        distances = np.hypot(xBand - centres[:, 0], yBand - centres[:, 1]) / scales
+        nearestClasses[i:i + bandHeight] = classes[np.argmin(distances, axis=2)]
+    return nearestClasses
+
+
+def time_case(xCoords, yCoords, zValues, parameters, repeats=3):
+    """Time discreteheatmap.main, and measure the peak memory it allocates.
+
+    :param xCoords:     The x coordinates where the Z values have been evaluated.
+    :type xCoords:      2 dimensional numpy array
+    :param yCoords:     The y coordinates where the Z values have been evaluated.
+    :type yCoords:      2 dimensional numpy array
+    :param zValues:     The z value for each (x,y) pair.
+    :type zValues:      2 dimensional numpy array
+    :param parameters:  The keyword arguments to pass to discreteheatmap.main.
+    :type parameters:   dict
+    :param repeats:     The number of times to time the case.
+    :type repeats:      int
+    :returns :          The minimum times (in seconds) taken to run discreteheatmap.main and to draw the figure, and the peak memory allocated (in
+                        bytes) while running discreteheatmap.main, recorded under the keys 'time', 'drawTime' and 'peakMemory'.
+    :type :             dict
+
+    """
+
+    times = []
+    drawTimes = []
+    for _ in range(repeats):
+        gc.collect()
+        startTime = time.perf_counter()
+        currentFigure, _ = discreteheatmap.main(xCoords, yCoords, zValues, **parameters)
+        times.append(time.perf_counter() - startTime)
+        startTime = time.perf_counter()
+        currentFigure.canvas.draw()
+        drawTimes.append(time.perf_counter() - startTime)
+        plt.close(currentFigure)
+
+    # Measure the peak memory in a separate run.
+    gc.collect()
+    tracemalloc.start()
+    currentFigure, _ = discreteheatmap.main(xCoords, yCoords, zValues, **parameters)
+    _, peakMemory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    plt.close(currentFigure)
+
+    return {'time': min(times), 'drawTime': min(drawTimes), 'peakMemory': peakMemory}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=('Benchmark discreteheatmap on synthetic grids.'),
+                                     epilog=('The results are saved as JSON, and can be used as the baseline for later runs. The exit status is 1 if ' +
+                                             'any case is slower than the baseline.'))
+    parser.add_argument('output', help='The location where the JSON results will be saved.')
+    parser.add_argument('-b', '--baseline', help='The location of JSON results to compare against. (Default value: no comparison).',
+                        type=str, default=None, required=False)
+    parser.add_argument('-s', '--sizes', help='The number of points along each side of the grids. (Required type: ints separated by commas, default value: %(default)s).',
+                        type=str, default='50,250,1000,4000', required=False)
+    parser.add_argument('-n', '--regions', help='The number of blobs, points, rings or stripes used to generate each pattern. (Required type: ints separated by commas, default value: %(default)s).',
+                        type=str, default='8,64', required=False)
+    parser.add_argument('-p', '--patterns', help='The patterns to benchmark. (Required type: names separated by commas, default value: %(default)s).',
+                        type=str, default='blobs,nearestneighbour,rings,stripes', required=False)
+    parser.add_argument('-m', '--modes', help='The modes to benchmark. (Required type: names separated by commas, default value: %(default)s).',
+                        type=str, default='boundary,dots,solid', required=False)
+    parser.add_argument('-r', '--repeats', help='The number of times to time each case. (Required type: %(type)s, default value: %(default)s).',
+                        type=int, default=3, required=False)
+    parser.add_argument('-t', '--tolerance', help='The fraction by which a time can exceed its baseline before it is a regression. (Required type: %(type)s, default value: %(default)s).',
+                        type=float, default=0.2, required=False)
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(i) for i in args.sizes.split(',')]
+        regionCounts = [int(i) for i in args.regions.split(',')]
+    except ValueError:
+        print('ERROR: Non-integer value provided. Only integers may be supplied using the -s, --sizes, -n or --regions flags.')
+        sys.exit()
+
+    regressions = main(args.output, args.baseline, sizes, regionCounts, args.patterns.split(','), args.modes.split(','), args.repeats, args.tolerance)
+    sys.exit(1 if regressions else 0)
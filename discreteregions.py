@@ -0,0 +1,1629 @@
+import collections
+import hashlib
+import heapq
+import itertools
+import json
+from multiprocessing import Pool
+import numpy as np
+import os
+import tempfile
+
+
+import colors
+
+
+def compute_regions(xCoords, yCoords, zValues, levels=None, tileSize=None, poolSize=1, cacheDirectory=None, cacheSize=2**30, simplifyTolerance=None,
+                    simplifyMethod='douglas-peucker'):
+    """Compute the boundaries and regions of a discretised heatmap without plotting them.
+
+    The X and Y coordinate values should be supplied such that the smallest coordinates are at index [0, 0] and the largest at [-1, -1] (as would be
+    returned by calling np.arange followed by np.meshgrid).
+
+    The boundaries are returned as polylines, and the regions as polygons made up of an outer ring (counter-clockwise) followed by the rings of any holes
+    in the region (clockwise). All regions and closed boundaries start and end with the same vertex. The vertices of all the boundaries are stored in a
+    single array, with the vertices of boundary i being boundaryVertices[boundaryOffsets[i]:boundaryOffsets[i + 1]]. Region i is made up of rings
+    regionOffsets[i] to regionOffsets[i + 1] - 1, with the vertices of ring j being regionVertices[ringOffsets[j]:ringOffsets[j + 1]], and has Z value
+    regionZValues[i].
+
+    If cacheDirectory is set, the boundaries and regions are cached on disk, keyed by a hash of the Z values, the origin and spacing of the (X, Y) grid
+    and the levels (see calc_cache_key). Computing the boundaries and regions of the same grid again then only requires the Z values to be hashed. The
+    cache holds the boundaries and regions before they are simplified (see simplify_paths), so the same cached files are used whatever the tolerance.
+
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :param tileSize:        The number of squares along each side of the tiles that the (X, Y) grid is split into when computing the boundaries.
+    :type tileSize:         int (or None if the whole grid should be processed at once)
+    :param poolSize:        The number of workers to create in the multiprocessing.Pool process pool used to compute the boundaries.
+    :type poolSize:         int
+    :param cacheDirectory:  The directory in which to cache the boundaries and regions.
+    :type cacheDirectory:   str (or None if the boundaries and regions should not be cached)
+    :param cacheSize:       The maximum total size in bytes of the cached files. The least recently used files are removed once this is exceeded.
+    :type cacheSize:        int
+    :param simplifyTolerance:   The tolerance (in data units) used to simplify the boundaries and regions (see simplify_paths).
+    :type simplifyTolerance:    float (or None if the boundaries and regions should not be simplified)
+    :param simplifyMethod:      The method used to simplify the boundaries and regions.
+    :type simplifyMethod:       'douglas-peucker' or 'visvalingam'
+    :returns :              The boundaries and regions, recorded under the keys 'boundaryVertices', 'boundaryOffsets', 'regionVertices', 'ringOffsets',
+                            'regionOffsets' and 'regionZValues'.
+    :type :                 dict of numpy arrays
+
+    """
+
+    # Use the cached boundaries and regions if they have already been computed.
+    regions = None
+    if cacheDirectory:
+        cacheKey = calc_cache_key(xCoords, yCoords, zValues, levels)
+        regions = load_cached_regions(cacheDirectory, cacheKey)
+
+    if regions is None:
+        boundaryPaths = calc_boundaries(xCoords, yCoords, zValues, levels, tileSize, poolSize)
+        regions = flatten_regions(boundaryPaths, calc_regions(boundaryPaths, xCoords, yCoords, zValues, levels))
+        if cacheDirectory:
+            save_cached_regions(cacheDirectory, cacheKey, regions, cacheSize)
+
+    if simplifyTolerance is not None:
+        # Simplify the boundaries and regions. The regions cover the whole (X, Y) grid, so the extent of their vertices is the extent of the grid.
+        bounds = (xCoords[0, 0], xCoords[0, -1], yCoords[0, 0], yCoords[-1, 0])
+        boundaryPaths, regionPaths = split_flat_regions(regions)
+        boundaryPaths = simplify_paths(boundaryPaths, simplifyTolerance, simplifyMethod, bounds)
+        regions = flatten_regions(boundaryPaths, simplify_regions(regionPaths, simplifyTolerance, simplifyMethod, bounds))
+    return regions
+
+
+def compute_level_set_regions(xCoords, yCoords, zValues, levelSets, poolSize=1, cacheDirectory=None, cacheSize=2**30, simplifyTolerance=None,
+                              simplifyMethod='douglas-peucker'):
+    """Compute the boundaries and regions of a heatmap discretised by several sets of levels.
+
+    The Z values are discretised only once, using all the levels from every set. The discretised Z values for each set of levels are then looked up
+    from these using a table with one entry per level, rather than discretising the Z values again. The boundaries and regions for each set of levels are
+    computed as by compute_regions.
+
+    :param xCoords:             The x coordinates where the Z values have been evaluated.
+    :type xCoords:              2 dimensional numpy array
+    :param yCoords:             The y coordinates where the Z values have been evaluated.
+    :type yCoords:              2 dimensional numpy array
+    :param zValues:             The z value for each (x,y) pair.
+    :type zValues:              2 dimensional numpy array
+    :param levelSets:           The sets of levels at which to discretise the Z values.
+    :type levelSets:            list of non-empty extendable list like objects
+    :param poolSize:            The number of workers to create in the multiprocessing.Pool process pool used to compute the boundaries.
+    :type poolSize:             int
+    :param cacheDirectory:      The directory in which to cache the boundaries and regions (see compute_regions).
+    :type cacheDirectory:       str (or None if the boundaries and regions should not be cached)
+    :param cacheSize:           The maximum total size in bytes of the cached files.
+    :type cacheSize:            int
+    :param simplifyTolerance:   The tolerance (in data units) used to simplify the boundaries and regions (see simplify_paths).
+    :type simplifyTolerance:    float (or None if the boundaries and regions should not be simplified)
+    :param simplifyMethod:      The method used to simplify the boundaries and regions.
+    :type simplifyMethod:       'douglas-peucker' or 'visvalingam'
+    :returns :                  The boundaries and regions for each set of levels (in the form returned by compute_regions).
+    :type :                     list of dicts of numpy arrays
+
+    """
+
+    # Discretise the Z values using every level. Value i of the combined levels then separates the Z values discretised as i + 1 and i + 2.
+    combinedLevels = sorted(set(itertools.chain.from_iterable(levelSets)))
+    combinedZValues = discretise_z_values(zValues, combinedLevels)
+    combinedZValues = combinedZValues.astype(np.min_scalar_type(len(combinedLevels) + 1))
+
+    levelSetRegions = []
+    for levels in levelSets:
+        # Determine the discretised Z value for this set of levels of each combined discretised Z value. The combined discretised value i + 1 contains
+        # the Z values between combined levels i - 1 and i, so its Z values are discretised in the same way as combined level i.
+        lookupTable = np.empty(len(combinedLevels) + 2, dtype=np.int64)
+        lookupTable[1:-1] = discretise_z_values(np.array(combinedLevels), levels)
+        lookupTable[-1] = len(levels) + 1
+        levelSetRegions.append(compute_regions(xCoords, yCoords, lookupTable[combinedZValues], None, None, poolSize, cacheDirectory, cacheSize,
+                                               simplifyTolerance, simplifyMethod))
+    return levelSetRegions
+
+
+class BoundaryStitcher:
+    """Stitch boundary segments together into boundary paths.
+
+    Each point where paths can be joined is identified by an integer key, with the keys of the two sides of a join differing only in their lowest bit
+    (i.e. a path ending at key k can only be joined to a path starting at key k ^ 1). The vertices of each path are kept in a deque, and joining two paths
+    moves the vertices of the shorter path onto the longer one. Stitching n segments therefore takes O(n log n) time at worst.
+
+    """
+
+    def __init__(self):
+        """Create an empty stitcher."""
+
+        self.closedPaths = []  # The vertices of the paths that have been closed (i.e. that start and end at the same vertex).
+        self.starts = {}  # Mapping from the start keys of the open paths to the paths. Each open path is recorded as [startKey, vertices, endKey].
+        self.ends = {}  # Mapping from the end keys of the open paths to the paths.
+
+
+    def add_path(self, vertices, startKey, endKey):
+        """Add a path, joining it to the existing paths that it extends.
+
+        :param vertices:    The vertices of the path (including the start and end points).
+        :type vertices:     sequence
+        :param startKey:    The key of the start point of the path.
+        :type startKey:     int
+        :param endKey:      The key of the end point of the path.
+        :type endKey:       int
+
+        """
+
+        before = self.ends.pop(startKey ^ 1, None)  # The existing path that the new path extends the end of.
+        after = self.starts.pop(endKey ^ 1, None)  # The existing path that the new path extends the start of.
+        if before is not None and before is after:
+            # The new path fills the gap between the end and start of the same existing path, thereby closing it.
+            before[1].extend(itertools.islice(vertices, 1, None))
+            self.closedPaths.append(before[1])
+            return
+
+        # Join the new path to the existing ones that it extends, and record the ends of the resulting path.
+        newPath = [startKey, collections.deque(vertices), endKey]
+        if before is not None:
+            newPath = self.join_paths(before, newPath)
+        if after is not None:
+            newPath = self.join_paths(newPath, after)
+        self.starts[newPath[0]] = newPath
+        self.ends[newPath[2]] = newPath
+
+
+    def get_open_paths(self):
+        """Get the open paths along with the keys of their ends.
+
+        :returns :  The open paths.
+        :type :     list of [startKey, vertices, endKey]
+
+        """
+
+        return list(self.starts.values())
+
+
+    def get_paths(self):
+        """Get the vertices of all the paths.
+
+        :returns :  The vertices of the closed paths followed by the vertices of the open paths.
+        :type :     list of collections.deque objects
+
+        """
+
+        return self.closedPaths + [i[1] for i in self.starts.values()]
+
+
+    @staticmethod
+    def join_paths(first, second):
+        """Join two open paths where the end vertex of the first is the start vertex of the second.
+
+        :param first:   The path to place first.
+        :type first:    list of [startKey, vertices, endKey]
+        :param second:  The path to place second.
+        :type second:   list of [startKey, vertices, endKey]
+        :returns :      The joined path (one of the input paths extended by the other).
+        :type :         list of [startKey, vertices, endKey]
+
+        """
+
+        if len(first[1]) >= len(second[1]):
+            second[1].popleft()  # Remove the vertex shared by the two paths.
+            first[1].extend(second[1])
+            first[2] = second[2]
+            return first
+        else:
+            first[1].pop()  # Remove the vertex shared by the two paths.
+            second[1].extendleft(reversed(first[1]))
+            second[0] = first[0]
+            return second
+
+
+def boundary_worker(parameters):
+    """Determine the boundary paths within a tile of the (X, Y) grid.
+
+    Auxiliary function is required to meet restrictions placed on Pool.map.
+
+    :param parameters:      The Z values, levels, x coordinates, half the distance between adjacent X coordinate values, y coordinates and half the
+                            distance between adjacent Y coordinate values of the tile (see calc_tiled_boundary_paths).
+    :type parameters:       tuple
+    :returns :              The vertices of the closed paths, and the open paths along with the keys (in the tile) of their ends.
+    :type :                 list of lists of (x, y) coordinate tuples, list of [startKey, vertices, endKey]
+
+    """
+
+    zTile, levels, xTile, halfDeltaX, yTile, halfDeltaY = parameters
+    cases = calc_square_cases(discretise_z_values(zTile, levels))
+    tileStitcher = BoundaryStitcher()
+    calc_boundary_paths(cases, tileStitcher)
+    openPaths = tileStitcher.get_open_paths()
+
+    # Convert the vertices of the paths to coordinates.
+    pathVertices = calc_vertex_coords(tileStitcher.closedPaths + [i[1] for i in openPaths], xTile, halfDeltaX, yTile, halfDeltaY, cases)
+    numberOfClosedPaths = len(tileStitcher.closedPaths)
+    return pathVertices[:numberOfClosedPaths], [[i[0], j, i[2]] for i, j in zip(openPaths, pathVertices[numberOfClosedPaths:])]
+
+
+def calc_area_hierarchy(pathStarts, paths, xMin, halfDeltaX, yMin, halfDeltaY):
+    """Determine the hierarchy of a set of paths.
+
+    Determines the set of paths that are completely contained within each path. If there is a hierarchy such as A contains B which contains C, then this
+    is marked only as A containing B and B containing C (A is not marked as containing C).
+
+    The paths are the counter-clockwise outlines of areas, and while they may share edges they never cross one another. A path is therefore contained
+    within another path if a single point in its interior (see calc_interior_point) is inside the other path, and the paths containing a path are nested
+    within one another. The path that directly contains a path is therefore the smallest path that contains its interior point. In order to avoid
+    testing every pair of paths, the paths are swept through in the order of the left edges of their bounding boxes while keeping the set of paths whose
+    bounding boxes span the current left edge, with paths dropped from the set (using a heap of the right edges) once the sweep passes their right edges.
+    Only those paths in the set with larger areas and bounding boxes that enclose the bounding box of a path are tested for containing it.
+
+    :param pathStarts:  The vertices that correspond to the start of each path in paths.
+    :type pathStarts:   list of (x, y) coordinate tuples
+    :param paths:       The vertices that make up each of the paths.
+    :type paths:        dict of lists of (x, y) coordinate tuples
+    :param xMin:        The smallest x coordinate of the (X, Y) grid.
+    :type xMin:         float
+    :param halfDeltaX:  Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:   float
+    :param yMin:        The smallest y coordinate of the (X, Y) grid.
+    :type yMin:         float
+    :param halfDeltaY:  Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:   float
+    :returns :          A mapping from each path starting point to the (x, y) coordinates of the starting points of paths internal to it.
+    :type :             dict
+
+    """
+
+    # Determine the bounding box, area and a point in the interior of each path.
+    pathVertices = [np.array(paths[i], dtype=float) for i in pathStarts]
+    boundingBoxes = np.array([[i[:, 0].min(), i[:, 1].min(), i[:, 0].max(), i[:, 1].max()] for i in pathVertices]).reshape(-1, 4)
+    areas = np.array([abs(calc_signed_area(i)) for i in pathVertices])
+    interiorPoints = [calc_interior_point(paths[i], xMin, halfDeltaX, yMin, halfDeltaY) for i in pathStarts]
+
+    # Sort the paths by the left edges of their bounding boxes.
+    sortedIndices = np.argsort(boundingBoxes[:, 0], kind='stable')
+    sortedLeftEdges = boundingBoxes[sortedIndices, 0]
+    groupStarts = np.unique(sortedLeftEdges, return_index=True)[1]
+
+    # Determine the path that directly contains each path (if there is one).
+    remove = dict([(i, set([])) for i in pathStarts])
+    activePaths = set([])
+    rightEdges = []
+    for groupStart, groupEnd in zip(groupStarts, np.r_[groupStarts[1:], len(sortedIndices)]):
+        # Add the paths with bounding boxes starting at this left edge to the active set, and drop those with bounding boxes ending before it. Only
+        # the active paths can contain the paths starting at this left edge.
+        for i in range(groupStart, groupEnd):
+            activePaths.add(i)
+            heapq.heappush(rightEdges, (boundingBoxes[sortedIndices[i], 2], i))
+        while rightEdges[0][0] < sortedLeftEdges[groupStart]:
+            activePaths.discard(heapq.heappop(rightEdges)[1])
+        activeIndices = sortedIndices[np.sort(np.fromiter(activePaths, dtype=np.int64, count=len(activePaths)))]
+
+        for i in sortedIndices[groupStart:groupEnd]:
+            candidates = activeIndices[(boundingBoxes[activeIndices, 1] <= boundingBoxes[i, 1]) & (boundingBoxes[activeIndices, 2] >= boundingBoxes[i, 2]) &
+                                       (boundingBoxes[activeIndices, 3] >= boundingBoxes[i, 3]) & (areas[activeIndices] > areas[i])]
+
+            # Test the candidates from smallest to largest, as the first one found to contain path i is the one that directly contains it.
+            for k in candidates[np.argsort(areas[candidates], kind='stable')]:
+                if test_inside(interiorPoints[i], pathVertices[k]):
+                    remove[pathStarts[k]].add(pathStarts[i])
+                    break
+
+    return remove
+
+
+def calc_boundaries(xCoords, yCoords, zValues, levels=None, tileSize=None, poolSize=1):
+    """Determine the boundary paths between areas of different Z values.
+
+    The sides of each square of the (X, Y) grid that the boundaries go through are determined, and the boundary segments in the squares are stitched
+    together to form the paths that represent the boundaries and the outsides of the enclosed areas of a specific set of Z values. If tileSize is set, the
+    grid is processed in tiles (see calc_tiled_boundary_paths). If poolSize is greater than 1, the tiles (or one horizontal band of the grid per worker
+    if tileSize is not set) are processed in parallel. The paths are returned in canonical form (see canonicalise_paths), so they are identical however
+    they are computed.
+
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :param tileSize:        The number of squares along each side of the tiles that the (X, Y) grid is split into.
+    :type tileSize:         int (or None if the whole grid should be processed at once)
+    :param poolSize:        The number of workers to create in the multiprocessing.Pool process pool.
+    :type poolSize:         int
+    :returns :              The vertices of each path. Closed paths start and end with the same vertex.
+    :type :                 list of lists of (x, y) coordinate tuples
+
+    """
+
+    numberOfRows, numberOfCols = zValues.shape
+    halfDeltaX = abs(xCoords[0, 1] - xCoords[0, 0]) / 2  # Half the distance between adjacent X coordinate values.
+    halfDeltaY = abs(yCoords[1, 0] - yCoords[0, 0]) / 2  # Half the distance between adjacent Y coordinate values.
+    if tileSize or poolSize > 1:
+        # Split the grid into tiles, or into one horizontal band per worker if only parallel processing is requested.
+        tileHeight = tileSize or max(-(-(numberOfRows - 1) // poolSize), 1)
+        tileWidth = tileSize or max(numberOfCols - 1, 1)
+        pathVertices = calc_tiled_boundary_paths(zValues, levels, xCoords, halfDeltaX, yCoords, halfDeltaY, tileHeight, tileWidth, poolSize)
+    else:
+        zValues = discretise_z_values(zValues, levels)
+        cases = calc_square_cases(zValues)
+        pathVertices = calc_boundary_paths(cases)
+        pathVertices = calc_vertex_coords(pathVertices, xCoords, halfDeltaX, yCoords, halfDeltaY, cases)
+    return canonicalise_paths(pathVertices, xCoords[0, 0], halfDeltaX, yCoords[0, 0], halfDeltaY)
+
+
+def calc_boundary_paths(cases, stitcher=None):
+    """Stitch the boundary segments that go through the squares of the (X, Y) grid together into boundary paths.
+
+    The vertices of the paths are recorded as integer IDs of points on the (X, Y) grid rather than as coordinates. For a grid with R rows and C columns
+    the IDs are assigned as follows:
+        - the midpoint of the side between [i, j] and [i, j+1] has ID i * (C - 1) + j
+        - the midpoint of the side between [i, j] and [i+1, j] has ID R * (C - 1) + i * C + j
+        - the middle of the square with its bottom left corner at [i, j] has ID R * (C - 1) + (R - 1) * C + i * (C - 1) + j
+    calc_vertex_coords can be used to convert the IDs to coordinates.
+
+    Each boundary is traced once with each direction of travel, as every pair of corners of a square with unequal Z values contributes a boundary segment
+    going each way between them. A square with two boundary entry/exit points, a and b, contributes segments a->b and b->a. A square with three or four
+    entry/exit points contributes a segment between each entry/exit point and the next one (going around the square) via the middle of the square.
+
+    :param cases:       The case index of each square (as returned by calc_square_cases).
+    :type cases:        2 dimensional numpy array
+    :param stitcher:    The stitcher to add the segments to. If not provided, then a new stitcher will be used.
+    :type stitcher:     BoundaryStitcher
+    :returns :          The vertices of each path. Closed paths start and end with the same vertex.
+    :type :             list of collections.deque objects of ints
+
+    """
+
+    # Determine some useful statistics about the grid.
+    numberOfCols = cases.shape[1] + 1
+    numberOfHorizontalSides = (cases.shape[0] + 1) * (numberOfCols - 1)  # The number of sides between horizontally adjacent points.
+    middleOffset = numberOfHorizontalSides + cases.shape[0] * numberOfCols  # The ID of the middle of the first square.
+
+    # Determine the segments that each case contributes, as pairs of the indices (into a, b, c, d) of the start and end of each segment.
+    caseSegments = []
+    for i in range(16):
+        sidesCrossed = [j for j in range(4) if i & (1 << j)]
+        if len(sidesCrossed) == 2:
+            caseSegments.append([(sidesCrossed[0], sidesCrossed[1]), (sidesCrossed[1], sidesCrossed[0])])
+        else:
+            caseSegments.append(list(zip(sidesCrossed, sidesCrossed[1:] + sidesCrossed[:1])))
+
+    # Determine the keys of the midpoints of the four sides of the squares with boundaries going through them. As each midpoint is shared by the two
+    # squares on either side of it, the key of a midpoint in a square is 2 * ID + 1 if the square is above or to the right of the midpoint, and 2 * ID
+    # otherwise. A segment that ends at a midpoint can only be followed by a segment that starts at the midpoint in the other square (one with the
+    # other key). For the square with its bottom left corner at [i, j] the midpoints are a (left side), b (top side), c (right side) and d (bottom side).
+    rowIndices, colIndices = np.nonzero(cases)
+    caseValues = cases[rowIndices, colIndices]
+    sideKeys = np.empty((caseValues.size, 4), dtype=np.int64)
+    sideKeys[:, 0] = 2 * (numberOfHorizontalSides + (rowIndices * numberOfCols) + colIndices) + 1
+    sideKeys[:, 1] = 2 * (((rowIndices + 1) * (numberOfCols - 1)) + colIndices)
+    sideKeys[:, 2] = 2 * (numberOfHorizontalSides + (rowIndices * numberOfCols) + colIndices + 1)
+    sideKeys[:, 3] = 2 * ((rowIndices * (numberOfCols - 1)) + colIndices) + 1
+    middles = middleOffset + (rowIndices * (numberOfCols - 1)) + colIndices
+
+    # Stitch the segments together.
+    if stitcher is None:
+        stitcher = BoundaryStitcher()
+    for keys, middle, case in zip(sideKeys.tolist(), middles.tolist(), caseValues.tolist()):
+        middleNeeded = case in (7, 11, 13, 14, 15)  # Squares with 3 or 4 boundary entry/exit points have their segments go through the middle.
+        for i, j in caseSegments[case]:
+            startKey = keys[i]
+            endKey = keys[j]
+            vertices = (startKey >> 1, middle, endKey >> 1) if middleNeeded else (startKey >> 1, endKey >> 1)
+            stitcher.add_path(vertices, startKey, endKey)
+
+    return stitcher.get_paths()
+
+
+def calc_cache_key(xCoords, yCoords, zValues, levels=None):
+    """Calculate the key under which the boundaries and regions of a discretised heatmap are cached.
+
+    The key is a hash of the shape, type and contents of the Z values, the origin and spacing of the (X, Y) grid and the levels. The Z values are hashed
+    a band of rows at a time, so memory-mapped grids are never read into memory all at once.
+
+    :param xCoords:     The x coordinates where the Z values have been evaluated.
+    :type xCoords:      2 dimensional numpy array
+    :param yCoords:     The y coordinates where the Z values have been evaluated.
+    :type yCoords:      2 dimensional numpy array
+    :param zValues:     The z value for each (x,y) pair.
+    :type zValues:      2 dimensional numpy array
+    :param levels:      The levels at which to discretise the Z values.
+    :type levels:       extendable list like object (or None if the Z values are already discretised)
+    :returns :          The hexadecimal digest of the hash.
+    :type :             str
+
+    """
+
+    hasher = hashlib.sha256()
+    numberOfRows, numberOfCols = zValues.shape
+    gridOrigin = [xCoords[0, 0], yCoords[0, 0], xCoords[0, 1] - xCoords[0, 0], yCoords[1, 0] - yCoords[0, 0]]
+    hasher.update(repr((zValues.shape, zValues.dtype.str, [float(i) for i in gridOrigin], [float(i) for i in levels] if levels else None)).encode())
+    bandHeight = max((2 ** 24) // max(numberOfCols * zValues.dtype.itemsize, 1), 1)  # The number of rows hashed at once (roughly 16MB of Z values).
+    for i in range(0, numberOfRows, bandHeight):
+        hasher.update(np.ascontiguousarray(zValues[i:i + bandHeight]).tobytes())
+    return hasher.hexdigest()
+
+
+def calc_grid_index(point, xMin, halfDeltaX, yMin, halfDeltaY):
+    """Determine the index in the (X, Y) grid of a point on the grid.
+
+    The index is calculated from the origin of the grid and the spacing between its points, rather than by searching the coordinates of the grid.
+
+    :param point:           The point on the (X, Y) grid.
+    :type point:            (x, y) coordinate tuple
+    :param xMin:            The smallest x coordinate of the (X, Y) grid.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the (X, Y) grid.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :returns :              The row (Y) and column (X) index of the point.
+    :type :                 (int, int) tuple
+
+    """
+
+    return int(round((point[1] - yMin) / (2 * halfDeltaY))), int(round((point[0] - xMin) / (2 * halfDeltaX)))
+
+
+def calc_grid_keys(keys, tileShape, rowOffset, colOffset, gridShape):
+    """Convert the keys of midpoints of the sides of squares in a tile of the (X, Y) grid to the keys of the midpoints in the whole grid.
+
+    The IDs of the midpoints are described in calc_boundary_paths, and the key of a midpoint is twice its ID plus one if the square it is in is above or to
+    the right of it.
+
+    :param keys:        The keys of the midpoints in the tile.
+    :type keys:         1 dimensional numpy array of ints
+    :param tileShape:   The number of rows and columns in the tile.
+    :type tileShape:    (int, int) tuple
+    :param rowOffset:   The row of the grid that the first row of the tile is.
+    :type rowOffset:    int
+    :param colOffset:   The column of the grid that the first column of the tile is.
+    :type colOffset:    int
+    :param gridShape:   The number of rows and columns in the grid.
+    :type gridShape:    (int, int) tuple
+    :returns :          The keys of the midpoints in the grid.
+    :type :             1 dimensional numpy array of ints
+
+    """
+
+    vertexIDs, sides = np.divmod(keys, 2)
+    tileHorizontalSides = tileShape[0] * (tileShape[1] - 1)
+    gridHorizontalSides = gridShape[0] * (gridShape[1] - 1)
+    isHorizontal = vertexIDs < tileHorizontalSides
+
+    # Convert the IDs of the midpoints of the sides between horizontally adjacent points.
+    rowIndices, colIndices = np.divmod(vertexIDs, tileShape[1] - 1)
+    horizontalIDs = ((rowIndices + rowOffset) * (gridShape[1] - 1)) + colIndices + colOffset
+
+    # Convert the IDs of the midpoints of the sides between vertically adjacent points.
+    rowIndices, colIndices = np.divmod(vertexIDs - tileHorizontalSides, tileShape[1])
+    verticalIDs = gridHorizontalSides + ((rowIndices + rowOffset) * gridShape[1]) + colIndices + colOffset
+
+    return (2 * np.where(isHorizontal, horizontalIDs, verticalIDs)) + sides
+
+
+def calc_interior_point(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY):
+    """Determine the point on the (X, Y) grid that is just to the left of the first line segment of a path.
+
+    As the interior of a counter-clockwise path is on its left, this point is inside the path if the path is counter-clockwise. The point is one half step
+    away from the start of the first line segment, and is based on the splitting of the meshgrid into individual squares that have been evaluated
+    separately. If the (X, Y) grid contains all x values in [0, 1] and all Y values in [0, 1], then halfDeltaX and halfDeltaY would be 0.5, and the first
+    line segment could start at A) (0, 0.5), B) (0.5, 1), C) (1, 0.5), or D) (0.5, 0). A and C are on the X gridlines, while B and D are on the Y
+    gridlines. A segment starting on the Y gridlines goes up or down through the square, and the point is the corner to the left of its start. A segment
+    starting on the X gridlines goes left or right through the square, and the point is likewise the corner to the left of its start.
+
+    :param pathVertices:    The vertices that make up the path.
+    :type pathVertices:     list of (x, y) coordinate tuples
+    :param xMin:            The smallest x coordinate of the (X, Y) grid.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the (X, Y) grid.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :returns :              The point to the left of the first line segment.
+    :type :                 (x, y) coordinate tuple
+
+    """
+
+    firstSegmentStartX, firstSegmentStartY = pathVertices[0]
+    firstSegmentEndX, firstSegmentEndY = pathVertices[1]
+    onYGrid = int(round((firstSegmentStartY - yMin) / halfDeltaY)) % 2 == 0  # True if the first line segment starts on a line on the Y grid.
+    if firstSegmentStartY != firstSegmentEndY and (firstSegmentStartX == firstSegmentEndX or onYGrid):
+        # The first line segment is vertical or starts on the Y grid lines, and therefore goes up or down.
+        if firstSegmentStartY < firstSegmentEndY:
+            return (firstSegmentStartX - halfDeltaX, firstSegmentStartY)
+        return (firstSegmentStartX + halfDeltaX, firstSegmentStartY)
+    else:
+        # The first line segment is horizontal or starts on the X grid lines, and therefore goes left or right.
+        if firstSegmentStartX < firstSegmentEndX:
+            return (firstSegmentStartX, firstSegmentStartY + halfDeltaY)
+        return (firstSegmentStartX, firstSegmentStartY - halfDeltaY)
+
+
+def calc_perimeter_positions(points, xMin, halfDeltaX, yMin, halfDeltaY, perimeterWidth, perimeterHeight):
+    """Determine the positions of points on the edges of the figure.
+
+    The position of a point is the distance (in half steps between adjacent coordinate values) travelled counter-clockwise around the edges of the figure
+    from the bottom left corner to reach the point. None of the points may be a corner of the figure.
+
+    :param points:          The points on the edges of the figure.
+    :type points:           list of (x, y) coordinate tuples
+    :param xMin:            The smallest x coordinate of the figure.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the figure.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :param perimeterWidth:  The width of the figure in half steps.
+    :type perimeterWidth:   int
+    :param perimeterHeight: The height of the figure in half steps.
+    :type perimeterHeight:  int
+    :returns :              The position of each point.
+    :type :                 1 dimensional numpy array of ints
+
+    """
+
+    points = np.array(points, dtype=float).reshape(-1, 2)
+    xSteps = np.rint((points[:, 0] - xMin) / halfDeltaX).astype(np.int64)
+    ySteps = np.rint((points[:, 1] - yMin) / halfDeltaY).astype(np.int64)
+    return np.select([ySteps == 0, xSteps == perimeterWidth, ySteps == perimeterHeight],  # Bottom, right and top edges.
+                     [xSteps, perimeterWidth + ySteps, perimeterWidth + perimeterHeight + (perimeterWidth - xSteps)],
+                     (2 * perimeterWidth) + perimeterHeight + (perimeterHeight - ySteps))  # Left edge.
+
+
+def calc_regions(pathVertices, xCoords, yCoords, zValues, levels=None):
+    """Determine the regions enclosed by the boundary paths, along with the holes in them.
+
+    Each region is enclosed by a counter-clockwise path. Regions that do not touch the edges of the (X, Y) grid are enclosed by closed boundary paths,
+    while the others are enclosed by open boundary paths closed along the edges of the grid (see close_paths). The paths of the regions directly contained
+    within a region are reversed (so that they're clockwise) to form the holes in the region.
+
+    :param pathVertices:    The vertices of each boundary path (as returned by calc_boundaries).
+    :type pathVertices:     list of lists of (x, y) coordinate tuples
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :returns :              The vertices of the outer path, the vertices of the paths of the holes and the Z value of each region.
+    :type :                 list of (list of (x, y) coordinate tuples, list of lists of (x, y) coordinate tuples, Z value) tuples
+
+    """
+
+    # Determine some useful statistics about the grid.
+    xMin = xCoords[0, 0]
+    halfDeltaX = abs(xCoords[0, 1] - xCoords[0, 0]) / 2  # Half the distance between adjacent X coordinate values.
+    yMin = yCoords[0, 0]
+    halfDeltaY = abs(yCoords[1, 0] - yCoords[0, 0]) / 2  # Half the distance between adjacent Y coordinate values.
+
+    # Record the paths by their starting points.
+    paths = {}         # Dictionary indexed by the starting points, s, of boundary paths with the value associated with each starting point being a list of
+                       # the vertices through which that boundary passes. Tells you the entire path given its starting point.
+    startsToEnds = {}  # Dictionary indexed by the starting points, s, of boundary paths with the value associated with each starting point being the end
+                       # point, e, of the path that starts at s. Tells you the endpoint of a path given its starting point.
+    for i in pathVertices:
+        paths[i[0]] = i
+        startsToEnds[i[0]] = i[-1]
+    pathsStartsToRegionZValues = {}  # A record of the starting points of each path enclosing a region, along with the Z value of its interior.
+
+    # First determine the Z value of all already closed paths (i.e. paths that do not touch an edge of the (X, Y) grid). Each already closed path is
+    # represented by a counter-clockwise and clockwise path (representing the interior and everything exterior of the closed region respectively).
+    # In order to stay consistent with all other paths, any clockwise path is to be removed.
+    closedPathStarts = set([i for i in startsToEnds if startsToEnds[i] == i])
+    for i in closedPathStarts:
+        pathIsCCW, areaZValue = test_clockwise(paths[i], xMin, halfDeltaX, yMin, halfDeltaY, zValues)
+        if pathIsCCW:
+            # The path is counter-clockwise, so record it as being kept along with its Z value.
+            pathsStartsToRegionZValues[i] = areaZValue
+
+    # Second, find all open paths (those where the start != end) and close them.
+    openPathStarts = set([i for i in startsToEnds if startsToEnds[i] != i])
+    closedPaths, pathStartToZValue = close_paths(paths, openPathStarts, startsToEnds, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues)
+    for i in closedPaths:
+        paths[i] = closedPaths[i]  # Update the record of the paths with the closed path.
+    for i in pathStartToZValue:
+        # For all the newly closed paths, map their starting point to their interior Z value.
+        pathsStartsToRegionZValues[i] = pathStartToZValue[i]
+    for i in pathsStartsToRegionZValues:
+        # Discretise the Z values of the regions if this was not done for the whole grid.
+        pathsStartsToRegionZValues[i] = discretise_z_values(pathsStartsToRegionZValues[i], levels)
+
+    # Determine the hierarchy of regions in order to determine where to make holes in the regions to prevent overlaps. This is necessary in order to
+    # correctly plot smaller regions that are completely contained within a larger region. With an alpha vale of 1, if a larger region A is plotted after
+    # a smaller region B that is completely contained within A, then region B will not be visible. If the alpha value is not 1, then the overlapping
+    # regions will both be visible, but will combine their colors and be darker (due to the adding of overlapping alpha values) than the other regions.
+    removeInternalPaths = calc_area_hierarchy([i for i in pathsStartsToRegionZValues], paths, xMin, halfDeltaX, yMin, halfDeltaY)
+
+    return [(paths[i], [paths[j][::-1] for j in sorted(removeInternalPaths[i])], pathsStartsToRegionZValues[i]) for i in sorted(pathsStartsToRegionZValues)]
+
+
+def calc_signed_area(pathVertices):
+    """Calculate the signed area enclosed by a closed path.
+
+    The area is positive if the path is counter-clockwise and negative if it is clockwise.
+
+    :param pathVertices:    The vertices that make up the path (with the first and last vertices being the same).
+    :type pathVertices:     2 dimensional numpy array with one row per vertex
+    :returns :              The signed area.
+    :type :                 float
+
+    """
+
+    xValues = pathVertices[:, 0]
+    yValues = pathVertices[:, 1]
+    return ((xValues[:-1] * yValues[1:]).sum() - (xValues[1:] * yValues[:-1]).sum()) / 2
+
+
+def calc_square_cases(zValues):
+    """Determine the sides of each square of the (X, Y) grid that have a boundary going through them.
+
+    The boundaries are determined by dividing the zValues into squares. The values of the corners of the square with its bottom left corner at [i, j] are
+    zValues[i, j] (bottom left corner), zValues[i+1, j] (top left corner), zValues[i+1, j+1] (top right corner) and zValues[i, j+1] (bottom right
+    corner). Due the ordering of the xCoords and yCoords, the bottom left corner of the square represents the (x,y) point with the smallest X and Y
+    coordinate values. When plotted the square will therefore look as follows:
+    zValues[i+1,j] b zValues[i+1,j+1]
+        a                c
+    zValues[i,j]   d zValues[i,j+1]
+    with a, b, c and d representing the points midway along the sides. A boundary passes through the midpoint of a side when the Z values at the two
+    corners at the ends of the side are not equal. Each point is both an entry and exit point for the boundaries going through the square.
+
+    The sides crossed are encoded as a 4 bit case index (as in the marching squares algorithm), with bit 0 set if the boundary crosses side a, bit 1 if
+    it crosses side b, bit 2 if it crosses side c and bit 3 if it crosses side d. A square with no boundary going through it has a case index of 0.
+
+    :param zValues:     The z value for each (x,y) pair.
+    :type zValues:      2 dimensional numpy array
+    :returns :          The case index of each square. Element [i, j] is the case index of the square with its bottom left corner at [i, j].
+    :type :             2 dimensional numpy array of uint8 with one fewer row and column than zValues
+
+    """
+
+    # Determine which horizontally adjacent and vertically adjacent Z values are not equal. If rowsNotEqual[i, j] is True, then
+    # zValues[i, j] != zValues[i, j+1]. If columnsNotEqual[i, j] is True, then zValues[i, j] != zValues[i+1, j].
+    rowsNotEqual = (zValues[:, :-1] != zValues[:, 1:]).astype(np.uint8)
+    columnsNotEqual = (zValues[:-1, :] != zValues[1:, :]).astype(np.uint8)
+
+    # Combine the side tests into the case index for every square at once.
+    cases = columnsNotEqual[:, :-1].copy()  # Side a.
+    cases |= rowsNotEqual[1:, :] << 1  # Side b.
+    cases |= columnsNotEqual[:, 1:] << 2  # Side c.
+    cases |= rowsNotEqual[:-1, :] << 3  # Side d.
+    return cases
+
+
+def calc_tile_paths(zValues, levels, xCoords, halfDeltaX, yCoords, halfDeltaY, tiles, poolSize=1):
+    """Determine the boundary paths within tiles of the (X, Y) grid.
+
+    The boundaries within each tile are stitched together and converted to coordinates (see boundary_worker), and the keys of the ends of the paths that
+    end on the edges of the tile are converted to the keys of the end points in the whole grid. The tiles are processed in batches of poolSize tiles, with
+    the tiles in a batch processed in parallel if poolSize is greater than 1. Only the Z values and coordinates of a single batch of tiles are held in
+    memory at once, so the inputs can be memory-mapped arrays.
+
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :param tiles:           The first row, last row + 1, first column and last column + 1 of each tile (see generate_tiles).
+    :type tiles:            list of (int, int, int, int) tuples
+    :param poolSize:        The number of workers to create in the multiprocessing.Pool process pool.
+    :type poolSize:         int
+    :returns :              For each tile, the vertices of the closed paths and the open paths along with the keys (in the whole grid) of their ends.
+    :type :                 list of (list of lists of (x, y) coordinate tuples, list of [startKey, vertices, endKey]) tuples
+
+    """
+
+    tilePaths = []
+    workerPool = Pool(poolSize) if poolSize > 1 else None
+    for i in range(0, len(tiles), poolSize):
+        # Determine the paths within each tile in the batch.
+        batch = tiles[i:i + poolSize]
+        parameters = [(np.asarray(zValues[j[0]:j[1], j[2]:j[3]]), levels, np.asarray(xCoords[j[0]:j[1], j[2]:j[3]]), halfDeltaX,
+                       np.asarray(yCoords[j[0]:j[1], j[2]:j[3]]), halfDeltaY) for j in batch]
+        if workerPool:
+            batchPaths = workerPool.map(boundary_worker, parameters)
+        else:
+            batchPaths = [boundary_worker(j) for j in parameters]
+
+        # Convert the keys of the ends of the open paths to keys in the whole grid.
+        for (rowStart, rowEnd, colStart, colEnd), (tileClosedPaths, tileOpenPaths) in zip(batch, batchPaths):
+            if tileOpenPaths:
+                endKeys = np.array([[j[0], j[2]] for j in tileOpenPaths], dtype=np.int64)
+                endKeys = calc_grid_keys(endKeys, (rowEnd - rowStart, colEnd - colStart), rowStart, colStart, zValues.shape).tolist()
+                tileOpenPaths = [[k[0], j[1], k[1]] for j, k in zip(tileOpenPaths, endKeys)]
+            tilePaths.append((tileClosedPaths, tileOpenPaths))
+
+    if workerPool:
+        workerPool.close()
+        workerPool.join()
+
+    return tilePaths
+
+
+def calc_tiled_boundary_paths(zValues, levels, xCoords, halfDeltaX, yCoords, halfDeltaY, tileHeight, tileWidth, poolSize=1):
+    """Determine the boundary paths of the (X, Y) grid one tile at a time.
+
+    The grid is split into tiles of tileHeight x tileWidth squares, with adjacent tiles sharing the row or column of points along their common edge. The
+    boundaries within each tile are determined (see calc_tile_paths), and the paths that end on the edges of the tiles are then stitched to those from the
+    neighbouring tiles.
+
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :param levels:          The levels at which to discretise the Z values.
+    :type levels:           extendable list like object (or None if the Z values are already discretised)
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :param tileHeight:      The number of rows of squares in a tile.
+    :type tileHeight:       int
+    :param tileWidth:       The number of columns of squares in a tile.
+    :type tileWidth:        int
+    :param poolSize:        The number of workers to create in the multiprocessing.Pool process pool.
+    :type poolSize:         int
+    :returns :              The vertices of each path. Closed paths start and end with the same vertex.
+    :type :                 list of lists of (x, y) coordinate tuples
+
+    """
+
+    tiles = list(generate_tiles(zValues.shape[0], zValues.shape[1], tileHeight, tileWidth))
+    return stitch_tile_paths(calc_tile_paths(zValues, levels, xCoords, halfDeltaX, yCoords, halfDeltaY, tiles, poolSize))
+
+
+def calc_triangle_area(firstVertex, secondVertex, thirdVertex):
+    """Calculate the area of a triangle.
+
+    :param firstVertex:     The first vertex of the triangle.
+    :type firstVertex:      (x, y) coordinate tuple
+    :param secondVertex:    The second vertex of the triangle.
+    :type secondVertex:     (x, y) coordinate tuple
+    :param thirdVertex:     The third vertex of the triangle.
+    :type thirdVertex:      (x, y) coordinate tuple
+    :returns :              The area of the triangle.
+    :type :                 float
+
+    """
+
+    return abs(((secondVertex[0] - firstVertex[0]) * (thirdVertex[1] - firstVertex[1])) -
+               ((thirdVertex[0] - firstVertex[0]) * (secondVertex[1] - firstVertex[1]))) / 2
+
+
+def calc_vertex_coords(pathVertices, xCoords, halfDeltaX, yCoords, halfDeltaY, cases):
+    """Convert paths with vertices recorded as IDs of points on the (X, Y) grid to paths with vertices recorded as coordinates.
+
+    The coordinates of all vertices are computed at once. The middle of a square is the mean of the midpoints of the sides of the square that a boundary
+    goes through.
+
+    :param pathVertices:    The vertices of each path recorded as IDs (as described in calc_boundary_paths).
+    :type pathVertices:     list of sequences of ints
+    :param xCoords:         The x coordinates where the Z values have been evaluated.
+    :type xCoords:          2 dimensional numpy array
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yCoords:         The y coordinates where the Z values have been evaluated.
+    :type yCoords:          2 dimensional numpy array
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :param cases:           The case index of each square (as returned by calc_square_cases).
+    :type cases:            2 dimensional numpy array
+    :returns :              The vertices of each path recorded as coordinates.
+    :type :                 list of lists of (x, y) coordinate tuples
+
+    """
+
+    # Determine some useful statistics about the grid.
+    numberOfCols = cases.shape[1] + 1
+    numberOfHorizontalSides = (cases.shape[0] + 1) * (numberOfCols - 1)
+    middleOffset = numberOfHorizontalSides + cases.shape[0] * numberOfCols
+
+    # Gather the IDs of all vertices together.
+    pathLengths = [len(i) for i in pathVertices]
+    vertexIDs = np.fromiter(itertools.chain.from_iterable(pathVertices), dtype=np.int64, count=sum(pathLengths))
+    coords = np.empty((vertexIDs.size, 2))
+
+    # Determine the coordinates of the midpoints of the sides between horizontally adjacent points.
+    isVertex = vertexIDs < numberOfHorizontalSides
+    rowIndices, colIndices = np.divmod(vertexIDs[isVertex], numberOfCols - 1)
+    coords[isVertex, 0] = xCoords[rowIndices, colIndices] + halfDeltaX
+    coords[isVertex, 1] = yCoords[rowIndices, colIndices]
+
+    # Determine the coordinates of the midpoints of the sides between vertically adjacent points.
+    isVertex = (vertexIDs >= numberOfHorizontalSides) & (vertexIDs < middleOffset)
+    rowIndices, colIndices = np.divmod(vertexIDs[isVertex] - numberOfHorizontalSides, numberOfCols)
+    coords[isVertex, 0] = xCoords[rowIndices, colIndices]
+    coords[isVertex, 1] = yCoords[rowIndices, colIndices] + halfDeltaY
+
+    # Determine the coordinates of the middles of the squares. The midpoints of the sides are summed in the order a, b, c, d.
+    isVertex = vertexIDs >= middleOffset
+    rowIndices, colIndices = np.divmod(vertexIDs[isVertex] - middleOffset, numberOfCols - 1)
+    squareCases = cases[rowIndices, colIndices]
+    sideMidpoints = [
+        (xCoords[rowIndices, colIndices], yCoords[rowIndices, colIndices] + halfDeltaY),  # a
+        (xCoords[rowIndices + 1, colIndices] + halfDeltaX, yCoords[rowIndices + 1, colIndices]),  # b
+        (xCoords[rowIndices, colIndices + 1], yCoords[rowIndices, colIndices + 1] + halfDeltaY),  # c
+        (xCoords[rowIndices, colIndices] + halfDeltaX, yCoords[rowIndices, colIndices])  # d
+    ]
+    middleXCoords = 0
+    middleYCoords = 0
+    numberOfSidesCrossed = 0
+    for i, j in enumerate(sideMidpoints):
+        sideCrossed = (squareCases & (1 << i)) > 0
+        middleXCoords = middleXCoords + np.where(sideCrossed, j[0], 0)
+        middleYCoords = middleYCoords + np.where(sideCrossed, j[1], 0)
+        numberOfSidesCrossed = numberOfSidesCrossed + sideCrossed
+    coords[isVertex, 0] = middleXCoords / numberOfSidesCrossed
+    coords[isVertex, 1] = middleYCoords / numberOfSidesCrossed
+
+    # Split the coordinates back up into the individual paths.
+    coords = list(map(tuple, coords.tolist()))
+    pathEnds = list(itertools.accumulate(pathLengths))
+    return [coords[i - j:i] for i, j in zip(pathEnds, pathLengths)]
+
+
+def canonicalise_paths(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY):
+    """Put paths into a canonical form.
+
+    Each closed path is rotated to start (and end) at the smallest of the midpoints that it crosses in the positive direction, i.e. midpoints of sides
+    between vertically adjacent points crossed from left to right and midpoints of sides between horizontally adjacent points crossed from bottom to top.
+    As each midpoint is crossed once in each direction, no two paths start at the same point. The paths are then sorted, so that paths made up of the
+    same segments are identical regardless of the order in which the segments were stitched together.
+
+    :param pathVertices:    The vertices of each path. Closed paths start and end with the same vertex.
+    :type pathVertices:     list of sequences of (x, y) coordinate tuples
+    :param xMin:            The smallest x coordinate of the (X, Y) grid.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the (X, Y) grid.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :returns :              The vertices of each path in canonical form.
+    :type :                 list of lists of (x, y) coordinate tuples
+
+    """
+
+    pathVertices = [list(i) for i in pathVertices]
+    rotate_closed_paths(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY)
+    return sorted(pathVertices)
+
+
+def close_paths(paths, openStartingPoints, startsToEnds, xCoords, halfDeltaX, yCoords, halfDeltaY, zValues):
+    """Close open paths.
+
+    All these boundaries will have both start an ending points on an edge of the figure. Each open path is closed by travelling counter-clockwise around
+    the edges of the figure from the end of the path to the start of the next path along the edges, and then following that path. This continues until
+    the start of the original path is reached. In order to find the start of the next path quickly, the points where the paths start and end are
+    converted to positions along the edges of the figure (see calc_perimeter_positions), and the starting positions sorted once. If there are no open
+    paths, then the edges of the figure are returned as the path enclosing the area that touches them.
+
+    :param paths:               The vertices that make up each of the paths.
+    :type paths:                dict of lists of (x, y) coordinate tuples
+    :param openStartingPoints:  The starting points of open paths.
+    :type openStartingPoints:   set of (x, y) coordinate tuples
+    :param startsToEnds:        A mapping from starting points of paths to the ending points of the paths
+    :type startsToEnds:         dict
+    :param xCoords:             The x coordinates where the Z values have been evaluated.
+    :type xCoords:              2 dimensional numpy array
+    :param halfDeltaX:          Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:           float
+    :param yCoords:             The y coordinates where the Z values have been evaluated.
+    :type yCoords:              2 dimensional numpy array
+    :param halfDeltaY:          Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:           float
+    :param zValues:             The z value for each (x,y) pair.
+    :type zValues:              2 dimensional numpy array
+    :returns :                  Mapping from the starting positions to the now closed paths, the interior Z value for each closed path.
+    :type :                     dict mapping (x, y) coordinate tuple to list of tuples, dict mapping (x, y) coordinate tuple to float
+
+    """
+
+    # Determine boundaries of the (X,Y) grid.
+    xMin = xCoords.min()
+    xMax = xCoords.max()
+    yMin = yCoords.min()
+    yMax = yCoords.max()
+    perimeterWidth = int(round((xMax - xMin) / halfDeltaX))  # The width of the figure in half steps.
+    perimeterHeight = int(round((yMax - yMin) / halfDeltaY))  # The height of the figure in half steps.
+    perimeterLength = 2 * (perimeterWidth + perimeterHeight)
+
+    # Setup the return values.
+    newPaths = {}  # Altered paths that have been closed.
+    pathStartToZValue = {}  # Mappings from the starting points of paths to the Z value of the interior of the path.
+    if not openStartingPoints:
+        # If no boundaries meet the edges of the figure, then the area touching the edges is enclosed by the edges themselves.
+        newPaths[(xMin, yMin)] = [(xMin, yMin), (xMax, yMin), (xMax, yMax), (xMin, yMax), (xMin, yMin)]
+        pathStartToZValue[(xMin, yMin)] = zValues[0, 0]
+        return newPaths, pathStartToZValue
+
+    # Determine the positions of the start and end of each open path along the edges of the figure, and sort the paths by the positions of their starts.
+    openStartingPoints = sorted(openStartingPoints)
+    startPositions = calc_perimeter_positions(openStartingPoints, xMin, halfDeltaX, yMin, halfDeltaY, perimeterWidth, perimeterHeight)
+    endPositions = calc_perimeter_positions([paths[i][-1] for i in openStartingPoints], xMin, halfDeltaX, yMin, halfDeltaY, perimeterWidth,
+                                            perimeterHeight)
+    sortedIndices = np.argsort(startPositions, kind='stable')
+    sortedStartPositions = startPositions[sortedIndices]
+
+    # Determine the path that follows each path when travelling counter-clockwise around the edges of the figure. As there is both a start and an end of
+    # a path at each point on the edges of the figure where a boundary meets the edge, the path following a path ending at position p is the one with the
+    # first starting position after p.
+    nextPaths = sortedIndices[np.searchsorted(sortedStartPositions, endPositions, side='right') % len(openStartingPoints)]
+
+    # Determine the corners of the figure and their positions. The corners are listed for two trips around the figure in order to handle trips that go
+    # past the bottom left corner (the position of which is both 0 and perimeterLength).
+    corners = [(perimeterWidth, (xMax, yMin)), (perimeterWidth + perimeterHeight, (xMax, yMax)), (2 * perimeterWidth + perimeterHeight, (xMin, yMax)),
+               (perimeterLength, (xMin, yMin))]
+    corners += [(i + perimeterLength, j) for i, j in corners]
+
+    # Close the paths by following the chain of paths from each path that has not already been closed until the chain returns to its start.
+    startPositions = startPositions.tolist()
+    endPositions = endPositions.tolist()
+    pathClosed = [False] * len(openStartingPoints)
+    for i in sortedIndices.tolist():
+        if pathClosed[i]:
+            continue
+        currentStartingPoint = openStartingPoints[i]
+        currentPath = []
+        currentIndex = i
+        while not pathClosed[currentIndex]:
+            pathClosed[currentIndex] = True
+            currentPath.extend(paths[openStartingPoints[currentIndex]])
+
+            # Add the corners passed while travelling along the edges of the figure to the start of the next path.
+            nextIndex = nextPaths[currentIndex]
+            endPosition = endPositions[currentIndex]
+            nextStartPosition = startPositions[nextIndex]
+            if nextStartPosition < endPosition:
+                nextStartPosition += perimeterLength
+            currentPath.extend([k for j, k in corners if endPosition < j < nextStartPosition])
+            currentIndex = nextIndex
+
+        # Close the path now that the starting point has been reached.
+        currentPath.append(currentStartingPoint)
+
+        # Determine the Z value of the area enclosed by the path. As the first line segment of the path goes from the edge of the figure into the
+        # figure, the point just to its left is the point on the (X, Y) grid one half step clockwise along the edge from the starting point.
+        pointToCheck = calc_interior_point(currentPath, xMin, halfDeltaX, yMin, halfDeltaY)
+        areaZValue = zValues[calc_grid_index(pointToCheck, xMin, halfDeltaX, yMin, halfDeltaY)]
+
+        # Record the path and Z value information for the starting point.
+        pathStartToZValue[currentStartingPoint] = areaZValue
+        newPaths[currentStartingPoint] = currentPath
+
+    return newPaths, pathStartToZValue
+
+
+def discretise_z_values(zValues, levels):
+    """Discretise Z values based on a set of levels.
+
+    A Z value z is given the discretised value i + 1 when levels[i - 1] < z <= levels[i], with all values <= levels[0] given the value 1 and all values
+    > levels[-1] given the value len(levels) + 1.
+
+    :param zValues:     The Z values to discretise.
+    :type zValues:      numpy array or scalar
+    :param levels:      The levels at which to discretise the Z values.
+    :type levels:       extendable list like object (or None if the Z values are already discretised)
+    :returns :          The discretised Z values.
+    :type :             numpy array or scalar
+
+    """
+
+    if not levels:
+        return zValues
+    return np.digitize(zValues, levels, right=True) + 1
+
+
+def flatten_paths(pathVertices):
+    """Combine the vertices of paths into a single array.
+
+    :param pathVertices:    The vertices of each path.
+    :type pathVertices:     list of lists of (x, y) coordinate tuples
+    :returns :              The vertices of all the paths, and the index of the first vertex of each path followed by the total number of vertices.
+    :type :                 2 dimensional numpy array with one row per vertex, 1 dimensional numpy array of ints
+
+    """
+
+    pathLengths = [len(i) for i in pathVertices]
+    vertices = np.array([j for i in pathVertices for j in i], dtype=float).reshape(-1, 2)
+    return vertices, np.cumsum([0] + pathLengths, dtype=np.int64)
+
+
+def flatten_regions(boundaryPaths, regions):
+    """Combine the boundaries and regions of a discretised heatmap into flat arrays.
+
+    :param boundaryPaths:   The vertices of each boundary path (as returned by calc_boundaries).
+    :type boundaryPaths:    list of lists of (x, y) coordinate tuples
+    :param regions:         The vertices of the outer path, the vertices of the paths of the holes and the Z value of each region (as returned by
+                            calc_regions).
+    :type regions:          list of (list of (x, y) coordinate tuples, list of lists of (x, y) coordinate tuples, Z value) tuples
+    :returns :              The boundaries and regions (in the form returned by compute_regions).
+    :type :                 dict of numpy arrays
+
+    """
+
+    boundaryVertices, boundaryOffsets = flatten_paths(boundaryPaths)
+    regionVertices, ringOffsets = flatten_paths([j for i in regions for j in [i[0]] + list(i[1])])
+    regionOffsets = np.cumsum([0] + [len(i[1]) + 1 for i in regions], dtype=np.int64)
+    return {'boundaryVertices': boundaryVertices, 'boundaryOffsets': boundaryOffsets, 'regionVertices': regionVertices, 'ringOffsets': ringOffsets,
+            'regionOffsets': regionOffsets, 'regionZValues': np.array([i[2] for i in regions])}
+
+
+def format_svg_color(color):
+    """Convert a color to a form accepted by SVG.
+
+    :param color:   The color to convert.
+    :type color:    a color name, hex string or tuple of RGB(A) values between 0 and 1
+    :returns :      The color.
+    :type :         str
+
+    """
+
+    if isinstance(color, str):
+        return color
+    return 'rgb({0:d},{1:d},{2:d})'.format(*[int(round(255 * i)) for i in color[:3]])
+
+
+def generate_tiles(numberOfRows, numberOfCols, tileHeight, tileWidth):
+    """Generate the tiles that a grid is split into.
+
+    Each tile contains up to tileHeight x tileWidth squares (and therefore tileHeight + 1 rows and tileWidth + 1 columns of points). Adjacent tiles overlap
+    by one row or column of points, so that every square is in exactly one tile.
+
+    :param numberOfRows:    The number of rows of points in the grid.
+    :type numberOfRows:     int
+    :param numberOfCols:    The number of columns of points in the grid.
+    :type numberOfCols:     int
+    :param tileHeight:      The number of rows of squares in a tile.
+    :type tileHeight:       int
+    :param tileWidth:       The number of columns of squares in a tile.
+    :type tileWidth:        int
+    :returns :              The first row, last row + 1, first column and last column + 1 of each tile.
+    :type :                 generator of (int, int, int, int) tuples
+
+    """
+
+    for rowStart in range(0, max(numberOfRows - 1, 1), tileHeight):
+        for colStart in range(0, max(numberOfCols - 1, 1), tileWidth):
+            yield rowStart, min(rowStart + tileHeight + 1, numberOfRows), colStart, min(colStart + tileWidth + 1, numberOfCols)
+
+
+def load_cached_regions(cacheDirectory, cacheKey):
+    """Load the cached boundaries and regions of a discretised heatmap.
+
+    The modification time of the cached file is updated when it is loaded, so that the least recently used files are the ones removed when the cache
+    grows too large (see save_cached_regions).
+
+    :param cacheDirectory:  The directory in which the boundaries and regions are cached.
+    :type cacheDirectory:   str
+    :param cacheKey:        The key under which the boundaries and regions are cached (as returned by calc_cache_key).
+    :type cacheKey:         str
+    :returns :              The boundaries and regions (in the form returned by compute_regions).
+    :type :                 dict of numpy arrays (or None if they are not cached)
+
+    """
+
+    cacheFile = os.path.join(cacheDirectory, cacheKey + '.npz')
+    try:
+        with np.load(cacheFile) as cachedData:
+            regions = {i: cachedData[i] for i in cachedData.files}
+        os.utime(cacheFile)
+    except (IOError, OSError, ValueError):
+        # The file is missing, has been removed while being loaded or is corrupt.
+        return None
+    return regions
+
+
+def rotate_closed_paths(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY):
+    """Rotate each closed path in place to start (and end) at the smallest of the midpoints that it crosses in the positive direction.
+
+    See canonicalise_paths.
+
+    :param pathVertices:    The vertices of each path. Closed paths start and end with the same vertex.
+    :type pathVertices:     list of lists of (x, y) coordinate tuples
+    :param xMin:            The smallest x coordinate of the (X, Y) grid.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the (X, Y) grid.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+
+    """
+
+    closedPaths = [i for i in pathVertices if i[0] == i[-1]]
+    if closedPaths:
+        # Determine the vertices of the closed paths along with the vertices before and after them.
+        pathLengths = np.array([len(i) - 1 for i in closedPaths], dtype=np.int64)  # The number of distinct vertices in each closed path.
+        pathStarts = np.cumsum(pathLengths) - pathLengths
+        pathIndices = np.repeat(np.arange(len(closedPaths)), pathLengths)
+        positions = np.arange(pathLengths.sum()) - pathStarts[pathIndices]  # The position of each vertex in its path.
+        vertices = np.array([j for i in closedPaths for j in i[:-1]], dtype=float)
+        previousVertices = vertices[pathStarts[pathIndices] + ((positions - 1) % pathLengths[pathIndices])]
+        nextVertices = vertices[pathStarts[pathIndices] + ((positions + 1) % pathLengths[pathIndices])]
+
+        # Determine the midpoints crossed in the positive direction. Midpoints on the X grid lines are on sides between vertically adjacent points, and
+        # midpoints on the Y grid lines are on sides between horizontally adjacent points. The middles of squares are on neither.
+        onXGrid = np.rint((vertices[:, 0] - xMin) / halfDeltaX) % 2 == 0
+        onYGrid = np.rint((vertices[:, 1] - yMin) / halfDeltaY) % 2 == 0
+        positive = ((onXGrid & ~onYGrid & (nextVertices[:, 0] > previousVertices[:, 0])) |
+                    (onYGrid & ~onXGrid & (nextVertices[:, 1] > previousVertices[:, 1])))
+
+        # Find the smallest positively crossed midpoint of each path, and rotate the path to start there.
+        candidates = np.nonzero(positive)[0]
+        candidates = candidates[np.lexsort((vertices[candidates, 1], vertices[candidates, 0], pathIndices[candidates]))]
+        _, firstCandidates = np.unique(pathIndices[candidates], return_index=True)
+        for i, j in zip(closedPaths, positions[candidates[firstCandidates]].tolist()):
+            i[:] = i[j:-1] + i[:j + 1]
+
+
+def save_cached_regions(cacheDirectory, cacheKey, regions, cacheSize):
+    """Cache the boundaries and regions of a discretised heatmap, removing the least recently used cached files if the cache becomes too large.
+
+    The file is written under a temporary name and then renamed, so that a partially written file is never loaded.
+
+    :param cacheDirectory:  The directory in which to cache the boundaries and regions.
+    :type cacheDirectory:   str
+    :param cacheKey:        The key under which to cache the boundaries and regions (as returned by calc_cache_key).
+    :type cacheKey:         str
+    :param regions:         The boundaries and regions (as returned by compute_regions).
+    :type regions:          dict of numpy arrays
+    :param cacheSize:       The maximum total size in bytes of the cached files.
+    :type cacheSize:        int
+
+    """
+
+    if not os.path.isdir(cacheDirectory):
+        os.makedirs(cacheDirectory)
+
+    # Write the compressed file.
+    fileDescriptor, tempFile = tempfile.mkstemp(suffix='.tmp', dir=cacheDirectory)
+    with os.fdopen(fileDescriptor, 'wb') as writeData:
+        np.savez_compressed(writeData, **regions)
+    os.replace(tempFile, os.path.join(cacheDirectory, cacheKey + '.npz'))
+
+    # Remove the least recently used files until the cache is small enough.
+    cachedFiles = []
+    for i in os.listdir(cacheDirectory):
+        if i.endswith('.npz'):
+            try:
+                fileStats = os.stat(os.path.join(cacheDirectory, i))
+            except OSError:
+                continue
+            cachedFiles.append((fileStats.st_mtime, fileStats.st_size, i))
+    totalSize = sum([i[1] for i in cachedFiles])
+    for _, fileSize, fileName in sorted(cachedFiles):
+        if totalSize <= cacheSize:
+            break
+        try:
+            os.remove(os.path.join(cacheDirectory, fileName))
+        except OSError:
+            pass
+        totalSize -= fileSize
+
+
+def simplify_douglas_peucker(pathVertices, tolerance):
+    """Simplify a path using the Douglas-Peucker algorithm.
+
+    The vertex furthest from the line segment joining the first and last vertices is kept if it is further than the tolerance from the segment, in which
+    case the parts of the path on either side of it are simplified in the same way. The first and last vertices are always kept.
+
+    :param pathVertices:    The vertices that make up the path.
+    :type pathVertices:     2 dimensional numpy array with one row per vertex
+    :param tolerance:       The largest distance that a removed vertex may be from the simplified path.
+    :type tolerance:        float
+    :returns :              The vertices of the simplified path.
+    :type :                 2 dimensional numpy array with one row per vertex
+
+    """
+
+    keep = np.zeros(len(pathVertices), dtype=bool)
+    keep[[0, -1]] = True
+    sections = [(0, len(pathVertices) - 1)]
+    while sections:
+        start, end = sections.pop()
+        if end - start < 2:
+            continue
+
+        # Determine the distance of each vertex between the start and end from the segment joining them.
+        segment = pathVertices[end] - pathVertices[start]
+        offsets = pathVertices[start + 1:end] - pathVertices[start]
+        segmentLength = segment.dot(segment)
+        positions = np.clip(offsets.dot(segment) / segmentLength, 0, 1) if segmentLength else 0
+        distances = np.hypot(*(offsets - np.outer(positions, segment)).T)
+
+        # Keep the furthest vertex if it is too far from the segment.
+        furthest = int(np.argmax(distances))
+        if distances[furthest] > tolerance:
+            keep[start + 1 + furthest] = True
+            sections.append((start, start + 1 + furthest))
+            sections.append((start + 1 + furthest, end))
+    return pathVertices[keep]
+
+
+def simplify_paths(pathVertices, tolerance=0, method='douglas-peucker', bounds=None):
+    """Simplify the boundary paths of a discretised heatmap.
+
+    Runs of collinear vertices are first merged, which leaves the shape of the paths unchanged. If the tolerance is greater than 0, the paths are then
+    simplified using the Douglas-Peucker (see simplify_douglas_peucker) or Visvalingam (see simplify_visvalingam) algorithm.
+
+    The paths are split at the vertices on the edges of the (X, Y) grid, and each section is simplified in the direction that starts from its smaller
+    end. Simplifying the paths enclosing the regions (see simplify_regions) therefore gives the same sections as simplifying the boundary paths, and no
+    gaps open up between adjacent regions. Large tolerances can cause simplified paths to cross one another.
+
+    :param pathVertices:    The vertices of each path.
+    :type pathVertices:     list of lists of (x, y) coordinate tuples
+    :param tolerance:       The tolerance (in data units) of the simplification.
+    :type tolerance:        float
+    :param method:          The method used to simplify the paths.
+    :type method:           'douglas-peucker' or 'visvalingam'
+    :param bounds:          The smallest x coordinate, largest x coordinate, smallest y coordinate and largest y coordinate of the (X, Y) grid.
+    :type bounds:           tuple of floats (or None if no vertices lie on the edges of the grid)
+    :returns :              The vertices of each simplified path.
+    :type :                 list of 2 dimensional numpy arrays
+
+    """
+
+    simplifiedPaths = []
+    for i in pathVertices:
+        i = np.asarray(i, dtype=float).reshape(-1, 2)
+        if len(i) < 3:
+            simplifiedPaths.append(i)
+            continue
+
+        # Determine the vertices at which to split the path.
+        splitIndices = {0, len(i) - 1}
+        if bounds:
+            onEdge = (i[:, 0] == bounds[0]) | (i[:, 0] == bounds[1]) | (i[:, 1] == bounds[2]) | (i[:, 1] == bounds[3])
+            splitIndices.update(np.flatnonzero(onEdge).tolist())
+        splitIndices = sorted(splitIndices)
+
+        # Simplify each section of the path.
+        sections = [i[:1]]
+        for start, end in zip(splitIndices[:-1], splitIndices[1:]):
+            section = i[start:end + 1]
+            isReversed = tuple(section[-1]) < tuple(section[0]) or (tuple(section[-1]) == tuple(section[0]) and tuple(section[-2]) < tuple(section[1]))
+            if isReversed:
+                section = section[::-1]
+            section = simplify_section(section, tolerance, method)
+            if isReversed:
+                section = section[::-1]
+            sections.append(section[1:])
+        simplifiedPaths.append(np.concatenate(sections))
+    return simplifiedPaths
+
+
+def simplify_regions(regions, tolerance=0, method='douglas-peucker', bounds=None):
+    """Simplify the paths enclosing the regions of a discretised heatmap.
+
+    :param regions:     The vertices of the outer path, the vertices of the paths of the holes and the Z value of each region (as returned by
+                        calc_regions).
+    :type regions:      list of (list of (x, y) coordinate tuples, list of lists of (x, y) coordinate tuples, Z value) tuples
+    :param tolerance:   The tolerance (in data units) of the simplification (see simplify_paths).
+    :type tolerance:    float
+    :param method:      The method used to simplify the paths.
+    :type method:       'douglas-peucker' or 'visvalingam'
+    :param bounds:      The smallest x coordinate, largest x coordinate, smallest y coordinate and largest y coordinate of the (X, Y) grid.
+    :type bounds:       tuple of floats
+    :returns :          The simplified regions.
+    :type :             list of (2 dimensional numpy array, list of 2 dimensional numpy arrays, Z value) tuples
+
+    """
+
+    simplifiedRegions = []
+    for outerPath, holePaths, regionZValue in regions:
+        simplifiedPaths = simplify_paths([outerPath] + list(holePaths), tolerance, method, bounds)
+        simplifiedRegions.append((simplifiedPaths[0], simplifiedPaths[1:], regionZValue))
+    return simplifiedRegions
+
+
+def simplify_section(pathVertices, tolerance, method):
+    """Simplify a path after merging its runs of collinear vertices.
+
+    A vertex is collinear with its neighbours if the path continues in the same direction through it, in which case removing it does not change the shape
+    of the path. The first and last vertices are always kept.
+
+    :param pathVertices:    The vertices that make up the path.
+    :type pathVertices:     2 dimensional numpy array with one row per vertex
+    :param tolerance:       The tolerance (in data units) of the simplification.
+    :type tolerance:        float
+    :param method:          The method used to simplify the path.
+    :type method:           'douglas-peucker' or 'visvalingam'
+    :returns :              The vertices of the simplified path.
+    :type :                 2 dimensional numpy array with one row per vertex
+
+    """
+
+    # Merge the runs of collinear vertices. The cross products are compared to the product of the lengths of the line segments to allow for rounding.
+    incoming = pathVertices[1:-1] - pathVertices[:-2]
+    outgoing = pathVertices[2:] - pathVertices[1:-1]
+    crossProducts = (incoming[:, 0] * outgoing[:, 1]) - (incoming[:, 1] * outgoing[:, 0])
+    dotProducts = (incoming * outgoing).sum(axis=1)
+    isCollinear = (np.abs(crossProducts) <= 1e-9 * np.hypot(*incoming.T) * np.hypot(*outgoing.T)) & (dotProducts > 0)
+    pathVertices = pathVertices[np.concatenate([[True], ~isCollinear, [True]])]
+
+    if tolerance <= 0 or len(pathVertices) < 3:
+        return pathVertices
+    elif method == 'douglas-peucker':
+        return simplify_douglas_peucker(pathVertices, tolerance)
+    elif method == 'visvalingam':
+        return simplify_visvalingam(pathVertices, tolerance)
+    raise ValueError('Unknown simplification method: {0}'.format(method))
+
+
+def simplify_visvalingam(pathVertices, tolerance):
+    """Simplify a path using the Visvalingam-Whyatt algorithm.
+
+    The vertex forming the triangle with the smallest area with its neighbours is repeatedly removed until every remaining triangle has an area of at
+    least tolerance ** 2. The area of the triangle formed by a vertex is never allowed to be smaller than that of a vertex removed before it, so vertices
+    are removed in order of their significance. The first and last vertices are always kept.
+
+    :param pathVertices:    The vertices that make up the path.
+    :type pathVertices:     2 dimensional numpy array with one row per vertex
+    :param tolerance:       The square root of the smallest triangle area that a kept vertex may form.
+    :type tolerance:        float
+    :returns :              The vertices of the simplified path.
+    :type :                 2 dimensional numpy array with one row per vertex
+
+    """
+
+    minimumArea = tolerance ** 2
+    numberOfVertices = len(pathVertices)
+    previousVertices = list(range(-1, numberOfVertices - 1))
+    nextVertices = list(range(1, numberOfVertices + 1))
+    areas = [None] + [calc_triangle_area(pathVertices[i - 1], pathVertices[i], pathVertices[i + 1]) for i in range(1, numberOfVertices - 1)] + [None]
+    heap = [(areas[i], i) for i in range(1, numberOfVertices - 1)]
+    heapq.heapify(heap)
+    keep = np.ones(numberOfVertices, dtype=bool)
+    while heap:
+        area, vertex = heapq.heappop(heap)
+        if not keep[vertex] or area != areas[vertex]:
+            # The vertex has already been removed or its area has changed since it was added to the heap.
+            continue
+        elif area >= minimumArea:
+            break
+
+        # Remove the vertex, and update the areas of the triangles formed by its neighbours.
+        keep[vertex] = False
+        previousVertex = previousVertices[vertex]
+        nextVertex = nextVertices[vertex]
+        nextVertices[previousVertex] = nextVertex
+        previousVertices[nextVertex] = previousVertex
+        for i in (previousVertex, nextVertex):
+            if 0 < i < numberOfVertices - 1:
+                triangleArea = calc_triangle_area(pathVertices[previousVertices[i]], pathVertices[i], pathVertices[nextVertices[i]])
+                areas[i] = max(triangleArea, area)
+                heapq.heappush(heap, (areas[i], i))
+    return pathVertices[keep]
+
+
+def split_flat_paths(vertices, offsets):
+    """Split the combined vertices of paths back up into the individual paths.
+
+    :param vertices:    The vertices of all the paths (as returned by flatten_paths).
+    :type vertices:     2 dimensional numpy array with one row per vertex
+    :param offsets:     The index of the first vertex of each path followed by the total number of vertices.
+    :type offsets:      1 dimensional numpy array of ints
+    :returns :          The vertices of each path.
+    :type :             list of 2 dimensional numpy arrays
+
+    """
+
+    return [vertices[i:j] for i, j in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def split_flat_regions(regions):
+    """Split the combined boundaries and regions of a discretised heatmap back up into the individual boundaries and regions.
+
+    :param regions:     The boundaries and regions (as returned by compute_regions).
+    :type regions:      dict of numpy arrays
+    :returns :          The vertices of each boundary path, and the vertices of the outer path, the vertices of the paths of the holes and the Z value of
+                        each region (in the form returned by calc_regions).
+    :type :             list of 2 dimensional numpy arrays, list of (2 dimensional numpy array, list of 2 dimensional numpy arrays, Z value) tuples
+
+    """
+
+    boundaryPaths = split_flat_paths(regions['boundaryVertices'], regions['boundaryOffsets'])
+    rings = split_flat_paths(regions['regionVertices'], regions['ringOffsets'])
+    regionOffsets = regions['regionOffsets'].tolist()
+    regionPaths = [(rings[i], rings[i + 1:j], k) for i, j, k in zip(regionOffsets[:-1], regionOffsets[1:], regions['regionZValues'])]
+    return boundaryPaths, regionPaths
+
+
+def stitch_tile_paths(tilePaths):
+    """Stitch the paths from the tiles of the (X, Y) grid together.
+
+    :param tilePaths:       For each tile, the vertices of the closed paths and the open paths along with the keys (in the whole grid) of their ends (as
+                            returned by calc_tile_paths).
+    :type tilePaths:        iterable of (list of lists of (x, y) coordinate tuples, list of [startKey, vertices, endKey]) tuples
+    :returns :              The vertices of each path. Closed paths start and end with the same vertex.
+    :type :                 list of lists of (x, y) coordinate tuples
+
+    """
+
+    closedPaths = []  # The paths that were closed within a tile.
+    stitcher = BoundaryStitcher()  # The stitcher used to join the paths that cross the edges of the tiles.
+    for tileClosedPaths, tileOpenPaths in tilePaths:
+        closedPaths.extend(tileClosedPaths)
+        for startKey, vertices, endKey in tileOpenPaths:
+            stitcher.add_path(vertices, startKey, endKey)
+    return closedPaths + [list(i) for i in stitcher.get_paths()]
+
+
+def test_clockwise(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY, zValues):
+    """Test whether a closed path is counter-clockwise.
+
+    The orientation of the path is given by the sign of the area it encloses. The Z value of the interior of a counter-clockwise path is the Z value of
+    the point on the (X, Y) grid just to the left of its first line segment (see calc_interior_point).
+
+    :param pathVertices:    The vertices that make up the path (with the first and last vertices being the same).
+    :type pathVertices:     list of (x, y) coordinate tuples
+    :param xMin:            The smallest x coordinate of the (X, Y) grid.
+    :type xMin:             float
+    :param halfDeltaX:      Half the distance between adjacent X coordinate values.
+    :type halfDeltaX:       float
+    :param yMin:            The smallest y coordinate of the (X, Y) grid.
+    :type yMin:             float
+    :param halfDeltaY:      Half the distance between adjacent Y coordinate values.
+    :type halfDeltaY:       float
+    :param zValues:         The z value for each (x,y) pair.
+    :type zValues:          2 dimensional numpy array
+    :returns :              Whether the path is counter-clockwise, and the Z value of the interior of the path.
+    :type :                 boolean, float
+
+    """
+
+    if calc_signed_area(np.array(pathVertices, dtype=float)) <= 0:
+        # The path is not counter-clockwise.
+        return False, 'none'
+
+    # Get the Z value of the interior of the counter-clockwise path.
+    pointToCheck = calc_interior_point(pathVertices, xMin, halfDeltaX, yMin, halfDeltaY)
+    return True, zValues[calc_grid_index(pointToCheck, xMin, halfDeltaX, yMin, halfDeltaY)]
+
+
+def test_inside(point, pathVertices):
+    """Test whether a point is inside a closed path.
+
+    The test counts the number of edges of the path that a ray cast from the point in the positive X direction crosses. The point should not lie on the
+    path.
+
+    :param point:           The point to test.
+    :type point:            (x, y) coordinate tuple
+    :param pathVertices:    The vertices that make up the path (with the first and last vertices being the same).
+    :type pathVertices:     2 dimensional numpy array with one row per vertex
+    :returns :              Whether the point is inside the path.
+    :type :                 boolean
+
+    """
+
+    startXValues = pathVertices[:-1, 0]
+    startYValues = pathVertices[:-1, 1]
+    endXValues = pathVertices[1:, 0]
+    endYValues = pathVertices[1:, 1]
+
+    # Determine the edges that straddle the ray, and where they meet the line that the ray is on.
+    straddling = (startYValues > point[1]) != (endYValues > point[1])
+    startXValues = startXValues[straddling]
+    startYValues = startYValues[straddling]
+    crossingXValues = startXValues + ((point[1] - startYValues) * (endXValues[straddling] - startXValues) / (endYValues[straddling] - startYValues))
+    return bool(np.count_nonzero(crossingXValues > point[0]) % 2)
+
+
+def write_geojson(regions, outputLocation, boundaries=True):
+    """Write the regions and boundaries of a discretised heatmap to a GeoJSON file.
+
+    Each region is written as a Polygon feature with its Z value recorded in its 'z' property. The boundaries are written as a single MultiLineString
+    feature with its 'boundary' property set to true.
+
+    :param regions:         The boundaries and regions (as returned by compute_regions).
+    :type regions:          dict of numpy arrays
+    :param outputLocation:  The location where the GeoJSON file will be saved.
+    :type outputLocation:   str
+    :param boundaries:      Whether the boundaries should be written.
+    :type boundaries:       boolean
+
+    """
+
+    # Create the features for the regions.
+    features = []
+    rings = split_flat_paths(regions['regionVertices'], regions['ringOffsets'])
+    regionOffsets = regions['regionOffsets'].tolist()
+    for i, j in enumerate(regions['regionZValues'].tolist()):
+        polygon = {'type': 'Polygon', 'coordinates': [k.tolist() for k in rings[regionOffsets[i]:regionOffsets[i + 1]]]}
+        features.append({'type': 'Feature', 'properties': {'z': j}, 'geometry': polygon})
+
+    # Create the feature for the boundaries.
+    if boundaries:
+        lines = {'type': 'MultiLineString', 'coordinates': [i.tolist() for i in split_flat_paths(regions['boundaryVertices'], regions['boundaryOffsets'])]}
+        features.append({'type': 'Feature', 'properties': {'boundary': True}, 'geometry': lines})
+
+    with open(outputLocation, 'w') as writeData:
+        json.dump({'type': 'FeatureCollection', 'features': features}, writeData)
+
+
+def write_svg(regions, outputLocation, colorSet='set2', colorMapping=None, fillAlpha=1.0, boundary=True, boundaryColor='black', boundaryWidth=2,
+              width=800):
+    """Write the regions and boundaries of a discretised heatmap to an SVG file.
+
+    Each region is written as a single path element, with its holes cut out by the nonzero fill rule. The boundaries are written as a single path
+    element. As the y axis of SVG points down, the y coordinates are negated.
+
+    :param regions:         The boundaries and regions (as returned by compute_regions).
+    :type regions:          dict of numpy arrays
+    :param outputLocation:  The location where the SVG file will be saved.
+    :type outputLocation:   str
+    :param colorSet:        The color set to use in filling the regions. If colorMapping is provided this parameter is ignored. Otherwise, the color set
+                            will be cycled through to assign colors to distinct Z values (so should have at least as many colors as there are distinct Z
+                            values).
+    :type colorSet:         any key in the colors.colorMaps dictionary
+    :param colorMapping:    A mapping from distinct Z values to their RGB color value.
+    :type colorMapping:     dict
+    :param fillAlpha:       The alpha value for the fill of the regions.
+    :type fillAlpha:        float between 0 and 1
+    :param boundary:        Whether the boundaries should be written.
+    :type boundary:         boolean
+    :param boundaryColor:   The color for the boundaries.
+    :type boundaryColor:    a color name, hex string or tuple of RGB(A) values between 0 and 1
+    :param boundaryWidth:   The width of the boundaries in pixels.
+    :type boundaryWidth:    float
+    :param width:           The width of the image in pixels (the height is scaled to match the (X, Y) grid).
+    :type width:            float
+
+    """
+
+    # Map the Z values to colors. If there are more distinct Z values than colors, then multiple Z values will be mapped to the same color.
+    regionZValues = regions['regionZValues'].tolist()
+    if not colorMapping:
+        colorsToUse = colors.colorMaps[colorSet]
+        numberOfColors = len(colorsToUse)
+        colorMapping = {}
+        for i, j in enumerate(sorted(set(regionZValues))):
+            colorMapping[j] = colorsToUse[i % numberOfColors]
+
+    # Determine the extent of the image. The regions cover the whole (X, Y) grid.
+    xMin, yMin = regions['regionVertices'].min(axis=0)
+    xMax, yMax = regions['regionVertices'].max(axis=0)
+    height = width * (yMax - yMin) / (xMax - xMin)
+    elements = ['<svg xmlns="http://www.w3.org/2000/svg" width="{0:g}" height="{1:g}" viewBox="{2:.10g} {3:.10g} {4:.10g} {5:.10g}">'.format(
+                width, height, xMin, -yMax, xMax - xMin, yMax - yMin)]
+
+    # Create the paths for the regions.
+    rings = ['M' + ' L'.join('{0:.10g},{1:.10g}'.format(j[0], -j[1]) for j in i.tolist()) + ' Z'
+             for i in split_flat_paths(regions['regionVertices'], regions['ringOffsets'])]
+    regionOffsets = regions['regionOffsets'].tolist()
+    for i, j in enumerate(regionZValues):
+        elements.append('<path d="{0}" fill="{1}" fill-opacity="{2:g}" fill-rule="nonzero" stroke="none"/>'.format(
+                        ' '.join(rings[regionOffsets[i]:regionOffsets[i + 1]]), format_svg_color(colorMapping[j]), fillAlpha))
+
+    # Create the path for the boundaries.
+    if boundary:
+        lines = ['M' + ' L'.join('{0:.10g},{1:.10g}'.format(j[0], -j[1]) for j in i.tolist())
+                 for i in split_flat_paths(regions['boundaryVertices'], regions['boundaryOffsets'])]
+        elements.append('<path d="{0}" fill="none" stroke="{1}" stroke-width="{2:g}" stroke-linejoin="miter" vector-effect="non-scaling-stroke"/>'.format(
+                        ' '.join(lines), format_svg_color(boundaryColor), boundaryWidth))
+    elements.append('</svg>')
+
+    with open(outputLocation, 'w') as writeData:
+        writeData.write('\n'.join(elements) + '\n')
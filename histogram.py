@@ -2,17 +2,31 @@ import argparse
 import matplotlib.patches as patches
 import matplotlib.path as path
 import matplotlib.pyplot as plt
+from multiprocessing import Pool
+import numpy as np
 import pandas
 import sys
 
 import colors
 
 
-def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', title='', direction='Up', columnToPlot=0, bins=10):
+def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', title='', direction='Up', columnToPlot=0, bins=10, chunkSize=None,
+         valueRange=None, poolSize=1):
     """Create a scatter plot of a given dataset.
 
+    If a list of dataset locations is given, a histogram of the values in all the datasets is created. A HistogramAccumulator is built for each dataset
+    (in parallel if poolSize is greater than 1), and the accumulators are merged. Each dataset is read a chunk of rows at a time (chunkSize rows at a time
+    if it is set). Unless the range of the values is given, the edges of the bins are adapted to the data (see HistogramAccumulator).
+
+    The number of bins can be chosen automatically from the data using the rules accepted by calc_number_of_bins. The statistics needed by the rules are
+    estimated in a single pass through the data by a QuantileSketch. When the data is streamed, this pass also finds the range of the values.
+
+    If chunkSize is set, the dataset is streamed through in chunks of rows rather than being read into memory all at once, and only the column
+    containing the data for the histogram is parsed. Unless the range of the values is given, the file is read twice: once to find the range of the
+    values and once to count the values in each bin.
+
     :param datasetLocation:     The location of the dataset to generate a scatterplot from.
-    :type datasetLocation:      str
+    :type datasetLocation:      str (or list of str)
     :param outputLocation:      The location where the figure should be saved.
     :type outputLocation:       str
     :param headerPresent:       Whether a single line header is present in the dataset file.
@@ -25,17 +39,348 @@ def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', t
     :type direction:            str
     :param columnToPlot:        The column containing the data for the histogram.
     :type columnToPlot:         int
-    :param bins:                The number of equally spaced bins to use.
-    :type bins:                 int
+    :param bins:                The number of equally spaced bins to use, or the rule used to choose it.
+    :type bins:                 int or one of 'fd', 'scott' or 'sturges'
+    :param chunkSize:           The number of rows to read at a time.
+    :type chunkSize:            int (or None if the whole dataset should be read at once)
+    :param valueRange:          The smallest and largest values to include in the histogram when streaming through the dataset. Values outside this
+                                range are not counted.
+    :type valueRange:           (float, float) tuple (or None if the range should be determined from the data)
+    :param poolSize:            The number of workers to create in the multiprocessing.Pool process pool used to read multiple datasets.
+    :type poolSize:             int
 
     """
 
+    if not isinstance(datasetLocation, str):
+        # Merge the histograms of the values in each dataset.
+        header = pandas.read_csv(datasetLocation[0], sep=separator, header=(0 if headerPresent else None), nrows=1)
+        columnIndex = columnToPlot % len(header.columns)
+        if isinstance(bins, str):
+            # Choose the number of bins, and use the range of the values if it is not given.
+            sketch = sketch_files(datasetLocation, columnIndex, headerPresent, separator, chunkSize or 1000000, valueRange, poolSize)
+            valueRange = valueRange or (sketch.minValue, sketch.maxValue)
+            bins = calc_number_of_bins(bins, sketch)
+        accumulator = accumulate_files(datasetLocation, columnIndex, bins, headerPresent, separator, chunkSize or 1000000, valueRange, poolSize)
+        accumulator.plot(direction=direction, outputLocation=outputLocation, title=title, xLabel=header.columns[columnIndex], yLabel='Counts')
+        return
+
+    if chunkSize:
+        # Stream through the dataset, reading only the column to plot.
+        header = pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None), nrows=1)
+        columnIndex = columnToPlot % len(header.columns)
+        minValue, maxValue, binCounts = calc_streamed_bin_counts(datasetLocation, columnIndex, bins, headerPresent, separator, chunkSize, valueRange)
+        plot_counts(binCounts, minValue, maxValue, direction=direction, outputLocation=outputLocation, title=title, xLabel=header.columns[columnIndex],
+                    yLabel='Counts')
+        return
+
     # Extract the data.
     dataset = pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None))
 
     # Extract the data to plot and plot it.
     data = dataset.iloc[:, columnToPlot]
-    plot(data, bins=bins, outputLocation=outputLocation, title=title, xLabel=dataset.columns[columnToPlot], yLabel='Counts')
+    plot(data, bins=bins, direction=direction, outputLocation=outputLocation, title=title, xLabel=dataset.columns[columnToPlot], yLabel='Counts')
+
+
+class HistogramAccumulator:
+    """A histogram that values can be added to incrementally, and that can be merged with other histograms.
+
+    If a range of values is given, the edges of the bins are fixed, with the bins equally spaced across the range (see plot). Values outside the range are
+    not counted. Only accumulators with the same range and number of bins can be merged.
+
+    Otherwise the edges of the bins adapt to the values added. Bin i covers the values >= (start + i) * binWidth and < (start + i + 1) * binWidth, where
+    the bin width is a power of 2, so the bins of all adaptive accumulators lie on the same grid. When the values no longer fit in the maximum number of
+    bins, the bin width is doubled by merging adjacent pairs of bins. As the bins of a finer accumulator can be merged to match those of a coarser one,
+    any two adaptive accumulators can be merged exactly, and the result does not depend on the order in which the values were added or the accumulators
+    merged. Between half the maximum number of bins and the maximum number of bins are used once the values span more than one bin.
+
+    """
+
+    def __init__(self, bins=10, valueRange=None):
+        """Create an empty histogram.
+
+        :param bins:        The number of bins (the maximum number of bins if the range is not given).
+        :type bins:         int
+        :param valueRange:  The smallest and largest values to count.
+        :type valueRange:   (float, float) tuple (or None if the edges of the bins should adapt to the values)
+
+        """
+
+        self.bins = bins
+        self.valueRange = tuple(valueRange) if valueRange else None
+        if self.valueRange:
+            self.binCounts = np.zeros(bins, dtype=np.int64)
+            self.binWidth = (self.valueRange[1] - self.valueRange[0]) / bins
+            self.start = None
+        else:
+            self.binCounts = np.zeros(0, dtype=np.int64)
+            self.binWidth = None  # The width of the bins, or None if no values have been added.
+            self.start = None  # The index (in units of the bin width) of the first bin, or None if no values have been added.
+
+
+    def add(self, values):
+        """Add values to the histogram.
+
+        :param values:  The values to add. NaN values are ignored.
+        :type values:   1 dimensional numpy array
+
+        """
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if self.valueRange:
+            values = values[values <= self.valueRange[1]]
+            self.binCounts += calc_bin_counts(values, calc_left_bin_edges(self.valueRange[0], self.valueRange[1], self.bins))
+            return
+        elif values.size == 0:
+            return
+
+        # Choose the bin width if this is the first time values are added. The smallest power of 2 that could fit the values in the bins is chosen.
+        minValue = values.min()
+        maxValue = values.max()
+        if self.binWidth is None:
+            spread = max(maxValue - minValue, max(abs(minValue), abs(maxValue), 1.0) * 2.0 ** -40)
+            self.binWidth = 2.0 ** np.ceil(np.log2(spread / self.bins))
+            self.start = int(np.floor(minValue / self.binWidth))
+
+        # Widen the bins until they cover both the existing bins and the new values, and then count the new values.
+        self.extend(int(np.floor(minValue / self.binWidth)), int(np.floor(maxValue / self.binWidth)))
+        binIndices = np.floor(values / self.binWidth).astype(np.int64) - self.start
+        self.binCounts += np.bincount(binIndices, minlength=len(self.binCounts))
+
+
+    def coarsen(self):
+        """Double the width of the bins by merging adjacent pairs of bins."""
+
+        newStart = self.start // 2
+        newCounts = np.zeros(((self.start + len(self.binCounts) - 1) // 2) - newStart + 1, dtype=np.int64)
+        np.add.at(newCounts, ((self.start + np.arange(len(self.binCounts))) // 2) - newStart, self.binCounts)
+        self.binCounts = newCounts
+        self.binWidth *= 2
+        self.start = newStart
+
+
+    def extend(self, firstIndex, lastIndex):
+        """Extend the bins to cover the bins with the given indices (in units of the current bin width), widening the bins as needed.
+
+        :param firstIndex:  The index of the first bin to cover.
+        :type firstIndex:   int
+        :param lastIndex:   The index of the last bin to cover.
+        :type lastIndex:    int
+
+        """
+
+        firstIndex = min(firstIndex, self.start)
+        lastIndex = max(lastIndex, self.start + len(self.binCounts) - 1)
+        while lastIndex - firstIndex + 1 > self.bins:
+            self.coarsen()
+            firstIndex //= 2
+            lastIndex //= 2
+        newCounts = np.zeros(lastIndex - firstIndex + 1, dtype=np.int64)
+        newCounts[self.start - firstIndex:self.start - firstIndex + len(self.binCounts)] = self.binCounts
+        self.binCounts = newCounts
+        self.start = firstIndex
+
+
+    def get_counts(self):
+        """Get the counts of the histogram.
+
+        :returns :  The number of values in each bin, the left edge of the first bin and the right edge of the final bin.
+        :type :     1 dimensional numpy array of ints, float, float
+
+        """
+
+        if self.valueRange:
+            return self.binCounts, self.valueRange[0], self.valueRange[1]
+        elif self.binWidth is None:
+            return self.binCounts, 0.0, 0.0
+        return self.binCounts, self.start * self.binWidth, (self.start + len(self.binCounts)) * self.binWidth
+
+
+    def merge(self, other):
+        """Add the counts of another histogram to this histogram.
+
+        :param other:   The histogram to merge into this one.
+        :type other:    HistogramAccumulator
+        :returns :      This histogram.
+        :type :         HistogramAccumulator
+
+        """
+
+        if self.valueRange or other.valueRange:
+            if self.valueRange != other.valueRange or self.bins != other.bins:
+                raise ValueError('Histograms with fixed edges can only be merged with histograms with the same range and number of bins.')
+            self.binCounts += other.binCounts
+            return self
+        elif other.binWidth is None:
+            return self
+        elif self.binWidth is None:
+            self.binWidth = other.binWidth
+            self.start = other.start
+            self.binCounts = other.binCounts.copy()
+            return self
+
+        # Coarsen a copy of the other histogram until it fits in the bins and is at least as coarse as this histogram, and then coarsen this histogram
+        # until it has the same bin width as the other one.
+        otherCopy = HistogramAccumulator(self.bins)
+        otherCopy.binWidth, otherCopy.start, otherCopy.binCounts = other.binWidth, other.start, other.binCounts.copy()
+        other = otherCopy
+        while other.binWidth < self.binWidth or len(other.binCounts) > self.bins:
+            other.coarsen()
+        while self.binWidth < other.binWidth:
+            self.coarsen()
+
+        # Add the counts of the other histogram.
+        self.extend(other.start, other.start + len(other.binCounts) - 1)
+        while other.binWidth < self.binWidth:
+            other.coarsen()
+        self.binCounts[other.start - self.start:other.start - self.start + len(other.binCounts)] += other.binCounts
+        return self
+
+
+    def plot(self, **kwargs):
+        """Plot the histogram.
+
+        :param kwargs:  The keyword arguments to pass to plot_counts.
+        :type kwargs:   dict
+        :returns :      The output of plot_counts.
+        :type :         see plot_counts
+
+        """
+
+        binCounts, minValue, maxValue = self.get_counts()
+        return plot_counts(binCounts, minValue, maxValue, **kwargs)
+
+
+class QuantileSketch:
+    """A summary of a stream of values that estimates their quantiles using bounded memory.
+
+    The quantiles are estimated using a merging t-digest. The values are summarised by a set of centroids, each recording the mean and number of the
+    values it represents. The centroids are kept sorted by their means, and are merged so that the fraction of the values represented by each centroid
+    is smaller for centroids near the tails of the distribution, where the quantiles are therefore estimated more accurately. The number of centroids is
+    at most compression + 1 whatever the number of values. The count, mean, variance, smallest and largest of the values are recorded exactly. Sketches
+    of different values can be merged.
+
+    """
+
+    def __init__(self, compression=200):
+        """Create an empty sketch.
+
+        :param compression:     The number of centroids to merge the values into.
+        :type compression:      int
+
+        """
+
+        self.compression = compression
+        self.means = np.zeros(0)  # The mean of the values represented by each centroid.
+        self.weights = np.zeros(0)  # The number of values represented by each centroid.
+        self.count = 0  # The number of values.
+        self.mean = 0.0  # The mean of the values.
+        self.sumOfSquares = 0.0  # The sum of the squared differences between the values and their mean.
+        self.minValue = np.inf
+        self.maxValue = -np.inf
+
+
+    def add(self, values):
+        """Add values to the sketch.
+
+        The values are merged into the centroids in blocks, so only a block of values is sorted at a time.
+
+        :param values:  The values to add. NaN values are ignored.
+        :type values:   1 dimensional numpy array
+
+        """
+
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        blockSize = 2 ** 16
+        for i in range(0, values.size, blockSize):
+            block = values[i:i + blockSize]
+            self.update_moments(block.size, block.mean(), ((block - block.mean()) ** 2).sum(), block.min(), block.max())
+            self.compress(np.append(self.means, block), np.append(self.weights, np.ones(block.size)))
+
+
+    def compress(self, means, weights):
+        """Merge centroids so that there are at most compression + 1 of them.
+
+        The centroids are sorted, and the fraction of the values that come before each centroid is mapped onto the scale
+        k = compression * (asin(2q - 1) / pi + 1 / 2). Consecutive centroids whose fractions map to the same integer part of k are merged. As the scale
+        is steepest near q = 0 and q = 1, the centroids in the tails are merged the least.
+
+        :param means:       The means of the centroids.
+        :type means:        1 dimensional numpy array
+        :param weights:     The number of values represented by each centroid.
+        :type weights:      1 dimensional numpy array
+
+        """
+
+        sortedIndices = np.argsort(means, kind='mergesort')
+        means = means[sortedIndices]
+        weights = weights[sortedIndices]
+        fractionsBefore = (np.cumsum(weights) - weights) / weights.sum()
+        scaleIndices = np.floor(self.compression * ((np.arcsin(np.clip((2 * fractionsBefore) - 1, -1, 1)) / np.pi) + 0.5))
+        groups = np.concatenate([[0], np.cumsum(np.diff(scaleIndices) != 0)])
+        self.weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=weights * means) / self.weights
+
+
+    def merge(self, other):
+        """Add the values summarised by another sketch to this sketch.
+
+        :param other:   The sketch to merge into this one.
+        :type other:    QuantileSketch
+        :returns :      This sketch.
+        :type :         QuantileSketch
+
+        """
+
+        if other.count:
+            self.update_moments(other.count, other.mean, other.sumOfSquares, other.minValue, other.maxValue)
+            self.compress(np.append(self.means, other.means), np.append(self.weights, other.weights))
+        return self
+
+
+    def quantile(self, q):
+        """Estimate a quantile of the values.
+
+        Each centroid is taken to be at the middle of the values it represents, and the quantiles between the centroids are linearly interpolated. The
+        smallest and largest values are the 0 and 1 quantiles.
+
+        :param q:   The quantile to estimate.
+        :type q:    float between 0 and 1
+        :returns :  The estimated quantile.
+        :type :     float
+
+        """
+
+        centroidPositions = np.cumsum(self.weights) - (self.weights / 2)
+        positions = np.concatenate([[0], centroidPositions, [self.count]])
+        values = np.concatenate([[self.minValue], self.means, [self.maxValue]])
+        return float(np.interp(q * self.count, positions, values))
+
+
+    def update_moments(self, count, mean, sumOfSquares, minValue, maxValue):
+        """Combine the count, mean, variance and range of the values in the sketch with those of another set of values.
+
+        :param count:           The number of values in the other set.
+        :type count:            int
+        :param mean:            The mean of the other set.
+        :type mean:             float
+        :param sumOfSquares:    The sum of the squared differences between the values in the other set and their mean.
+        :type sumOfSquares:     float
+        :param minValue:        The smallest value in the other set.
+        :type minValue:         float
+        :param maxValue:        The largest value in the other set.
+        :type maxValue:         float
+
+        """
+
+        totalCount = self.count + count
+        delta = mean - self.mean
+        self.sumOfSquares += sumOfSquares + ((delta ** 2) * self.count * count / totalCount)
+        self.mean += delta * count / totalCount
+        self.count = totalCount
+        self.minValue = min(self.minValue, minValue)
+        self.maxValue = max(self.maxValue, maxValue)
 
 
 def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None, title='', xLabel='', yLabel='', edgeColor='none',
@@ -47,8 +392,8 @@ def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None,
 
     :param data:                The data to be plotted.
     :type data:                 pandas.DataFrame() column vector
-    :param bins:                The number of bins to put the data in.
-    :type bins:                 int
+    :param bins:                The number of bins to put the data in, or the rule used to choose it (see calc_number_of_bins).
+    :type bins:                 int or one of 'fd', 'scott' or 'sturges'
     :param direction:           The direction that the bars should go.
     :type direction:            one of 'Up', 'Down', 'Left' or 'Right'
     :param outputLocation:      The location where the figure will be saved.
@@ -76,6 +421,64 @@ def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None,
 
     """
 
+    # Determine the range of the data.
+    minValue = data.nsmallest(1).iloc[0]
+    maxValue = data.nlargest(1).iloc[0]
+
+    # Choose the number of bins if a rule is given.
+    if isinstance(bins, str):
+        sketch = QuantileSketch()
+        sketch.add(data.values)
+        bins = calc_number_of_bins(bins, sketch)
+
+    # Bin the data.
+    leftBinEdges = calc_left_bin_edges(minValue, maxValue, bins)
+    binCounts = calc_bin_counts(data.values, leftBinEdges)
+
+    return plot_counts(binCounts, minValue, maxValue, direction=direction, outputLocation=outputLocation, currentFigure=currentFigure, title=title,
+                       xLabel=xLabel, yLabel=yLabel, edgeColor=edgeColor, faceColor=faceColor, linewidth=linewidth, alpha=alpha,
+                       spinesToRemove=spinesToRemove)
+
+
+def plot_counts(binCounts, minValue, maxValue, direction='Up', outputLocation=None, currentFigure=None, title='', xLabel='', yLabel='',
+                edgeColor='none', faceColor='black', linewidth=1, alpha=0.5, spinesToRemove=['top', 'right']):
+    """Generate a histogram from the number of values in each bin.
+
+    The bins are equally spaced between minValue and maxValue (see plot).
+
+    :param binCounts:           The number of values in each bin.
+    :type binCounts:            1 dimensional numpy array of ints
+    :param minValue:            The left edge of the first bin.
+    :type minValue:             float
+    :param maxValue:            The right edge of the final bin.
+    :type maxValue:             float
+    :param direction:           The direction that the bars should go.
+    :type direction:            one of 'Up', 'Down', 'Left' or 'Right'
+    :param outputLocation:      The location where the figure will be saved.
+    :type outputLocation:       str (or None if saving is not desired)
+    :param currentFigure:       The figure from which the axes to plot the histogram on will be taken. If not provided, then a new figure will be created.
+    :type currentFigure:        matplotlib.figure.Figure
+    :param title:               The title for the plot.
+    :type title:                str
+    :param xLabel:              The label for the x axis.
+    :type xLabel:               str
+    :param yLabel:              The label for the y axis.
+    :type yLabel:               str
+    :param edgeColor:           The color of the line edges around the bars.
+    :type edgeColor:            any color accepted by the matplotlib.patches.PathPatch edgecolor parameter
+    :param faceColor:           The color for the face of the bars.
+    :type faceColor:            any color accepted by the matplotlib.patches.PathPatch facecolor parameter
+    :param linewidth:           The width of the line edges around the bars.
+    :type linewidth:            float
+    :param alpha:               The alpha value for the face color of the bars.
+    :type alpha:                float between 0 and 1
+    :param spinesToRemove:      The spines that should be removed from the axes.
+    :type spinesToRemove:       list containing any of ['left', 'right', 'top', 'bottom']
+    :returns :                  The figure and axes on which the histogram was plotted if saving is not to be performed.
+    :type :                     objects of type matplotlib.figure.Figure, matplotlib.axes.Axes
+
+    """
+
     # Get the axes the will be used for the plot.
     try:
         axes = currentFigure.gca()
@@ -112,39 +515,32 @@ def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None,
         plt.xlabel(yLabel, fontsize=16, color='0.25')
         plt.ylabel(xLabel, fontsize=16, color='0.25')
 
-    # Determine the bin width.
-    minValue = data.nsmallest(1).iloc[0]
-    maxValue = data.nlargest(1).iloc[0]
+    # Determine the bin width and edges. A histogram with no bins (e.g. from an accumulator that no values have been added to) is drawn as a single
+    # empty bin, and bins with no width are spread over a unit range, so that there is still a range to scale the axes to.
+    if len(binCounts) == 0:
+        binCounts = np.zeros(1, dtype=np.int64)
+    if maxValue <= minValue:
+        maxValue = minValue + 1
+    bins = len(binCounts)
     binWidth = (maxValue - minValue) / bins
+    leftBinEdges = calc_left_bin_edges(minValue, maxValue, bins)
 
-    # Bin the data.
-    leftBinEdges = [minValue + (binWidth * i) for i in range(bins)]
-    countEdges = leftBinEdges + [maxValue + 1]
-    binCounts = [(data[data >= countEdges[i]] < countEdges[i + 1]).sum() for i in range(len(leftBinEdges))]
-
-    # Determine the vertices for the histogram.
-    extendedEdges = leftBinEdges + [maxValue]
-    leftEdges = [i + (binWidth * 0.05) for i in leftBinEdges]
-    rightEdges = [i - (binWidth * 0.05) for i in extendedEdges[1:]]
-    bottomLeftEdges = [[i, 0] for i in leftEdges]
-    topLeftEdges = [[i[0], i[1]] for i in zip(leftEdges, binCounts)]
-    topRightEdges = [[i[0], i[1]] for i in zip(rightEdges, binCounts)]
-    bottomRightEdges = [[i, 0] for i in rightEdges]
-    vertices = [None for i in range(bins * 5)]  # 5 vertices per bar: 1 for the MOVETO, 3 for the LINETO, and 1 for the CLOSEPOLY.
-    vertices[0::5] = bottomLeftEdges
-    vertices[1::5] = topLeftEdges
-    vertices[2::5] = topRightEdges
-    vertices[3::5] = bottomRightEdges
-    vertices[4::5] = bottomLeftEdges
+    # Determine the vertices for the histogram. Each bar has 5 vertices: 1 for the MOVETO, 3 for the LINETO, and 1 for the CLOSEPOLY.
+    leftEdges = leftBinEdges + (binWidth * 0.05)
+    rightEdges = np.append(leftBinEdges[1:], maxValue) - (binWidth * 0.05)
+    vertices = np.zeros((bins, 5, 2))
+    vertices[:, [0, 1, 4], 0] = leftEdges[:, np.newaxis]
+    vertices[:, [2, 3], 0] = rightEdges[:, np.newaxis]
+    vertices[:, [1, 2], 1] = binCounts[:, np.newaxis]
+    vertices = vertices.reshape(-1, 2)
 
     # Transform the vertices to deal with plotting from the left or right.
     if direction in ['Left', 'Right']:
-        vertices = [[i[1], i[0]] for i in vertices]
+        vertices = vertices[:, ::-1]
 
     # Create the path codes.
-    codes = [path.Path.LINETO for i in range(bins * 5)]  # 5 codes per bar: 1 for the MOVETO, 3 for the LINETO, and 1 for the CLOSEPOLY.
-    codes[0::5] = [path.Path.MOVETO for i in binCounts]
-    codes[4::5] = [path.Path.CLOSEPOLY for i in binCounts]
+    codes = np.tile(np.array([path.Path.MOVETO, path.Path.LINETO, path.Path.LINETO, path.Path.LINETO, path.Path.CLOSEPOLY], dtype=path.Path.code_type),
+                    bins)
 
     # Plot the histogram.
     histoPath = path.Path(vertices, codes)
@@ -152,17 +548,18 @@ def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None,
     axes.add_patch(histoPatch)
 
     # Transform the axes to account for the direction desired, and scale the axes if needed.
+    countLimit = (binCounts.max() + (0.1 * binCounts.max())) or 1
     if direction == 'Up':
         # Only scaling needed.
-        scale_axes(axes, xMin=(minValue - binWidth), xMax=(maxValue + binWidth), yMin=0, yMax=max(binCounts) + (0.1 * max(binCounts)))
+        scale_axes(axes, xMin=(minValue - binWidth), xMax=(maxValue + binWidth), yMin=0, yMax=countLimit)
     elif direction == 'Left':
-        scale_axes(axes, xMin=0, xMax=max(binCounts) + (0.1 * max(binCounts)), yMin=(minValue - binWidth), yMax=(maxValue + binWidth))
+        scale_axes(axes, xMin=0, xMax=countLimit, yMin=(minValue - binWidth), yMax=(maxValue + binWidth))
         axes.invert_xaxis()
     elif direction == 'Down':
-        scale_axes(axes, xMin=(minValue - binWidth), xMax=(maxValue + binWidth), yMin=0, yMax=max(binCounts) + (0.1 * max(binCounts)))
+        scale_axes(axes, xMin=(minValue - binWidth), xMax=(maxValue + binWidth), yMin=0, yMax=countLimit)
         axes.invert_yaxis()
     else:  #if direction == 'Right':
-        scale_axes(axes, xMin=0, xMax=max(binCounts) + (0.1 * max(binCounts)), yMin=(minValue - binWidth), yMax=(maxValue + binWidth))
+        scale_axes(axes, xMin=0, xMax=countLimit, yMin=(minValue - binWidth), yMax=(maxValue + binWidth))
 
     if outputLocation:
         plt.savefig(outputLocation, bbox_inches='tight', transparent=True)
@@ -170,6 +567,250 @@ def plot(data, bins=10, direction='Up', outputLocation=None, currentFigure=None,
         return currentFigure, axes
 
 
+def accumulate_file(parameters):
+    """Build a histogram of the values of a column of a dataset.
+
+    Auxiliary function is required to meet restrictions placed on Pool.map.
+
+    :param parameters:  The dataset location, column index, number of bins, whether a header is present, separator, number of rows to read at a time
+                        and range of values (see accumulate_files).
+    :type parameters:   tuple
+    :returns :          The histogram.
+    :type :             HistogramAccumulator
+
+    """
+
+    datasetLocation, columnIndex, bins, headerPresent, separator, chunkSize, valueRange = parameters
+    accumulator = HistogramAccumulator(bins, valueRange)
+    for i in pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None), usecols=[columnIndex], chunksize=chunkSize):
+        accumulator.add(i.iloc[:, 0].values)
+    return accumulator
+
+
+def accumulate_files(datasetLocations, columnIndex, bins=10, headerPresent=False, separator='\t', chunkSize=1000000, valueRange=None, poolSize=1):
+    """Build a single histogram of the values of a column in multiple datasets.
+
+    A histogram is built for each dataset, and the histograms are merged as they are completed, so the values from only one chunk of rows per worker are
+    ever held in memory.
+
+    :param datasetLocations:    The locations of the datasets.
+    :type datasetLocations:     list of str
+    :param columnIndex:         The (non-negative) index of the column containing the values.
+    :type columnIndex:          int
+    :param bins:                The number of bins (the maximum number of bins if the range is not given).
+    :type bins:                 int
+    :param headerPresent:       Whether a single line header is present in the dataset files.
+    :type headerPresent:        boolean
+    :param separator:           The string that separates values in the dataset files.
+    :type separator:            str
+    :param chunkSize:           The number of rows to read at a time.
+    :type chunkSize:            int
+    :param valueRange:          The smallest and largest values to count.
+    :type valueRange:           (float, float) tuple (or None if the edges of the bins should adapt to the values)
+    :param poolSize:            The number of workers to create in the multiprocessing.Pool process pool.
+    :type poolSize:             int
+    :returns :                  The merged histogram.
+    :type :                     HistogramAccumulator
+
+    """
+
+    parameters = [(i, columnIndex, bins, headerPresent, separator, chunkSize, valueRange) for i in datasetLocations]
+    accumulator = HistogramAccumulator(bins, valueRange)
+    if poolSize > 1:
+        workerPool = Pool(poolSize)
+        for i in workerPool.imap_unordered(accumulate_file, parameters):
+            accumulator.merge(i)
+        workerPool.close()
+        workerPool.join()
+    else:
+        for i in parameters:
+            accumulator.merge(accumulate_file(i))
+    return accumulator
+
+
+def calc_number_of_bins(rule, sketch):
+    """Choose the number of equally spaced bins to use for a set of values.
+
+    The rules choose the width of the bins, with the number of bins being the number needed to cover the range of the values with that width:
+        fd - the Freedman-Diaconis rule, with a bin width of 2 * IQR / n^(1/3).
+        scott - Scott's rule, with a bin width of (24 * sqrt(pi) / n)^(1/3) times the standard deviation.
+        sturges - Sturges' rule, with log2(n) + 1 bins.
+
+    :param rule:    The rule used to choose the number of bins.
+    :type rule:     one of 'fd', 'scott' or 'sturges'
+    :param sketch:  The sketch of the values.
+    :type sketch:   QuantileSketch
+    :returns :      The number of bins.
+    :type :         int
+
+    """
+
+    valueRange = sketch.maxValue - sketch.minValue
+    if sketch.count == 0:
+        return 1
+    elif rule == 'fd':
+        binWidth = 2 * (sketch.quantile(0.75) - sketch.quantile(0.25)) / (sketch.count ** (1 / 3))
+    elif rule == 'scott':
+        binWidth = ((24 * np.sqrt(np.pi) / sketch.count) ** (1 / 3)) * np.sqrt(sketch.sumOfSquares / sketch.count)
+    elif rule == 'sturges':
+        binWidth = valueRange / (np.log2(sketch.count) + 1)
+    else:
+        raise ValueError('Unknown rule for choosing the number of bins: {0}'.format(rule))
+    return max(int(np.ceil(valueRange / binWidth)), 1) if binWidth > 0 else 1
+
+
+def calc_bin_counts(values, leftBinEdges):
+    """Count the number of values in each bin.
+
+    Each bin contains the values >= its left edge and < the left edge of the next bin, with the final bin containing all the values >= its left edge.
+    Values that are below the first left edge or are NaN are not counted. As the bins are equally spaced, the bin of each value is calculated directly
+    from its distance from the first left edge, and then moved to the neighbouring bin if rounding has put it on the wrong side of an edge.
+
+    :param values:          The values to bin.
+    :type values:           1 dimensional numpy array
+    :param leftBinEdges:    The equally spaced left edges of the bins in ascending order (see calc_left_bin_edges).
+    :type leftBinEdges:     1 dimensional numpy array
+    :returns :              The number of values in each bin.
+    :type :                 1 dimensional numpy array of ints
+
+    """
+
+    values = values[~np.isnan(values)]
+    bins = len(leftBinEdges)
+    binWidth = (leftBinEdges[-1] - leftBinEdges[0]) / (bins - 1) if bins > 1 else 0
+    if binWidth > 0:
+        binIndices = np.clip(np.floor((values - leftBinEdges[0]) / binWidth), -1, bins - 1).astype(np.int64)
+        binIndices[(binIndices >= 0) & (values < leftBinEdges[np.maximum(binIndices, 0)])] -= 1
+        binIndices[(binIndices < bins - 1) & (values >= leftBinEdges[np.minimum(binIndices + 1, bins - 1)])] += 1
+    else:
+        # All the values at or above the edges are in the final bin.
+        binIndices = np.where(values >= leftBinEdges[0], bins - 1, -1)
+    return np.bincount(binIndices[binIndices >= 0], minlength=len(leftBinEdges))
+
+
+def calc_left_bin_edges(minValue, maxValue, bins):
+    """Determine the left edges of equally spaced bins.
+
+    :param minValue:    The left edge of the first bin.
+    :type minValue:     float
+    :param maxValue:    The right edge of the final bin.
+    :type maxValue:     float
+    :param bins:        The number of bins.
+    :type bins:         int
+    :returns :          The left edge of each bin.
+    :type :             1 dimensional numpy array
+
+    """
+
+    return minValue + (((maxValue - minValue) / bins) * np.arange(bins))
+
+
+def calc_streamed_bin_counts(datasetLocation, columnIndex, bins, headerPresent=False, separator='\t', chunkSize=1000000, valueRange=None):
+    """Count the number of values of a column of a dataset in each bin, reading the dataset a chunk of rows at a time.
+
+    If the range of the values is not given or the number of bins is to be chosen by a rule, the dataset is read twice. The first pass determines the
+    range of the values and the statistics needed by the rule.
+
+    :param datasetLocation:     The location of the dataset.
+    :type datasetLocation:      str
+    :param columnIndex:         The (non-negative) index of the column containing the values.
+    :type columnIndex:          int
+    :param bins:                The number of equally spaced bins to use, or the rule used to choose it (see calc_number_of_bins).
+    :type bins:                 int or one of 'fd', 'scott' or 'sturges'
+    :param headerPresent:       Whether a single line header is present in the dataset file.
+    :type headerPresent:        boolean
+    :param separator:           The string that separates values in the file containing dataset.
+    :type separator:            str
+    :param chunkSize:           The number of rows to read at a time.
+    :type chunkSize:            int
+    :param valueRange:          The smallest and largest values to count. Values outside this range are not counted.
+    :type valueRange:           (float, float) tuple (or None if the range should be determined from the data)
+    :returns :                  The left edge of the first bin, the right edge of the final bin and the number of values in each bin.
+    :type :                     float, float, 1 dimensional numpy array of ints
+
+    """
+
+    readParameters = {'sep': separator, 'header': (0 if headerPresent else None), 'usecols': [columnIndex], 'chunksize': chunkSize}
+
+    # Determine the range of the values if it is not given, and choose the number of bins if a rule is given.
+    if valueRange:
+        minValue, maxValue = valueRange
+    if not valueRange or isinstance(bins, str):
+        sketch = sketch_file((datasetLocation, columnIndex, headerPresent, separator, chunkSize, valueRange))
+        if not valueRange:
+            minValue, maxValue = sketch.minValue, sketch.maxValue
+        if isinstance(bins, str):
+            bins = calc_number_of_bins(bins, sketch)
+
+    # Count the values in each bin.
+    leftBinEdges = calc_left_bin_edges(minValue, maxValue, bins)
+    binCounts = np.zeros(bins, dtype=np.int64)
+    for i in pandas.read_csv(datasetLocation, **readParameters):
+        values = i.iloc[:, 0].values
+        binCounts += calc_bin_counts(values[values <= maxValue], leftBinEdges)
+
+    return minValue, maxValue, binCounts
+
+
+def sketch_file(parameters):
+    """Build a sketch of the values of a column of a dataset.
+
+    Auxiliary function is required to meet restrictions placed on Pool.map.
+
+    :param parameters:  The dataset location, column index, whether a header is present, separator, number of rows to read at a time and range of
+                        values (see sketch_files).
+    :type parameters:   tuple
+    :returns :          The sketch.
+    :type :             QuantileSketch
+
+    """
+
+    datasetLocation, columnIndex, headerPresent, separator, chunkSize, valueRange = parameters
+    sketch = QuantileSketch()
+    for i in pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None), usecols=[columnIndex], chunksize=chunkSize):
+        values = i.iloc[:, 0].values
+        if valueRange:
+            values = values[(values >= valueRange[0]) & (values <= valueRange[1])]
+        sketch.add(values)
+    return sketch
+
+
+def sketch_files(datasetLocations, columnIndex, headerPresent=False, separator='\t', chunkSize=1000000, valueRange=None, poolSize=1):
+    """Build a single sketch of the values of a column in multiple datasets.
+
+    :param datasetLocations:    The locations of the datasets.
+    :type datasetLocations:     list of str
+    :param columnIndex:         The (non-negative) index of the column containing the values.
+    :type columnIndex:          int
+    :param headerPresent:       Whether a single line header is present in the dataset files.
+    :type headerPresent:        boolean
+    :param separator:           The string that separates values in the dataset files.
+    :type separator:            str
+    :param chunkSize:           The number of rows to read at a time.
+    :type chunkSize:            int
+    :param valueRange:          The smallest and largest values to include in the sketch.
+    :type valueRange:           (float, float) tuple (or None if all values should be included)
+    :param poolSize:            The number of workers to create in the multiprocessing.Pool process pool.
+    :type poolSize:             int
+    :returns :                  The merged sketch.
+    :type :                     QuantileSketch
+
+    """
+
+    parameters = [(i, columnIndex, headerPresent, separator, chunkSize, valueRange) for i in datasetLocations]
+    sketch = QuantileSketch()
+    if poolSize > 1:
+        workerPool = Pool(poolSize)
+        for i in workerPool.imap_unordered(sketch_file, parameters):
+            sketch.merge(i)
+        workerPool.close()
+        workerPool.join()
+    else:
+        for i in parameters:
+            sketch.merge(sketch_file(i))
+    return sketch
+
+
 def scale_axes(axes, xMin, xMax, yMin, yMax):
     """Scale the axes.
 
@@ -206,7 +847,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=('Generate a histogram from a file of a dataset.'),
                                      epilog=('The dataset should be saved as an n x p matrix, where there are n rows of observations and p columns ' +
                                             'of variables.'))
-    parser.add_argument('dataset', help='The location of the dataset file.')
+    parser.add_argument('dataset', help='The location of the dataset file (or the locations of multiple dataset files to combine).', nargs='+')
     parser.add_argument('output', help='The location where the image of the plot will be saved.')
     parser.add_argument('-r', '--header', help='Whether a header is present in the dataset file. (Default value: No header).',
                         action='store_true', default=False, required=False)
@@ -218,9 +859,35 @@ if __name__ == '__main__':
                         type=str, default='Up', choices=['Up', 'Down', 'Left', 'Right'], required=False)
     parser.add_argument('-c', '--col', help='The index of the column containing the data for the histogram (negative indexing permitted). (Required type: %(type)s, default value: %(default)s).',
                         type=int, default=0, required=False)
-    parser.add_argument('-b', '--bins', help='The number of equally spaced bins to use. (Required type: %(type)s, default value: %(default)s).',
-                        type=int, default=10, required=False)
+    parser.add_argument('-b', '--bins', help='The number of equally spaced bins to use, or the rule used to choose it (one of fd, scott or sturges). (Required type: int or str, default value: %(default)s).',
+                        type=str, default='10', required=False)
+    parser.add_argument('-k', '--chunk', help='The number of rows to read at a time, in order to stream through datasets too large to fit in memory. (Required type: %(type)s, default value: read the whole dataset at once).',
+                        type=int, default=None, required=False)
+    parser.add_argument('-g', '--range', help='The smallest and largest values to include when streaming through the dataset. (Required type: two floats separated by a comma, default value: the range of the data).',
+                        type=str, default=None, required=False)
+    parser.add_argument('-p', '--pool', help='The number of processes used to read multiple dataset files. (Required type: %(type)s, default value: %(default)s).',
+                        type=int, default=1, required=False)
     args = parser.parse_args()
 
-    main(args.dataset, args.output, headerPresent=args.header, separator=args.sep, title=args.title, direction=args.dir, columnToPlot=args.col,
-         bins=args.bins)
\ No newline at end of file
+    valueRange = None
+    if args.range:
+        try:
+            valueRange = tuple([float(i) for i in args.range.split(',')])
+        except ValueError:
+            print('ERROR: Non-numeric value provided. Only numbers may be supplied using the -g or --range flags.')
+            sys.exit()
+        if len(valueRange) != 2:
+            print('ERROR: An incorrect number ({0}) of values were specified using the -g or --range flags. Please specify only two values'.format(len(valueRange)))
+            sys.exit()
+
+    bins = args.bins
+    if bins not in ['fd', 'scott', 'sturges']:
+        try:
+            bins = int(bins)
+        except ValueError:
+            print('ERROR: Invalid number of bins provided. Only an integer or one of fd, scott or sturges may be supplied using the -b or --bins flags.')
+            sys.exit()
+
+    datasetLocation = args.dataset[0] if len(args.dataset) == 1 else args.dataset
+    main(datasetLocation, args.output, headerPresent=args.header, separator=args.sep, title=args.title, direction=args.dir, columnToPlot=args.col,
+         bins=bins, chunkSize=args.chunk, valueRange=valueRange, poolSize=args.pool)
\ No newline at end of file
@@ -1,5 +1,6 @@
 import argparse
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas
 import sys
 
@@ -25,19 +26,9 @@ def main(datasetLocation, outputLocation, labelsColumn=None, separator='\t', row
     """
 
     # Extract the data.
-    dataset = pandas.read_csv(datasetLocation, sep=separator, header=None)
-
-    # Process the data.
-    if not labelsColumn == None:
-        labels = [i for i in dataset.iloc[:, labelsColumn]] # Extract the labels.
-        dataset = dataset.drop(dataset.columns[labelsColumn], axis=1)  # Create a new dataset with the label column dropped.
-    else:
-        labels = None
-    rowData = [dataset.iloc[i, :] for i in rowsToPlot]
-    notNullData = [pandas.notnull(i) for i in rowData]
-    lineData = [[j[0] for j in zip(i[0], i[1]) if j[1]] for i in zip(rowData, notNullData)]  # A list of lists of x,y pairs. One internal list for each line.
-    xData = [[float(j.split(',')[0]) for j in i] for i in lineData]
-    yData = [[float(j.split(',')[1]) for j in i] for i in lineData]
+    xData, yData, lineOffsets, labels = load_lines(datasetLocation, rowsToPlot, labelsColumn, separator)
+    xData = np.split(xData, lineOffsets[1:-1])
+    yData = np.split(yData, lineOffsets[1:-1])
 
     # Plot the data.
     if not labels and not coloredLines:
@@ -168,6 +159,70 @@ def plot(xValues, yValues, outputLocation=None, labels=None, currentFigure=None,
         return currentFigure, axes
 
 
+def load_lines(datasetLocation, rowsToPlot=[0], labelsColumn=None, separator='\t'):
+    """Load the x,y points of selected lines from a dataset file.
+
+    Each row of the file holds one line, with each entry on the row being an x,y pair (e.g. 1.1,2.0). Blank rows (empty or only whitespace) are not
+    counted when indexing the rows, but rows of only separators are counted as lines with no points (as with pandas.read_csv), and empty entries are
+    skipped. Only the selected rows are parsed: their entries are joined into a single buffer with the separators and commas replaced by spaces, and the
+    buffer is parsed by one call to numpy.fromstring. Every non-empty entry must contain exactly one comma, so the number of points on each line is the
+    number of commas on its row.
+
+    :param datasetLocation:     The location of the dataset file.
+    :type datasetLocation:      str
+    :param rowsToPlot:          The indices of the rows to load (can use negative indexing).
+    :type rowsToPlot:           list of ints
+    :param labelsColumn:        The index of the entry on each row containing the label of the line (can use negative indexing).
+    :type labelsColumn:         int (or None if there is no labels column)
+    :param separator:           The string that separates entries on a row.
+    :type separator:            str
+    :returns :                  The x values and y values of the points of all the lines, the offsets of the start of each line's points in them (with
+                                the final offset being the total number of points), and the labels of the lines.
+    :type :                     1 dimensional numpy arrays of floats, 1 dimensional numpy array of ints, list (or None if there is no labels column)
+
+    """
+
+    if isinstance(rowsToPlot, int):
+        rowsToPlot = [rowsToPlot]
+    byteSeparator = separator.encode('utf-8')
+
+    # Read the rows, stopping after the last row needed unless rows are indexed from the end.
+    lastRow = max(rowsToPlot) if min(rowsToPlot) >= 0 else None
+    rows = []
+    with open(datasetLocation, 'rb') as readDataset:
+        for i in readDataset:
+            i = i.rstrip(b'\r\n')
+            if i.strip() or byteSeparator in i:
+                rows.append(i)
+                if lastRow is not None and len(rows) > lastRow:
+                    break
+    rows = [rows[i] for i in rowsToPlot]
+
+    # Separate the labels from the points.
+    labels = None
+    if labelsColumn is not None:
+        rowEntries = [i.split(byteSeparator) for i in rows]
+        labels = [i[labelsColumn].decode('utf-8') for i in rowEntries]
+        rows = [byteSeparator.join(i[:labelsColumn % len(i)] + i[(labelsColumn % len(i)) + 1:]) for i in rowEntries]
+        try:
+            labels = list(pandas.to_numeric(pandas.Series(labels)))
+        except ValueError:
+            # The labels are not all numeric, so leave them as strings.
+            pass
+
+    # Parse all the points at once.
+    if any(j.count(b',') != 1 for i in rows for j in i.split(byteSeparator) if j.strip()):
+        raise ValueError('The rows to plot contain entries that are not x,y pairs of floats.')
+    pointCounts = np.array([i.count(b',') for i in rows], dtype=np.int64)
+    lineOffsets = np.concatenate([[0], np.cumsum(pointCounts)])
+    pointText = b' '.join(rows).replace(byteSeparator, b' ').replace(b',', b' ')
+    points = np.fromstring(pointText.decode('utf-8'), dtype=np.float64, sep=' ')
+    if points.size != 2 * lineOffsets[-1]:
+        raise ValueError('The rows to plot contain entries that are not x,y pairs of floats.')
+    points = points.reshape(-1, 2)
+    return points[:, 0], points[:, 1], lineOffsets, labels
+
+
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description=('Generate a line graph from a file of a dataset.'),
                                      epilog=('The dataset should contain n rows, one for each line (not all lines need be plotted). Each entry on a ' +
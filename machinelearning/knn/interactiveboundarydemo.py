@@ -60,6 +60,7 @@ class InteractiveNNDemo:
         self.pointRadius = radius
         self.poolSize = poolSize
         self.currentlyDeleting = True  # Whether the user has selected to be currently removing or adding points to the figure.
+        self.heatmap = None  # The heatmap of the classes of the (x,y) pair mesh. Kept so that recomputing only updates the boundaries that change.
 
         # Extract the original dataset.
         if not columnsToPlot or len(columnsToPlot) != 2:
@@ -146,6 +147,7 @@ class InteractiveNNDemo:
     def on_reset(self, event):
         """Reset the image to the original data."""
         self.neighbours = 1
+        self.heatmap = None
         self.currentFigure.delaxes(self.axes)
         self.axes = self.currentFigure.add_subplot(1, 1, 1)
         self.start()
@@ -219,40 +221,51 @@ class InteractiveNNDemo:
         # Extract the data to plot.
         featureOne = dataset.iloc[:, columnsToPlot[0]]
         featureTwo = dataset.iloc[:, columnsToPlot[1]]
-        classes = dataset.iloc[:, -1]
-
-        # Get axes limits.
-        featureOneMin = featureOne.nsmallest(1).iloc[0]
-        featureOneMax = featureOne.nlargest(1).iloc[0]
-        featureOneRange = (featureOneMax - featureOneMin)
-        featureOneMin -= featureOneRange * 0.1
-        featureOneMax += featureOneRange * 0.1
-        featureTwoMin = featureTwo.nsmallest(1).iloc[0]
-        featureTwoMax = featureTwo.nlargest(1).iloc[0]
-        featureTwoRange = (featureTwoMax - featureTwoMin)
-        featureTwoMin -= featureTwoRange * 0.1
-        featureTwoMax += featureTwoRange * 0.1
-
-        # Create the (x,y) pair mesh for the decision boundary and color filling.
-        featureOneDelta = (featureOneMax - featureOneMin) / self.divisions
-        featureTwoDelta = (featureTwoMax - featureTwoMin) / self.divisions
-        featureOneSteps = np.arange(featureOneMin, featureOneMax + featureOneDelta, featureOneDelta)
-        featureTwoSteps = np.arange(featureTwoMin, featureTwoMax + featureTwoDelta, featureTwoDelta)
-        featureOneMesh, featureTwoMesh = np.meshgrid(featureOneSteps, featureTwoSteps)
+
+        if self.heatmap is None:
+            # Get axes limits.
+            featureOneMin = featureOne.nsmallest(1).iloc[0]
+            featureOneMax = featureOne.nlargest(1).iloc[0]
+            self.featureOneRange = (featureOneMax - featureOneMin)
+            featureOneMin -= self.featureOneRange * 0.1
+            featureOneMax += self.featureOneRange * 0.1
+            featureTwoMin = featureTwo.nsmallest(1).iloc[0]
+            featureTwoMax = featureTwo.nlargest(1).iloc[0]
+            self.featureTwoRange = (featureTwoMax - featureTwoMin)
+            featureTwoMin -= self.featureTwoRange * 0.1
+            featureTwoMax += self.featureTwoRange * 0.1
+
+            # Create the (x,y) pair mesh for the decision boundary and color filling. The mesh is kept when the boundary is recomputed, so that only the
+            # parts of the boundary where the classes of the mesh have changed need to be recomputed.
+            featureOneDelta = (featureOneMax - featureOneMin) / self.divisions
+            featureTwoDelta = (featureTwoMax - featureTwoMin) / self.divisions
+            featureOneSteps = np.arange(featureOneMin, featureOneMax + featureOneDelta, featureOneDelta)
+            featureTwoSteps = np.arange(featureTwoMin, featureTwoMax + featureTwoDelta, featureTwoDelta)
+            self.featureOneMesh, self.featureTwoMesh = np.meshgrid(featureOneSteps, featureTwoSteps)
+        featureOneMesh = self.featureOneMesh
+        featureTwoMesh = self.featureTwoMesh
+        featureOneRange = self.featureOneRange
+        featureTwoRange = self.featureTwoRange
 
         # Classify the points on the mesh.
         classifier = nearestneighbours.NearestNeighbours(dataset)
         workerPool = Pool(self.poolSize)
-        classificatons = workerPool.map(worker, [(classifier, pandas.DataFrame([featureOneMesh[:, i], featureTwoMesh[:, i]]).T, self.neighbours) for i in range(len(featureOneSteps))])
+        classificatons = workerPool.map(worker, [(classifier, pandas.DataFrame([featureOneMesh[:, i], featureTwoMesh[:, i]]).T, self.neighbours) for i in range(featureOneMesh.shape[1])])
+        meshClasses = np.transpose(np.array(classificatons))
+
+        # Update the heatmap of the classes, recomputing only the boundaries in the parts of the mesh where the classes have changed.
+        if self.heatmap is None:
+            self.heatmap = discreteheatmap.DiscreteHeatmap(featureOneMesh, featureTwoMesh, meshClasses)
+        else:
+            self.heatmap.update(meshClasses)
 
         # Draw the boundary and classification regions. Ideally pcolormesh would be used, but with alpha values this gives unsightly lines along the edges of the
         # mesh due to overlapping squares (http://matplotlib.1069221.n5.nabble.com/Quadmesh-with-alpha-without-the-nasty-edge-effects-td41039.html) that
         # edgecolor='none' does not fix. Instead use my workaround that plays nice with alpha values and gives boundary lines.
-        self.currentFigure, self.axes = discreteheatmap.main(featureOneMesh, featureTwoMesh, np.transpose(np.array(classificatons)),
-                                                             currentFigure=self.currentFigure, boundary=True, boundaryColor='black', boundaryWidth=2,
-                                                             fill=1, fillAlpha=0.45, dotSize=125/self.divisions, colorMapping=self.classToColorMapping,
-                                                             title=self.title, xLabel=dataset.columns[0], yLabel=dataset.columns[1],
-                                                             spinesToRemove=[], legend=False)
+        self.currentFigure, self.axes = self.heatmap.plot(currentFigure=self.currentFigure, boundary=True, boundaryColor='black', boundaryWidth=2,
+                                                          fill=1, fillAlpha=0.45, dotSize=125/self.divisions, colorMapping=self.classToColorMapping,
+                                                          title=self.title, xLabel=dataset.columns[0], yLabel=dataset.columns[1],
+                                                          spinesToRemove=[], legend=False)
 
         # Plot the data.
         for index, series in dataset.iterrows():
@@ -262,15 +275,10 @@ class InteractiveNNDemo:
             self.plottedPoints[pointLocation] = [datapoint, observationClass]
             self.axes.add_patch(datapoint)
 
-        # Plot a fake scatter plot to get the legend working nicely.
-        legendPoints = []
-        for i in sorted(self.classToColorMapping):
-            scattered = self.axes.scatter(featureOne[classes == i], featureTwo[classes == i], s=40, c=self.classToColorMapping[i], label=str(i), marker='o', edgecolor='black', linewidths=0.25, alpha=0.75)
-            legendPoints.append(scattered)
-            scattered.remove()
-
         # Add a legend.
-        legend = self.axes.legend(legendPoints, [str(i) for i in sorted(self.classToColorMapping)], bbox_to_anchor=(1.05, 0.5), loc=6, borderaxespad=0, frameon=True, scatterpoints=1)
+        legendHandles = scatter.create_legend_handles(sorted(self.classToColorMapping), self.classToColorMapping, size=40, shape='o', edgeColor='black',
+                                                      linewidths=0.25, alpha=0.75)
+        legend = self.axes.legend(handles=legendHandles, bbox_to_anchor=(1.05, 0.5), loc=6, borderaxespad=0, frameon=True)
         legendFrame = legend.get_frame()
         legendFrame.set_facecolor('white')
         legendFrame.set_edgecolor('black')
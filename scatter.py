@@ -1,14 +1,26 @@
 import argparse
+import matplotlib.colors as mcolors
+import matplotlib.figure
+import matplotlib.lines as mlines
 import matplotlib.pyplot as plt
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
 import pandas
 import sys
 
 import colors
 
 
-def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', classColumn=None, columnsToPlot=[0, 1], title=''):
+def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', classColumn=None, columnsToPlot=[0, 1], title='', density=False,
+         chunkSize=None, colorByDensity=False, rasterize=False, pointsPerCell=None):
     """Create a scatter plot of a given dataset.
 
+    If chunkSize is set, the dataset is read a chunk of rows at a time, and the density of the points is plotted (see plot_density) whatever the value of
+    density, unless pointsPerCell is set and density is not. The dataset is read twice: once to find the range of the points and the classes, and once
+    to bin the points. As the points are never all in memory, they cannot then be colored by density or rasterized. If pointsPerCell is set and density
+    is not, the points are instead sampled a chunk at a time in the second pass (see sample_chunked_points), and the points kept are plotted as if the
+    whole dataset had been read at once.
+
     :param datasetLocation:     The location of the dataset to generate a scatterplot from.
     :type datasetLocation:      str
     :param outputLocation:      The location where the figure should be saved.
@@ -23,32 +35,101 @@ def main(datasetLocation, outputLocation, headerPresent=False, separator='\t', c
     :type columnsToPlot:        list of ints
     :param title:               The title for the figure.
     :type title:                str
+    :param density:             Whether the density of the points should be plotted instead of the points.
+    :type density:              boolean
+    :param chunkSize:           The number of rows to read at a time (implies density unless pointsPerCell is set).
+    :type chunkSize:            int (or None if the whole dataset should be read at once)
+    :param colorByDensity:      Whether the points should be colored by the density of the points around them.
+    :type colorByDensity:       boolean
+    :param rasterize:           Whether the points should be composited into a single image.
+    :type rasterize:            boolean
+    :param pointsPerCell:       The number of points of each class to keep in each pixel of the figure.
+    :type pointsPerCell:        int (or None if all the points should be plotted)
 
     """
 
-    # Extract the data.
-    dataset = pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None))
-
     # Setup the columns to plot.
     if not columnsToPlot or len(columnsToPlot) != 2:
         # If two columns were not specified, then default to plotting the first two columns.
         columnsToPlot = [0, 1]
 
+    if chunkSize and (density or not pointsPerCell) and (colorByDensity or rasterize):
+        raise ValueError('The points cannot be colored by density or rasterized when the dataset is read in chunks, unless pointsPerCell is set.')
+
+    if chunkSize:
+        # Stream through the dataset, reading only the columns to plot.
+        header = pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None), nrows=1)
+        columnIndices = [i % len(header.columns) for i in columnsToPlot]
+        classIndex = classColumn % len(header.columns) if type(classColumn) == int else None
+        usedColumns = sorted(set(columnIndices + ([] if classIndex is None else [classIndex])))
+        readParameters = {'sep': separator, 'header': (0 if headerPresent else None), 'usecols': usedColumns, 'chunksize': chunkSize}
+
+        # Determine the range of the points and the classes. When sampling, the range only covers the points with both coordinates, as in sample_points.
+        sampling = pointsPerCell and not density
+        extent = [np.inf, -np.inf, np.inf, -np.inf]
+        uniqueLabels = set()
+        for i in pandas.read_csv(datasetLocation, **readParameters):
+            if sampling:
+                i = i.dropna(subset=[header.columns[j] for j in columnIndices])
+            extent = [min(extent[0], i[header.columns[columnIndices[0]]].min()), max(extent[1], i[header.columns[columnIndices[0]]].max()),
+                      min(extent[2], i[header.columns[columnIndices[1]]].min()), max(extent[3], i[header.columns[columnIndices[1]]].max())]
+            if classIndex is not None:
+                uniqueLabels.update(i[header.columns[classIndex]].dropna().unique())
+        uniqueLabels = sorted(uniqueLabels) if classIndex is not None else None
+
+        if sampling:
+            # Sample the points, and plot the points kept.
+            chunks = pandas.read_csv(datasetLocation, **readParameters)
+            xValues, yValues, classLabels = sample_chunked_points(chunks, [header.columns[i] for i in columnIndices],
+                                                                  None if classIndex is None else header.columns[classIndex], extent, uniqueLabels,
+                                                                  pointsPerCell=pointsPerCell)
+            plot(xValues, yValues, outputLocation, classLabels=pandas.Series(classLabels), title=title, xLabel=header.columns[columnIndices[0]],
+                 yLabel=header.columns[columnIndices[1]], colorByDensity=colorByDensity, rasterize=rasterize)
+            return
+
+        # Bin the points.
+        densityGrid = np.zeros((len(uniqueLabels or [None]),) + calc_density_shape(), dtype=np.int64)
+        for i in pandas.read_csv(datasetLocation, **readParameters):
+            add_density(densityGrid, extent, i[header.columns[columnIndices[0]]].values, i[header.columns[columnIndices[1]]].values,
+                        None if classIndex is None else i[header.columns[classIndex]].values, uniqueLabels)
+        plot_density(densityGrid, extent, uniqueLabels, outputLocation=outputLocation, title=title, xLabel=header.columns[columnIndices[0]],
+                     yLabel=header.columns[columnIndices[1]])
+        return
+
+    # Extract the data.
+    dataset = pandas.read_csv(datasetLocation, sep=separator, header=(0 if headerPresent else None))
+
     # Extract the data to plot and plot it.
     featureOne = dataset.iloc[:, columnsToPlot[0]]
     featureTwo = dataset.iloc[:, columnsToPlot[1]]
     if type(classColumn) == int:
         # If a class columns has been specified then the classes should be highlighted in the plot.
         classes = dataset.iloc[:, classColumn]
-        plot(featureOne, featureTwo, outputLocation, classLabels=classes, title=title, xLabel=dataset.columns[columnsToPlot[0]], yLabel=dataset.columns[columnsToPlot[1]])
+        plot(featureOne, featureTwo, outputLocation, classLabels=classes, title=title, xLabel=dataset.columns[columnsToPlot[0]], yLabel=dataset.columns[columnsToPlot[1]],
+             density=density, colorByDensity=colorByDensity, rasterize=rasterize, pointsPerCell=pointsPerCell)
     else:
-        plot(featureOne, featureTwo, outputLocation, title=title, xLabel=dataset.columns[columnsToPlot[0]], yLabel=dataset.columns[columnsToPlot[1]])
+        plot(featureOne, featureTwo, outputLocation, title=title, xLabel=dataset.columns[columnsToPlot[0]], yLabel=dataset.columns[columnsToPlot[1]], density=density,
+             colorByDensity=colorByDensity, rasterize=rasterize, pointsPerCell=pointsPerCell)
 
 
 def plot(xValues, yValues, outputLocation=None, classLabels=pandas.Series(), currentFigure=None, title='', xLabel='', yLabel='', size=40,
-         shape='o', edgeColor='black', faceColorSet='set2', colorMapping=None, linewidths=0.25, alpha=0.75, spinesToRemove=['top', 'right'], legend=True):
+         shape='o', edgeColor='black', faceColorSet='set2', colorMapping=None, linewidths=0.25, alpha=0.75, spinesToRemove=['top', 'right'], legend=True,
+         density=False, densityShape=None, densityNorm='log', colorByDensity=False, densityColorSet='yellowGreenBlue', densityBandwidth=None,
+         densityGridSize=256, rasterize=False, pointsPerCell=None, sampleSeed=0):
     """Plot a scatterplot.
 
+    If pointsPerCell is set, only a subset of the points are plotted, with at most pointsPerCell points of each class kept in each pixel of the figure
+    (see sample_points). This caps the time to render the plot and the size of the output regardless of the number of points.
+
+    If rasterize is True, the points are composited into a single image (see splat_points) rather than drawn as one path per point by matplotlib. This
+    is much faster for millions of points, but the points will be pixelated in vector output formats.
+
+    If colorByDensity is True, each point is colored by an estimate of the density of the points around it (see calc_point_densities), and the points
+    are drawn in order of increasing density so that the densest points are on top. The class labels are then ignored.
+
+    If density is True, the points are binned into a grid with roughly one cell per pixel of the figure, and the grid is shown as a single image (see
+    plot_density) rather than the points being drawn individually.
+
     :param xValues:             The x values of the points to plot.
     :type xValues:              pandas.DataFrame() column vector
     :param yValues:             The y values of the points to plot.
@@ -86,11 +167,679 @@ def plot(xValues, yValues, outputLocation=None, classLabels=pandas.Series(), cur
     :type spinesToRemove:       list containing any of ['left', 'right', 'top', 'bottom']
     :param legend:              Whether a legend should be added.
     :type legend:               boolean
+    :param density:             Whether the density of the points should be plotted instead of the points.
+    :type density:              boolean
+    :param densityShape:        The number of rows and columns in the grid the points are binned into.
+    :type densityShape:         (int, int) tuple (or None to use the size of the figure in pixels)
+    :param densityNorm:         The normalisation used to shade the density of the points.
+    :type densityNorm:          'log' or 'eqhist'
+    :param colorByDensity:      Whether the points should be colored by the density of the points around them.
+    :type colorByDensity:       boolean
+    :param densityColorSet:     The color set to use in coloring the points by density.
+    :type densityColorSet:      any key in the colors.colorMaps dictionary
+    :param densityBandwidth:    The standard deviation of the Gaussian kernel used to estimate the density along the x and y axes.
+    :type densityBandwidth:     (float, float) tuple (or None to use Scott's rule)
+    :param densityGridSize:     The number of grid points along each axis of the grid the density is estimated on.
+    :type densityGridSize:      int
+    :param rasterize:           Whether the points should be composited into a single image.
+    :type rasterize:            boolean
+    :param pointsPerCell:       The number of points of each class to keep in each pixel of the figure.
+    :type pointsPerCell:        int (or None if all the points should be plotted)
+    :param sampleSeed:          The seed for the random choice of the points to keep.
+    :type sampleSeed:           int
     :returns :                  The figure and axes on which the scatterplot was plotted if saving is not to be performed.
     :type :                     objects of type matplotlib.figure.Figure, matplotlib.axes.Axes
 
     """
 
+    # Downsample the points if requested.
+    if pointsPerCell and not density:
+        labelCodes = None if classLabels.empty else pandas.factorize(np.asarray(classLabels).ravel())[0]
+        sampleIndices = sample_points(xValues, yValues, labelCodes, calc_density_shape(currentFigure), pointsPerCell, sampleSeed)
+        xValues = np.asarray(xValues).ravel()[sampleIndices]
+        yValues = np.asarray(yValues).ravel()[sampleIndices]
+        classLabels = classLabels if classLabels.empty else pandas.Series(np.asarray(classLabels).ravel()[sampleIndices])
+
+    # Plot the density of the points instead of the points themselves if requested.
+    if density:
+        uniqueLabels = None if classLabels.empty else sorted(classLabels.dropna().unique())
+        xValues = np.asarray(xValues, dtype=float).ravel()
+        yValues = np.asarray(yValues, dtype=float).ravel()
+        extent = [np.nanmin(xValues), np.nanmax(xValues), np.nanmin(yValues), np.nanmax(yValues)]
+        densityGrid = np.zeros((len(uniqueLabels or [None]),) + (densityShape or calc_density_shape(currentFigure)), dtype=np.int64)
+        add_density(densityGrid, extent, xValues, yValues, None if classLabels.empty else classLabels, uniqueLabels)
+        return plot_density(densityGrid, extent, uniqueLabels, outputLocation=outputLocation, currentFigure=currentFigure, title=title, xLabel=xLabel,
+                            yLabel=yLabel, faceColorSet=faceColorSet, colorMapping=colorMapping, alpha=alpha, densityNorm=densityNorm,
+                            spinesToRemove=spinesToRemove, legend=legend)
+
+    currentFigure, axes = setup_axes(currentFigure, title, xLabel, yLabel, spinesToRemove)
+
+    # Determine the color of each point.
+    xValues = np.asarray(xValues).ravel()
+    yValues = np.asarray(yValues).ravel()
+    if colorByDensity:
+        # Color the points by density, and plot the densest points last.
+        pointDensities = calc_point_densities(xValues, yValues, densityGridSize, densityBandwidth)
+        drawOrder = np.argsort(pointDensities, kind='stable')
+        xValues = xValues[drawOrder]
+        yValues = yValues[drawOrder]
+        densityColorMap = mcolors.LinearSegmentedColormap.from_list(densityColorSet, colors.colorMaps[densityColorSet])
+        pointDensities = pointDensities[drawOrder]
+        # Scale the colors to the densities of the points with both coordinates, as the points with a missing coordinate have no density.
+        finiteDensities = pointDensities[np.isfinite(pointDensities)]
+        densityRange = (finiteDensities.min(), finiteDensities.max()) if finiteDensities.size else (None, None)
+        pointColors = densityColorMap(mcolors.Normalize(*densityRange)(pointDensities))
+    elif classLabels.empty:
+        # If there are no classes, then all points are one color.
+        pointColors = mcolors.to_rgba_array(['black'])[np.zeros(xValues.size, dtype=np.int64)]
+    else:
+        # Map the class values to colors, and look up the color of each point from the integer code of its class. Points with a missing class are
+        # not plotted.
+        uniqueLabels = sorted(classLabels.dropna().unique())
+        colorMapping = colorMapping or create_color_mapping(uniqueLabels, faceColorSet)
+        labelCodes = pandas.Index(uniqueLabels).get_indexer(np.asarray(classLabels).ravel())
+        xValues = xValues[labelCodes >= 0]
+        yValues = yValues[labelCodes >= 0]
+        labelColors = mcolors.to_rgba_array([colorMapping[i] for i in uniqueLabels])
+        pointColors = labelColors[labelCodes[labelCodes >= 0]]
+
+    # Generate the plot, drawing all the points at once.
+    if rasterize:
+        splat_points(axes, xValues, yValues, pointColors, size=size, shape=shape, edgeColor=edgeColor, linewidths=linewidths, alpha=alpha)
+    else:
+        axes.scatter(xValues, yValues, s=size, c=pointColors, marker=shape, edgecolor=edgeColor, linewidths=linewidths, alpha=alpha)
+
+    # Add a legend.
+    if legend and not (colorByDensity or classLabels.empty):
+        handles = create_legend_handles(uniqueLabels, colorMapping, size=size, shape=shape, edgeColor=edgeColor, linewidths=linewidths, alpha=alpha)
+        add_legend(axes, handles)
+
+    if outputLocation:
+        plt.savefig(outputLocation, bbox_inches='tight', transparent=True)
+    else:
+        return currentFigure, axes
+
+
+def plot_density(densityGrid, extent, uniqueLabels=None, outputLocation=None, currentFigure=None, title='', xLabel='', yLabel='', faceColorSet='set2',
+                 colorMapping=None, alpha=0.75, densityNorm='log', spinesToRemove=['top', 'right'], legend=True):
+    """Plot the density of the points in a scatterplot as a single image.
+
+    Each cell of the grid is shaded by the number of points in it, normalised by the logarithm of the number ('log') or by the fraction of the non-empty
+    cells with fewer points in them ('eqhist', which spreads the shades evenly across the cells). When there are classes, the color of each cell is the
+    blend of the colors of the classes weighted by the number of points of each class in the cell. Empty cells are transparent.
+
+    :param densityGrid:         The number of points of each class in each cell of the grid (see add_density).
+    :type densityGrid:          3 dimensional numpy array with one grid of rows and columns per class
+    :param extent:              The smallest x value, largest x value, smallest y value and largest y value covered by the grid.
+    :type extent:               list of floats
+    :param uniqueLabels:        The class values in the order of the grids of the classes.
+    :type uniqueLabels:         list (or None if there are no classes)
+    :param outputLocation:      The location where the figure will be saved.
+    :type outputLocation:       str (or None if saving is not desired)
+    :param currentFigure:       The figure from which the axes to plot the density on will be taken. If not provided, then a new figure will be created.
+    :type currentFigure:        matplotlib.figure.Figure
+    :param title:               The title for the plot.
+    :type title:                str
+    :param xLabel:              The label for the x axis.
+    :type xLabel:               str
+    :param yLabel:              The label for the y axis.
+    :type yLabel:               str
+    :param faceColorSet:        The color set to use for the classes. If colorMapping is provided this parameter is ignored.
+    :type faceColorSet:         any key in the colors.colorMaps dictionary
+    :param colorMapping:        A mapping from class values to their RGB color value.
+    :type colorMapping:         dict
+    :param alpha:               The alpha value of the cells with the most points.
+    :type alpha:                float between 0 and 1
+    :param densityNorm:         The normalisation used to shade the density of the points.
+    :type densityNorm:          'log' or 'eqhist'
+    :param spinesToRemove:      The spines that should be removed from the axes.
+    :type spinesToRemove:       list containing any of ['left', 'right', 'top', 'bottom']
+    :param legend:              Whether a legend should be added.
+    :type legend:               boolean
+    :returns :                  The figure and axes on which the density was plotted if saving is not to be performed.
+    :type :                     objects of type matplotlib.figure.Figure, matplotlib.axes.Axes
+
+    """
+
+    currentFigure, axes = setup_axes(currentFigure, title, xLabel, yLabel, spinesToRemove)
+
+    # Determine the color of each class.
+    if uniqueLabels is None:
+        labelColors = mcolors.to_rgba_array(['black'])
+    else:
+        colorMapping = colorMapping or create_color_mapping(uniqueLabels, faceColorSet)
+        labelColors = mcolors.to_rgba_array([colorMapping[i] for i in uniqueLabels])
+
+    # Normalise the number of points in each cell.
+    totalCounts = densityGrid.sum(axis=0)
+    if densityNorm == 'log':
+        shades = np.log1p(totalCounts) / max(np.log1p(totalCounts.max()), 1)
+    elif densityNorm == 'eqhist':
+        sortedCounts = np.sort(totalCounts[totalCounts > 0])
+        shades = np.searchsorted(sortedCounts, totalCounts, side='right') / max(sortedCounts.size, 1)
+    else:
+        raise ValueError('Unknown density normalisation: {0}'.format(densityNorm))
+
+    # Blend the colors of the classes in each cell, and make the cells more opaque the more points there are in them. Cells with any points are kept
+    # visible by giving them an alpha value of at least 20% of the maximum.
+    image = np.zeros(totalCounts.shape + (4,))
+    occupied = totalCounts > 0
+    image[occupied, :3] = np.tensordot(densityGrid[:, occupied], labelColors[:, :3], axes=([0], [0])) / totalCounts[occupied, np.newaxis]
+    image[occupied, 3] = alpha * (0.2 + (0.8 * shades[occupied]))
+    axes.imshow(image, origin='lower', extent=extent, interpolation='nearest', aspect='auto')
+
+    # Add a legend.
+    if legend and uniqueLabels is not None:
+        add_legend(axes, create_legend_handles(uniqueLabels, colorMapping, edgeColor='none', alpha=alpha))
+
+    if outputLocation:
+        plt.savefig(outputLocation, bbox_inches='tight', transparent=True)
+    else:
+        return currentFigure, axes
+
+
+def add_density(densityGrid, extent, xValues, yValues, classLabels=None, uniqueLabels=None):
+    """Add the number of points in each cell of a grid to the counts in the grid.
+
+    The grid is evenly spaced across the extent, with the points on the largest x and y values placed in the last column and row. Points outside the
+    extent, or with missing coordinates or classes not in uniqueLabels, are not counted. The cell of each point is found arithmetically, and the points
+    are counted with a single call to numpy.bincount.
+
+    :param densityGrid:     The number of points of each class in each cell of the grid, which is updated in place.
+    :type densityGrid:      3 dimensional numpy array with one grid of rows and columns per class
+    :param extent:          The smallest x value, largest x value, smallest y value and largest y value covered by the grid.
+    :type extent:           list of floats
+    :param xValues:         The x values of the points.
+    :type xValues:          1 dimensional array like object
+    :param yValues:         The y values of the points.
+    :type yValues:          1 dimensional array like object
+    :param classLabels:     The classes of the points.
+    :type classLabels:      1 dimensional array like object (or None if there are no classes)
+    :param uniqueLabels:    The class values in the order of the grids of the classes.
+    :type uniqueLabels:     list (or None if there are no classes)
+
+    """
+
+    numberOfClasses, numberOfRows, numberOfCols = densityGrid.shape
+    xValues = np.asarray(xValues, dtype=float).ravel()
+    yValues = np.asarray(yValues, dtype=float).ravel()
+    labelCodes = np.zeros(xValues.size, dtype=np.int64)
+    if classLabels is not None:
+        labelCodes = pandas.Categorical(np.asarray(classLabels).ravel(), categories=uniqueLabels).codes.astype(np.int64)
+
+    # Count the points in each cell.
+    cellIndices, inGrid = calc_cell_indices(xValues, yValues, extent, (numberOfRows, numberOfCols))
+    inGrid &= labelCodes >= 0
+    cellIndices = (labelCodes[inGrid] * numberOfRows * numberOfCols) + cellIndices[inGrid]
+    densityGrid += np.bincount(cellIndices, minlength=densityGrid.size).reshape(densityGrid.shape)
+
+
+def add_legend(axes, handles):
+    """Add a legend to the right of the axes.
+
+    :param axes:        The axes to add the legend to.
+    :type axes:         matplotlib.axes.Axes
+    :param handles:     The entries of the legend.
+    :type handles:      list of matplotlib artists
+
+    """
+
+    legend = axes.legend(handles=handles, bbox_to_anchor=(1.05, 0.5), loc=6, borderaxespad=0, frameon=True)
+    legendFrame = legend.get_frame()
+    legendFrame.set_facecolor('white')
+    legendFrame.set_edgecolor('black')
+    legendFrame.set_linewidth(0.2)
+    for i in legend.get_texts():
+        i.set_color('0.25')
+
+
+def calc_point_densities(xValues, yValues, gridSize=256, bandwidth=None):
+    """Estimate the density of the points around each point with a binned Gaussian kernel density estimate.
+
+    The points are linearly binned onto a gridSize x gridSize grid that extends three bandwidths beyond the points, the grid is convolved with the
+    Gaussian kernel using FFTs (zero padded to avoid wrapping around the edges), and the density at each point is linearly interpolated from the
+    smoothed grid. This takes O(n + G log G) time for n points and G grid points, rather than the O(n^2) time of evaluating the kernel density estimate
+    at each point directly.
+
+    :param xValues:     The x values of the points.
+    :type xValues:      1 dimensional array like object
+    :param yValues:     The y values of the points.
+    :type yValues:      1 dimensional array like object
+    :param gridSize:    The number of grid points along each axis.
+    :type gridSize:     int
+    :param bandwidth:   The standard deviation of the Gaussian kernel along the x and y axes.
+    :type bandwidth:    (float, float) tuple (or None to use Scott's rule)
+    :returns :          The estimated density at each point (NaN for points with a missing coordinate).
+    :type :             1 dimensional numpy array
+
+    """
+
+    xValues = np.asarray(xValues, dtype=float).ravel()
+    yValues = np.asarray(yValues, dtype=float).ravel()
+    pointDensities = np.full(xValues.size, np.nan)
+    present = ~(np.isnan(xValues) | np.isnan(yValues))
+    numberOfPoints = np.count_nonzero(present)
+    if numberOfPoints == 0:
+        return pointDensities
+    pointCoords = [xValues[present], yValues[present]]
+
+    # Determine the bandwidth, the extent of the grid and the position of each point in grid units.
+    if bandwidth is None:
+        bandwidth = [(i.std() * (numberOfPoints ** (-1 / 6))) or 1 for i in pointCoords]
+    gridSpacings = []
+    gridPositions = []
+    for coords, width in zip(pointCoords, bandwidth):
+        gridStart = coords.min() - (3 * width)
+        gridSpacings.append((coords.max() + (3 * width) - gridStart) / (gridSize - 1))
+        gridPositions.append((coords - gridStart) / gridSpacings[-1])
+
+    # Split each point between the four grid points surrounding it in proportion to how close it is to them.
+    lowerIndices = [np.minimum(np.floor(i).astype(np.int64), gridSize - 2) for i in gridPositions]
+    fractions = [i - j for i, j in zip(gridPositions, lowerIndices)]
+    cornerIndices = []
+    cornerWeights = []
+    for i in [0, 1]:
+        for j in [0, 1]:
+            cornerIndices.append(((lowerIndices[1] + i) * gridSize) + lowerIndices[0] + j)
+            cornerWeights.append((fractions[1] if i else 1 - fractions[1]) * (fractions[0] if j else 1 - fractions[0]))
+    pointGrid = np.bincount(np.concatenate(cornerIndices), np.concatenate(cornerWeights), minlength=gridSize * gridSize).reshape(gridSize, gridSize)
+
+    # Convolve the grid with the Gaussian kernel. The kernel is sampled at the offsets between grid points in the order the FFT expects.
+    paddedSize = 2 * gridSize
+    offsets = np.fft.fftfreq(paddedSize) * paddedSize
+    kernelX = np.exp(-0.5 * ((offsets * gridSpacings[0] / bandwidth[0]) ** 2))
+    kernelY = np.exp(-0.5 * ((offsets * gridSpacings[1] / bandwidth[1]) ** 2))
+    kernel = np.outer(kernelY, kernelX) / (2 * np.pi * bandwidth[0] * bandwidth[1] * numberOfPoints)
+    densityGrid = np.fft.irfft2(np.fft.rfft2(pointGrid, s=(paddedSize, paddedSize)) * np.fft.rfft2(kernel), s=(paddedSize, paddedSize))
+    densityGrid = np.maximum(densityGrid[:gridSize, :gridSize], 0).ravel()
+
+    # Interpolate the density at each point from the grid points surrounding it.
+    pointDensities[present] = sum([densityGrid[i] * j for i, j in zip(cornerIndices, cornerWeights)])
+    return pointDensities
+
+
+def calc_cell_indices(xValues, yValues, extent, shape):
+    """Determine the cell of an evenly spaced grid that each point falls in.
+
+    Points on the largest x and y values of the extent are placed in the last column and row of the grid.
+
+    :param xValues:     The x values of the points.
+    :type xValues:      1 dimensional numpy array of floats
+    :param yValues:     The y values of the points.
+    :type yValues:      1 dimensional numpy array of floats
+    :param extent:      The smallest x value, largest x value, smallest y value and largest y value covered by the grid.
+    :type extent:       list of floats
+    :param shape:       The number of rows and columns in the grid.
+    :type shape:        (int, int) tuple
+    :returns :          The index of the cell of each point in the flattened grid, and whether each point is in the grid (points outside the grid
+                        or with missing coordinates are not, and their cell indices are meaningless).
+    :type :             1 dimensional numpy array of ints, 1 dimensional numpy array of booleans
+
+    """
+
+    numberOfRows, numberOfCols = shape
+    xScale = numberOfCols / ((extent[1] - extent[0]) or 1)
+    yScale = numberOfRows / ((extent[3] - extent[2]) or 1)
+    with np.errstate(invalid='ignore'):
+        colIndices = np.floor((xValues - extent[0]) * xScale)
+        rowIndices = np.floor((yValues - extent[2]) * yScale)
+        colIndices[xValues == extent[1]] = numberOfCols - 1
+        rowIndices[yValues == extent[3]] = numberOfRows - 1
+        inGrid = (colIndices >= 0) & (colIndices < numberOfCols) & (rowIndices >= 0) & (rowIndices < numberOfRows)
+    cellIndices = (np.where(inGrid, rowIndices, 0).astype(np.int64) * numberOfCols) + np.where(inGrid, colIndices, 0).astype(np.int64)
+    return cellIndices, inGrid
+
+
+def calc_density_shape(currentFigure=None):
+    """Determine the size of a figure in pixels.
+
+    :param currentFigure:   The figure.
+    :type currentFigure:    matplotlib.figure.Figure (or None to use the default size of new figures)
+    :returns :              The height and width of the figure in pixels.
+    :type :                 (int, int) tuple
+
+    """
+
+    if currentFigure is None:
+        width, height = plt.rcParams['figure.figsize']
+        dpi = plt.rcParams['figure.dpi']
+    else:
+        width, height = currentFigure.get_size_inches()
+        dpi = currentFigure.dpi
+    return max(int(round(height * dpi)), 1), max(int(round(width * dpi)), 1)
+
+
+def create_marker_masks(size=40, shape='o', linewidths=0.25, dpi=100):
+    """Rasterize a marker as a mask of its face and a mask of its edge.
+
+    :param size:        The size of the marker.
+    :type size:         float
+    :param shape:       The shape of the marker.
+    :type shape:        any valid shape accepted by matplotlib.pyplot.scatter
+    :param linewidths:  The width of the line edge around the marker.
+    :type linewidths:   float
+    :param dpi:         The resolution the marker is rasterized at.
+    :type dpi:          float
+    :returns :          The coverage of each pixel by the face and by the edge of the marker, with the marker centered in the masks and the first
+                        row at the bottom.
+    :type :             two square numpy arrays with an odd number of rows
+
+    """
+
+    spriteRadius = int(np.ceil(((np.sqrt(size) + linewidths) * dpi / 72) / 2)) + 1
+    spriteSize = (2 * spriteRadius) + 1
+    masks = []
+    for faceColor, maskEdgeColor in [('white', 'none'), ('none', 'white')]:
+        spriteFigure = matplotlib.figure.Figure(figsize=(spriteSize / dpi, spriteSize / dpi), dpi=dpi)
+        spriteFigure.patch.set_alpha(0)
+        spriteCanvas = FigureCanvasAgg(spriteFigure)
+        spriteAxes = spriteFigure.add_axes([0, 0, 1, 1])
+        spriteAxes.set_axis_off()
+        spriteAxes.set_xlim(-spriteSize / 2, spriteSize / 2)
+        spriteAxes.set_ylim(-spriteSize / 2, spriteSize / 2)
+        spriteAxes.scatter([0], [0], s=size, marker=shape, facecolor=faceColor, edgecolor=maskEdgeColor, linewidths=linewidths)
+        spriteCanvas.draw()
+        masks.append(np.flipud(np.asarray(spriteCanvas.buffer_rgba())[:, :, 3] / 255))
+    return masks[0], masks[1]
+
+
+def create_color_mapping(uniqueLabels, faceColorSet='set2'):
+    """Map class values to colors.
+
+    If there are more class values than colors in the color set, then multiple class values will be mapped to the same color.
+
+    :param uniqueLabels:    The class values.
+    :type uniqueLabels:     list
+    :param faceColorSet:    The color set to cycle through.
+    :type faceColorSet:     any key in the colors.colorMaps dictionary
+    :returns :              A mapping from class values to their RGB color value.
+    :type :                 dict
+
+    """
+
+    colorsToUse = colors.colorMaps[faceColorSet]
+    return dict([(j, colorsToUse[i % len(colorsToUse)]) for i, j in enumerate(uniqueLabels)])
+
+
+def create_legend_handles(labels, colorMapping, size=40, shape='o', edgeColor='black', linewidths=0.25, alpha=0.75):
+    """Create the legend entries for the classes in a scatterplot.
+
+    Each entry is a proxy artist drawn with the marker used for the points of its class, so that the legend can be created without a separate plot of
+    the points of each class.
+
+    :param labels:          The class values to create legend entries for, in the order they should appear in the legend.
+    :type labels:           list
+    :param colorMapping:    A mapping from class values to their RGB color value.
+    :type colorMapping:     dict
+    :param size:            The size of the points in the scatterplot.
+    :type size:             float
+    :param shape:           The shape of the points in the scatterplot.
+    :type shape:            any valid shape accepted by matplotlib.pyplot.scatter
+    :param edgeColor:       The color of the line edges around the points.
+    :type edgeColor:        any color accepted by matplotlib.pyplot.scatter
+    :param linewidths:      The width of the line edges around the points.
+    :type linewidths:       float
+    :param alpha:           The alpha value for the points face colors.
+    :type alpha:            float between 0 and 1
+    :returns :              The legend entries.
+    :type :                 list of matplotlib.lines.Line2D
+
+    """
+
+    return [mlines.Line2D([], [], linestyle='none', marker=shape, markersize=np.sqrt(size), markerfacecolor=colorMapping[i], markeredgecolor=edgeColor,
+                          markeredgewidth=linewidths, alpha=alpha, label=str(i)) for i in labels]
+
+
+def splat_points(axes, xValues, yValues, pointColors, size=40, shape='o', edgeColor='black', linewidths=0.25, alpha=0.75, chunkSize=2**16):
+    """Draw the points of a scatterplot by compositing a raster image of the marker at each point into a single image.
+
+    The marker is rasterized once, as a mask of its face and a mask of its edge, at the resolution of the figure. The points are then composited in
+    order (each point over the ones before it) into a frame buffer covering the axes, and the frame buffer is placed on the axes as an image. Within
+    a chunk of points the compositing is vectorized: the pixels covered by each point are sorted (stably) by frame buffer index, and each one is
+    attenuated by the product of one minus the alpha values of the later pixels at the same index.
+
+    The limits of the axes are fixed at those matplotlib would choose for the points, so changing the limits afterwards will misplace the points.
+
+    :param axes:            The axes to draw the points on.
+    :type axes:             matplotlib.axes.Axes
+    :param xValues:         The x values of the points, in the order they are to be drawn.
+    :type xValues:          1 dimensional numpy array
+    :param yValues:         The y values of the points, in the order they are to be drawn.
+    :type yValues:          1 dimensional numpy array
+    :param pointColors:     The RGBA face color of each point.
+    :type pointColors:      n x 4 numpy array
+    :param size:            The size of the points.
+    :type size:             float
+    :param shape:           The shape of the points.
+    :type shape:            any valid shape accepted by matplotlib.pyplot.scatter
+    :param edgeColor:       The color of the line edges around the points.
+    :type edgeColor:        any color accepted by matplotlib.pyplot.scatter
+    :param linewidths:      The width of the line edges around the points.
+    :type linewidths:       float
+    :param alpha:           The alpha value for the points.
+    :type alpha:            float between 0 and 1
+    :param chunkSize:       The number of points to composite at a time.
+    :type chunkSize:        int
+
+    """
+
+    # Set the limits of the axes as they would be set for the points.
+    present = ~(np.isnan(xValues) | np.isnan(yValues))
+    xValues = xValues[present]
+    yValues = yValues[present]
+    pointColors = pointColors[present]
+    axes.update_datalim(np.column_stack([xValues, yValues]))
+    axes.autoscale_view()
+    xLimits = axes.get_xlim()
+    yLimits = axes.get_ylim()
+
+    # Determine the pixel of the frame buffer that the center of each point falls in.
+    axesBox = axes.get_window_extent()
+    numberOfCols = max(int(round(axesBox.width)), 1)
+    numberOfRows = max(int(round(axesBox.height)), 1)
+    pixelCoords = axes.transData.transform(np.column_stack([xValues, yValues])) - [axesBox.x0, axesBox.y0]
+    pixelCols = np.floor(pixelCoords[:, 0]).astype(np.int64)
+    pixelRows = np.floor(pixelCoords[:, 1]).astype(np.int64)
+
+    # Determine the color and coverage of each pixel of the marker for each point (with colors premultiplied by alpha).
+    faceMask, edgeMask = create_marker_masks(size, shape, linewidths, axes.figure.dpi)
+    spriteRadius = faceMask.shape[0] // 2
+    spriteRows, spriteCols = np.nonzero((faceMask > 0) | (edgeMask > 0))
+    edgeRGBA = mcolors.to_rgba(edgeColor)
+    edgeCoverage = edgeMask[spriteRows, spriteCols] * edgeRGBA[3]
+    faceCoverage = faceMask[spriteRows, spriteCols] * (1 - edgeCoverage)
+    spriteRows = spriteRows - spriteRadius
+    spriteCols = spriteCols - spriteRadius
+
+    # Composite the points a chunk at a time, with each chunk drawn over the chunks before it.
+    frameBuffer = np.zeros((numberOfRows * numberOfCols, 4))
+    for i in range(0, xValues.size, chunkSize):
+        chunkColors = pointColors[i:i + chunkSize]
+        rows = pixelRows[i:i + chunkSize, np.newaxis] + spriteRows
+        cols = pixelCols[i:i + chunkSize, np.newaxis] + spriteCols
+        coverage = alpha * ((faceCoverage * chunkColors[:, 3:4]) + edgeCoverage)
+        premultiplied = (alpha * faceCoverage * chunkColors[:, 3:4])[:, :, np.newaxis] * chunkColors[:, np.newaxis, :3]
+        premultiplied += (alpha * edgeCoverage)[np.newaxis, :, np.newaxis] * np.array(edgeRGBA[:3])
+
+        # Keep the pixels that fall in the frame buffer, ordered by frame buffer index and then by drawing order.
+        inFrame = ((rows >= 0) & (rows < numberOfRows) & (cols >= 0) & (cols < numberOfCols)).ravel()
+        frameIndices = ((rows * numberOfCols) + cols).ravel()[inFrame]
+        coverage = coverage.ravel()[inFrame]
+        premultiplied = premultiplied.reshape(-1, 3)[inFrame]
+        sortOrder = np.argsort(frameIndices, kind='stable')
+        frameIndices = frameIndices[sortOrder]
+        coverage = coverage[sortOrder]
+        premultiplied = premultiplied[sortOrder]
+
+        # Attenuate each pixel by the pixels drawn over it, using a reversed cumulative sum of log transmittance within each frame buffer index.
+        logTransmittance = np.log1p(-np.minimum(coverage, 1 - 1e-7))
+        laterTransmittance = np.cumsum(logTransmittance[::-1])[::-1] - logTransmittance
+        groupStarts = np.flatnonzero(np.r_[True, frameIndices[1:] != frameIndices[:-1]])
+        groupEnds = np.r_[groupStarts[1:], frameIndices.size]
+        laterTransmittance -= np.repeat(laterTransmittance[groupEnds - 1], groupEnds - groupStarts)
+        weights = np.exp(laterTransmittance)
+
+        # Draw the chunk over the frame buffer.
+        chunkBuffer = np.zeros((numberOfRows * numberOfCols, 4))
+        for j in range(3):
+            chunkBuffer[:, j] = np.bincount(frameIndices, premultiplied[:, j] * weights, minlength=chunkBuffer.shape[0])
+        chunkBuffer[frameIndices[groupStarts], 3] = 1 - np.exp(laterTransmittance[groupStarts] + logTransmittance[groupStarts])
+        frameBuffer = chunkBuffer + (frameBuffer * (1 - chunkBuffer[:, 3:4]))
+
+    # Convert the frame buffer from premultiplied colors, and place it on the axes.
+    image = frameBuffer.reshape(numberOfRows, numberOfCols, 4)
+    covered = image[:, :, 3] > 0
+    image[covered, :3] /= image[covered, 3:4]
+    axes.imshow(np.clip(image, 0, 1), origin='lower', extent=xLimits + yLimits, interpolation='nearest', aspect='auto')
+    axes.set_xlim(xLimits)
+    axes.set_ylim(yLimits)
+
+
+def sample_points(xValues, yValues, labelCodes=None, shape=None, pointsPerCell=1, seed=0):
+    """Select a subset of the points of a scatterplot that looks like the whole set when plotted.
+
+    The points are binned into a grid (by default with one cell per pixel of a new figure), and at most pointsPerCell points of each class are kept in
+    each cell. The points to keep are chosen at random, by sorting the points by cell and class and then by a random priority and keeping the first
+    pointsPerCell points of each cell and class. Points of a class in a cell with no more than pointsPerCell points of that class are therefore all kept,
+    so rare classes and isolated points are never lost. Points with missing coordinates are dropped.
+
+    :param xValues:         The x values of the points.
+    :type xValues:          1 dimensional array like object
+    :param yValues:         The y values of the points.
+    :type yValues:          1 dimensional array like object
+    :param labelCodes:      The integer code of the class of each point.
+    :type labelCodes:       1 dimensional numpy array of ints (or None if there are no classes)
+    :param shape:           The number of rows and columns in the grid.
+    :type shape:            (int, int) tuple (or None to use the size of a new figure in pixels)
+    :param pointsPerCell:   The number of points of each class to keep in each cell.
+    :type pointsPerCell:    int
+    :param seed:            The seed for the random number generator used to choose the points to keep.
+    :type seed:             int
+    :returns :              The indices of the points to keep, in increasing order.
+    :type :                 1 dimensional numpy array of ints
+
+    """
+
+    xValues = np.asarray(xValues, dtype=float).ravel()
+    yValues = np.asarray(yValues, dtype=float).ravel()
+    shape = shape or calc_density_shape()
+    present = ~(np.isnan(xValues) | np.isnan(yValues))
+    if not present.any():
+        return np.flatnonzero(present)
+    extent = [xValues[present].min(), xValues[present].max(), yValues[present].min(), yValues[present].max()]
+    cellIndices, inGrid = calc_cell_indices(xValues, yValues, extent, shape)
+    if labelCodes is not None:
+        cellIndices += np.asarray(labelCodes, dtype=np.int64) * shape[0] * shape[1]
+
+    # Give the points random priorities, and keep the points of each cell and class with the lowest priorities.
+    pointIndices = np.flatnonzero(inGrid)
+    priorities = np.random.RandomState(seed).random_sample(pointIndices.size)
+    return pointIndices[select_points(cellIndices[pointIndices], priorities, pointsPerCell)]
+
+
+def sample_chunked_points(chunks, columnsToPlot, classColumn, extent, uniqueLabels=None, shape=None, pointsPerCell=1, seed=0):
+    """Select a subset of the points of a scatterplot from a dataset read a chunk of rows at a time.
+
+    The points kept are the same as those sample_points keeps when given the whole dataset at once with the same extent, shape and seed. The random
+    priorities of the points are drawn in the same order, and the points kept so far are carried from one chunk to the next, so no more than
+    pointsPerCell points of each class in each cell and one chunk of rows are ever held in memory.
+
+    :param chunks:          The chunks of the dataset.
+    :type chunks:           iterable of pandas.DataFrame
+    :param columnsToPlot:   The names of the columns containing the x and y values of the points.
+    :type columnsToPlot:    list of two column names
+    :param classColumn:     The name of the column containing the class of the points.
+    :type classColumn:      column name (or None if there are no classes)
+    :param extent:          The smallest x value, largest x value, smallest y value and largest y value of the points with both coordinates.
+    :type extent:           list of floats
+    :param uniqueLabels:    The class values.
+    :type uniqueLabels:     list (or None if there are no classes)
+    :param shape:           The number of rows and columns in the grid.
+    :type shape:            (int, int) tuple (or None to use the size of a new figure in pixels)
+    :param pointsPerCell:   The number of points of each class to keep in each cell.
+    :type pointsPerCell:    int
+    :param seed:            The seed for the random number generator used to choose the points to keep.
+    :type seed:             int
+    :returns :              The x values, y values and classes of the points kept, in the order they appear in the dataset.
+    :type :                 1 dimensional numpy arrays (the classes are empty if there are no classes)
+
+    """
+
+    shape = shape or calc_density_shape()
+    randomState = np.random.RandomState(seed)
+    xValues = np.empty(0)
+    yValues = np.empty(0)
+    classLabels = np.empty(0, dtype=object)
+    cellIndices = np.empty(0, dtype=np.int64)
+    priorities = np.empty(0)
+    for i in chunks:
+        # Find the cell and class of the points in the chunk that are in the grid.
+        chunkXValues = np.asarray(i[columnsToPlot[0]], dtype=float)
+        chunkYValues = np.asarray(i[columnsToPlot[1]], dtype=float)
+        chunkCellIndices, inGrid = calc_cell_indices(chunkXValues, chunkYValues, extent, shape)
+        if classColumn is not None:
+            chunkLabels = np.asarray(i[classColumn], dtype=object)[inGrid]
+            labelCodes = pandas.Categorical(chunkLabels, categories=uniqueLabels).codes.astype(np.int64)
+            chunkCellIndices = chunkCellIndices[inGrid] + (labelCodes * shape[0] * shape[1])
+        else:
+            chunkLabels = np.empty(0, dtype=object)
+            chunkCellIndices = chunkCellIndices[inGrid]
+
+        # Keep the points with the lowest priorities among those kept so far and those in the chunk.
+        xValues = np.r_[xValues, chunkXValues[inGrid]]
+        yValues = np.r_[yValues, chunkYValues[inGrid]]
+        classLabels = np.r_[classLabels, chunkLabels]
+        cellIndices = np.r_[cellIndices, chunkCellIndices]
+        priorities = np.r_[priorities, randomState.random_sample(chunkCellIndices.size)]
+        keptPoints = select_points(cellIndices, priorities, pointsPerCell)
+        xValues = xValues[keptPoints]
+        yValues = yValues[keptPoints]
+        classLabels = classLabels[keptPoints] if classColumn is not None else classLabels
+        cellIndices = cellIndices[keptPoints]
+        priorities = priorities[keptPoints]
+    return xValues, yValues, classLabels
+
+
+def select_points(cellIndices, priorities, pointsPerCell=1):
+    """Select the points with the lowest priorities in each cell.
+
+    :param cellIndices:     The cell (and class) of each point.
+    :type cellIndices:      1 dimensional numpy array of ints
+    :param priorities:      The priority of each point.
+    :type priorities:       1 dimensional numpy array of floats
+    :param pointsPerCell:   The number of points to keep in each cell.
+    :type pointsPerCell:    int
+    :returns :              The positions of the points to keep, in increasing order.
+    :type :                 1 dimensional numpy array of ints
+
+    """
+
+    # Order the points by cell and then by priority, and keep the first points of each cell.
+    sortOrder = np.lexsort((priorities, cellIndices))
+    cellIndices = cellIndices[sortOrder]
+    groupStarts = np.flatnonzero(np.r_[True, cellIndices[1:] != cellIndices[:-1]])
+    groupRanks = np.arange(cellIndices.size) - np.repeat(groupStarts, np.diff(np.r_[groupStarts, cellIndices.size]))
+    return np.sort(sortOrder[groupRanks < pointsPerCell])
+
+
+def setup_axes(currentFigure=None, title='', xLabel='', yLabel='', spinesToRemove=['top', 'right']):
+    """Get the axes to plot on, and style them.
+
+    :param currentFigure:   The figure from which the axes will be taken. If not provided, then a new figure will be created.
+    :type currentFigure:    matplotlib.figure.Figure
+    :param title:           The title for the plot.
+    :type title:            str
+    :param xLabel:          The label for the x axis.
+    :type xLabel:           str
+    :param yLabel:          The label for the y axis.
+    :type yLabel:           str
+    :param spinesToRemove:  The spines that should be removed from the axes.
+    :type spinesToRemove:   list containing any of ['left', 'right', 'top', 'bottom']
+    :returns :              The figure and the axes.
+    :type :                 objects of type matplotlib.figure.Figure, matplotlib.axes.Axes
+
+    """
+
     # Get the axes the will be used for the plot.
     try:
         axes = currentFigure.gca()
@@ -123,37 +872,7 @@ def plot(xValues, yValues, outputLocation=None, classLabels=pandas.Series(), cur
     plt.xlabel(xLabel, fontsize=16, color='0.25')
     plt.ylabel(yLabel, fontsize=16, color='0.25')
 
-    # Generate the plot.
-    if classLabels.empty:
-        # If there are no classes, then generate a basic scatterplot where all points are one color.
-        axes.scatter(xValues, yValues, s=size, c='black', marker=shape, edgecolor=edgeColor, linewidths=linewidths, alpha=alpha)
-    else:
-        # Map the class values to colors. If there are more class values than colors in the color set, then multiple class values will be mapped to the same color.
-        uniqueLabels = sorted(classLabels.unique())
-        if not colorMapping:
-            colorsToUse = colors.colorMaps[faceColorSet]
-            numberOfColors = len(colorsToUse)
-            colorMapping = {}
-            for i, j in enumerate(uniqueLabels):
-                colorMapping[j] = colorsToUse[i % numberOfColors]
-
-        for i, j in enumerate(uniqueLabels):
-            axes.scatter(xValues[classLabels == j], yValues[classLabels == j], s=size, c=colorMapping[j], label=str(j), marker=shape, edgecolor=edgeColor, linewidths=linewidths, alpha=alpha)
-
-        # Add a legend.
-        if legend:
-            legend = axes.legend(bbox_to_anchor=(1.05, 0.5), loc=6, borderaxespad=0, frameon=True, scatterpoints=1)
-            legendFrame = legend.get_frame()
-            legendFrame.set_facecolor('white')
-            legendFrame.set_edgecolor('black')
-            legendFrame.set_linewidth(0.2)
-            for i in legend.get_texts():
-                i.set_color('0.25')
-
-    if outputLocation:
-        plt.savefig(outputLocation, bbox_inches='tight', transparent=True)
-    else:
-        return currentFigure, axes
+    return currentFigure, axes
 
 
 if __name__ == '__main__':
@@ -172,6 +891,16 @@ if __name__ == '__main__':
                         type=str, default='0,1', required=False)
     parser.add_argument('-t', '--title', help='The title for the plot. (Required type: %(type)s, default value: %(default)s).',
                         type=str, default='', required=False)
+    parser.add_argument('-e', '--density', help='Whether the density of the points should be plotted instead of the points. (Default value: plot the points).',
+                        action='store_true', default=False, required=False)
+    parser.add_argument('-y', '--colorByDensity', help='Whether the points should be colored by the density of the points around them. (Default value: color by class).',
+                        action='store_true', default=False, required=False)
+    parser.add_argument('-z', '--rasterize', help='Whether the points should be composited into a single image rather than drawn individually. (Default value: draw individually).',
+                        action='store_true', default=False, required=False)
+    parser.add_argument('-l', '--lod', help='The number of points of each class to keep in each pixel of the figure. (Required type: %(type)s, default value: plot all the points).',
+                        type=int, default=None, required=False)
+    parser.add_argument('-k', '--chunk', help='The number of rows to read at a time when plotting the density of the points or keeping a subset of them. (Required type: %(type)s, default value: read the whole dataset at once).',
+                        type=int, default=None, required=False)
     args = parser.parse_args()
 
     columns = args.cols.split(',')
@@ -184,4 +913,6 @@ if __name__ == '__main__':
         print('ERROR: Non-integer column index provided. Only integer column indices may be supplied using the -c or --cols flags.')
         sys.exit()
 
-    main(args.dataset, args.output, headerPresent=args.header, separator=args.sep, classColumn=args.classCol, columnsToPlot=columnsToPlot, title=args.title)
\ No newline at end of file
+    main(args.dataset, args.output, headerPresent=args.header, separator=args.sep, classColumn=args.classCol, columnsToPlot=columnsToPlot, title=args.title,
+         density=args.density, chunkSize=args.chunk, colorByDensity=args.colorByDensity,
+         rasterize=args.rasterize, pointsPerCell=args.lod)
\ No newline at end of file